@@ -0,0 +1,145 @@
+"""Multi-file loading and querying module."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import os
+from pathlib import Path
+from typing import Any, Iterator
+
+from pq.evaluator import evaluate_query
+from pq.loader import DocumentLoadError, load_document
+from pq.output import OutputFormatter
+
+__all__ = ["expand_paths", "load_documents", "query_documents"]
+
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def expand_paths(patterns: list[Path]) -> list[Path]:
+    """Expand glob patterns the shell left unexpanded.
+
+    Existing paths are kept as given, so file names containing glob
+    characters still work. Patterns support "**" for recursive matching.
+
+    Args:
+        patterns: File paths or glob patterns, e.g. "dumps/*.json"
+
+    Returns:
+        Matching paths, in argument order with each pattern's matches sorted
+
+    Raises:
+        DocumentLoadError: If a pattern matches no files
+    """
+    paths = []
+    for pattern in patterns:
+        text = str(pattern)
+        if pattern.exists() or not _GLOB_CHARS.intersection(text):
+            paths.append(pattern)
+            continue
+        matches = sorted(glob.glob(text, recursive=True))
+        if not matches:
+            raise DocumentLoadError(f"No files match: {text}")
+        paths.extend(Path(match) for match in matches)
+    return paths
+
+
+def load_documents(
+    paths: list[Path],
+    jobs: int | None = None,
+    use_cache: bool = True,
+    yaml_documents: bool = False,
+) -> dict[str, Any]:
+    """Load several documents in parallel.
+
+    Args:
+        paths: Files to load
+        jobs: Number of worker processes; defaults to the CPU count
+        use_cache: Whether to use the on-disk parse cache
+        yaml_documents: Whether each YAML stream is always a list of documents
+
+    Returns:
+        Mapping of file name (as given) to parsed document, in path order
+
+    Raises:
+        DocumentLoadError: If any file fails to load
+    """
+    executor = _executor(paths, jobs)
+    if executor is None:
+        return {
+            str(path): load_document(path, use_cache, yaml_documents) for path in paths
+        }
+    with executor:
+        futures = [
+            executor.submit(load_document, path, use_cache, yaml_documents)
+            for path in paths
+        ]
+        return {str(path): future.result() for path, future in zip(paths, futures)}
+
+
+def query_documents(
+    query: str,
+    paths: list[Path],
+    jobs: int | None = None,
+    use_cache: bool = True,
+    yaml_documents: bool = False,
+) -> Iterator[str]:
+    """Run a query against each file separately.
+
+    Files are parsed and queried in worker processes, so only the formatted
+    results travel back. Results are yielded as soon as each file finishes,
+    which is not necessarily path order.
+
+    Args:
+        query: Python expression to evaluate against each document
+        paths: Files to query
+        jobs: Number of worker processes; defaults to the CPU count
+        use_cache: Whether to use the on-disk parse cache
+        yaml_documents: Whether each YAML stream is always a list of documents
+
+    Yields:
+        Formatted JSON object mapping the file name to its result
+
+    Raises:
+        DocumentLoadError: If a file fails to load
+        QueryEvaluationError: If the query fails on a file
+    """
+    executor = _executor(paths, jobs)
+    if executor is None:
+        for path in paths:
+            yield _query_file(query, path, use_cache, yaml_documents)
+        return
+    with executor:
+        futures = [
+            executor.submit(_query_file, query, path, use_cache, yaml_documents)
+            for path in paths
+        ]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def _query_file(query: str, path: Path, use_cache: bool, yaml_documents: bool) -> str:
+    """Load one file, evaluate the query and format the result."""
+    result = evaluate_query(query, load_document(path, use_cache, yaml_documents))
+    try:
+        return OutputFormatter.format_output({str(path): result})
+    except TypeError:
+        # Results json.dumps cannot encode are shown the way a single-file
+        # query would print them.
+        return OutputFormatter.format_output(
+            {str(path): OutputFormatter.format_output(result)}
+        )
+
+
+def _executor(paths: list[Path], jobs: int | None) -> ProcessPoolExecutor | None:
+    """Create a process pool, or None when there is nothing to overlap."""
+    workers = min(jobs or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers)
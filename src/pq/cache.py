@@ -0,0 +1,151 @@
+"""On-disk cache of parsed documents module."""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.metadata
+import os
+from pathlib import Path
+import pickle
+import tempfile
+from typing import Any
+
+__all__ = [
+    "CACHE_SIZE_LIMIT",
+    "cache_dir",
+    "clear_document_cache",
+    "load_cached",
+    "store_cached",
+]
+
+
+CACHE_SIZE_LIMIT = 512 * 1024 * 1024
+
+
+def cache_dir() -> Path:
+    """Return the directory holding cached documents.
+
+    Uses $XDG_CACHE_HOME/pq-cli/documents, falling back to
+    $HOME/.cache/pq-cli/documents.
+
+    Returns:
+        Cache directory path (may not exist yet)
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pq-cli" / "documents"
+
+
+def _version() -> str:
+    try:
+        return importlib.metadata.version("pq-cli")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _entry_path(file_path: Path, variant: str = "") -> Path:
+    """Return the cache file for the current state of a document.
+
+    The key covers the resolved path, size, modification time and pq
+    version, so an edited file or an upgrade never reads a stale entry,
+    and the variant, for parses of the same file into different shapes.
+    """
+    stat = file_path.stat()
+    key = "\0".join(
+        (
+            str(file_path.resolve()),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            _version(),
+            variant,
+        )
+    )
+    return cache_dir() / f"{hashlib.sha256(key.encode()).hexdigest()}.pickle"
+
+
+def load_cached(file_path: Path, variant: str = "") -> Any:
+    """Return the cached parse of a file, if there is a current one.
+
+    Args:
+        file_path: Source document path
+        variant: Name of the shape the file was parsed into, if not the default
+
+    Returns:
+        The parsed document, or None when there is no usable entry
+    """
+    try:
+        entry = _entry_path(file_path, variant)
+        f = open(entry, "rb")
+    except OSError:
+        return None
+    try:
+        with f:
+            document = pickle.load(f)
+        # Refresh the timestamp so eviction drops least recently used entries.
+        os.utime(entry)
+    except Exception:
+        # A corrupt entry can fail in almost any way, even with MemoryError
+        # from a garbage length; drop it so the next run parses afresh.
+        try:
+            entry.unlink()
+        except OSError:
+            pass
+        return None
+    return document
+
+
+def store_cached(
+    file_path: Path,
+    document: Any,
+    limit: int = CACHE_SIZE_LIMIT,
+    variant: str = "",
+) -> None:
+    """Save the parse of a file, evicting old entries over the size limit.
+
+    Caching is best effort: any failure leaves the cache untouched.
+
+    Args:
+        file_path: Source document path
+        document: Parsed document
+        limit: Maximum total size of the cache directory in bytes
+        variant: Name of the shape the file was parsed into, if not the default
+    """
+    try:
+        entry = _entry_path(file_path, variant)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent runs never read a
+        # partial entry.
+        fd, tmp = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(document, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, entry)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        _evict(entry.parent, limit)
+    except (OSError, pickle.PicklingError, RecursionError):
+        pass
+
+
+def _evict(directory: Path, limit: int) -> None:
+    """Delete least recently used entries until the cache fits in limit."""
+    entries = []
+    for path in directory.glob("*.pickle"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def clear_document_cache() -> None:
+    """Delete every cached document."""
+    for path in cache_dir().glob("*.pickle"):
+        path.unlink(missing_ok=True)
@@ -2,27 +2,64 @@
 
 from __future__ import annotations
 
+import functools
 from pathlib import Path
 import sys
+import time
+from typing import Any, BinaryIO, Iterable, cast
 
 import typer
 
 from pq.config import load_config
-from pq.evaluator import evaluate_query
-from pq.loader import content_from_file, load_content
+from pq.evaluator import QueryEvaluationError, evaluate_query, subscript_path
+from pq.loader import (
+    DocumentLoadError,
+    decompress_stream,
+    file_type_from_path,
+    load_content,
+    load_document,
+    load_document_with_status,
+    open_binary,
+    parser_backend,
+    sniff_stream,
+)
+from pq.batch import expand_paths, load_documents, query_documents
+from pq.index import DEFAULT_INDEX_DEPTH, build_index, load_indexed
+from pq.lazy import load_lazy_document
+from pq.streaming import JSONArrayStream, iter_records, open_records
 from pq.cli_arg import (
+    ArrayPath,
+    BuildIndex,
+    IndexDepth,
+    Jobs,
+    Lazy,
+    NoCache,
+    PerFile,
     Query,
-    FilePath,
+    FilePaths,
     FileTypeJSON,
+    FileTypeJSONL,
+    FileTypeCSV,
+    FileTypeTSV,
     FileTypeYAML,
     FileTypeXML,
     FileTypeTOML,
+    Stream,
     Theme,
+    Timeout,
+    Progress,
+    Timings,
+    XMLItemDepth,
+    YAMLDocuments,
+    MaxMemory,
     Version,
     consolidate_file_type_flags,
 )
 from pq.output import OutputFormatter
+from pq.progress import with_progress
+from pq.sandbox import evaluate_in_subprocess
 from pq.tui import QueryApp
+from pq.types import FileTypes
 
 __all__ = ["app"]
 
@@ -32,12 +69,29 @@ app = typer.Typer()
 @app.command()
 def main(
     query: Query,
-    file_path: FilePath = None,
+    file_paths: FilePaths = None,
     file_type_json: FileTypeJSON = False,
     file_type_yaml: FileTypeYAML = False,
     file_type_xml: FileTypeXML = False,
     file_type_toml: FileTypeTOML = False,
+    file_type_jsonl: FileTypeJSONL = False,
+    file_type_csv: FileTypeCSV = False,
+    file_type_tsv: FileTypeTSV = False,
+    stream: Stream = False,
+    array_path: ArrayPath = None,
+    xml_item_depth: XMLItemDepth = None,
+    yaml_documents: YAMLDocuments = False,
+    lazy: Lazy = False,
+    build_index_flag: BuildIndex = False,
+    index_depth: IndexDepth = DEFAULT_INDEX_DEPTH,
+    no_cache: NoCache = False,
+    per_file: PerFile = False,
+    jobs: Jobs = None,
     theme: Theme = None,
+    timeout: Timeout = None,
+    max_memory: MaxMemory = None,
+    timings: Timings = False,
+    progress: Progress = False,
     v: Version = None,
 ) -> None:
     """Run a query against a document.
@@ -49,39 +103,292 @@ def main(
         raise typer.BadParameter("A query expression is required")
 
     file_type = consolidate_file_type_flags(
-        file_type_json, file_type_yaml, file_type_xml, file_type_toml
+        file_type_json,
+        file_type_yaml,
+        file_type_xml,
+        file_type_toml,
+        file_type_jsonl,
+        file_type_csv,
+        file_type_tsv,
     )
 
+    try:
+        file_path, multi_paths = _resolve_file_paths(file_paths)
+    except DocumentLoadError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
     query_path = Path(query)
-    is_tui_mode = query_path.exists() and file_path is None
 
-    if is_tui_mode:
-        content, resolved_type = content_from_file(file_path=query_path)
-        data = load_content(content=content, file_type=resolved_type, src=query)
+    if build_index_flag:
+        # The file may be given alone, the way the TUI is started.
+        target = file_path if file_paths else query_path
+        if multi_paths is not None or target is None or not target.exists():
+            raise typer.BadParameter("--build-index takes a single JSON file")
+        started = time.perf_counter()
+        try:
+            count = build_index(target, index_depth)
+        except DocumentLoadError as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(1)
+        typer.echo(
+            f"Indexed {count} paths of {target} in {time.perf_counter() - started:.3f}s",
+            err=True,
+        )
+        raise typer.Exit(0)
+
+    is_tui_mode = query_path.exists() and not file_paths
 
+    if is_tui_mode:
         config = load_config()
         selected_theme = theme or config.theme
 
-        tui = QueryApp(data=data, theme=selected_theme)
+        tui = QueryApp(
+            theme=selected_theme,
+            loader=functools.partial(
+                _load_file,
+                query_path,
+                lazy,
+                use_cache=not no_cache,
+                yaml_documents=yaml_documents,
+            ),
+        )
         tui.run()
+        if tui.load_error is not None:
+            typer.echo(f"Error: {tui.load_error}", err=True)
+            raise typer.Exit(1)
         OutputFormatter.print_to_stdout(str(tui.query_string))
         raise typer.Exit(0)
 
-    if file_path is not None:
-        content, resolved_type = content_from_file(file_path=file_path)
-        src = str(file_path)
-    elif file_type is not None:
-        content = sys.stdin.read()
-        resolved_type = file_type
-        src = "stdin"
+    stdin = None
+    if not file_paths:
+        if file_type is None and sys.stdin.isatty():
+            raise typer.BadParameter(
+                "Must supply file path, or pipe a document to stdin (-j/-y/-x/-t/-l/-c/--tsv set its format)"
+            )
+        stdin = sys.stdin.buffer
+        if progress:
+            stdin = with_progress(stdin)
+        stdin = decompress_stream(stdin)
+        if file_type is None:
+            stdin, file_type = sniff_stream(stdin)
+
+    if multi_paths is not None:
+        if stream or array_path is not None or lazy or xml_item_depth is not None:
+            raise typer.BadParameter(
+                "--stream, --array-path, --xml-item-depth and --lazy apply to a single file"
+            )
+        if per_file:
+            if timeout is not None or max_memory is not None:
+                raise typer.BadParameter(
+                    "--timeout and --max-memory cannot be combined with --per-file"
+                )
+            try:
+                for output in query_documents(
+                    query,
+                    multi_paths,
+                    jobs,
+                    use_cache=not no_cache,
+                    yaml_documents=yaml_documents,
+                ):
+                    OutputFormatter.write_formatted(output)
+            except (DocumentLoadError, QueryEvaluationError) as e:
+                typer.echo(f"Error: {e}", err=True)
+                raise typer.Exit(1)
+            return
+
+    resolved_type = (
+        file_type_from_path(file_path) if file_path is not None else file_type
+    )
+    array_keys = None
+    if array_path is not None:
+        array_keys = subscript_path(array_path)
+        if array_keys is None or resolved_type != FileTypes.json:
+            raise typer.BadParameter(
+                "--array-path takes a subscript path such as \"_['items']\" and only applies to JSON"
+            )
+
+    if xml_item_depth is not None:
+        if resolved_type != FileTypes.xml:
+            raise typer.BadParameter("--xml-item-depth only applies to XML")
+        stream = True
+
+    if stream:
+        if timeout is not None or max_memory is not None:
+            raise typer.BadParameter(
+                "--timeout and --max-memory cannot be combined with --stream"
+            )
+        if file_path is not None:
+            records = open_records(
+                file_path=file_path,
+                keys=array_keys,
+                use_cache=not no_cache,
+                xml_item_depth=xml_item_depth,
+            )
+        else:
+            records = iter_records(
+                cast(BinaryIO, stdin),
+                cast(FileTypes, file_type),
+                "stdin",
+                array_keys,
+                xml_item_depth,
+            )
+        try:
+            for record in records:
+                OutputFormatter.print_to_stdout(evaluate_query(query, record))
+        except QueryEvaluationError as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(1)
+        return
+
+    indexed = cached = False
+    started = time.perf_counter()
+    if multi_paths is not None:
+        try:
+            data = load_documents(
+                multi_paths,
+                jobs,
+                use_cache=not no_cache,
+                yaml_documents=yaml_documents,
+            )
+        except DocumentLoadError as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(1)
+    elif array_keys is not None:
+        data = _open_array_stream(file_path, array_keys, stdin)
+    elif file_path is not None:
+        data = None
+        keys = subscript_path(query)
+        if not lazy and keys and resolved_type == FileTypes.json:
+            data = load_indexed(file_path, keys)
+            indexed = data is not None
+        if data is None and lazy:
+            data = load_lazy_document(file_path=file_path)
+        elif data is None:
+            data, cached = load_document_with_status(
+                file_path, use_cache=not no_cache, yaml_documents=yaml_documents
+            )
     else:
-        raise typer.BadParameter(
-            "Must supply file path, or use a file type flag (-j/-y/-x/-t) when reading from stdin"
+        data = load_content(
+            content=cast(BinaryIO, stdin),
+            file_type=cast(FileTypes, file_type),
+            src="stdin",
+            yaml_documents=yaml_documents,
         )
+    loaded = time.perf_counter()
+
+    try:
+        if timeout is not None or max_memory is not None:
+            output = evaluate_in_subprocess(
+                query, data, timeout=timeout, max_memory=max_memory
+            )
+        else:
+            output = OutputFormatter.format_output(evaluate_query(query, data))
+    except QueryEvaluationError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    finished = time.perf_counter()
+    OutputFormatter.write_formatted(output)
+
+    if timings:
+        if multi_paths is not None:
+            file_types = {file_type_from_path(path) for path in multi_paths}
+        elif file_path is not None:
+            file_types = {file_type_from_path(file_path)}
+        else:
+            file_types = {cast(FileTypes, file_type)}
+        if lazy:
+            parser = "lazy JSON proxy"
+        elif indexed:
+            parser = f"sidecar index, {_parser_names(file_types)}"
+        elif array_keys is not None:
+            parser = "incremental JSON reader"
+        elif cached:
+            parser = "parse cache"
+        else:
+            parser = _parser_names(file_types)
+        typer.echo(f"load: {loaded - started:.3f}s ({parser})", err=True)
+        typer.echo(f"query: {finished - loaded:.3f}s", err=True)
 
-    data = load_content(content=content, file_type=resolved_type, src=src)
-    result = evaluate_query(query, data)
-    OutputFormatter.print_to_stdout(result)
+
+def _parser_names(file_types: Iterable[FileTypes]) -> str:
+    """Describe the parser backend used for each file type.
+
+    Args:
+        file_types: File types that were loaded
+
+    Returns:
+        Text such as "yaml: libyaml, json: orjson"
+    """
+    return ", ".join(
+        f"{file_type.value}: {parser_backend(file_type).name}"
+        for file_type in sorted(file_types)
+    )
+
+
+def _resolve_file_paths(
+    file_paths: list[Path] | None,
+) -> tuple[Path | None, list[Path] | None]:
+    """Split file arguments into a single file or a multi-file selection.
+
+    Args:
+        file_paths: File arguments, possibly glob patterns
+
+    Returns:
+        (file_path, None) for one plain file, (None, paths) when several
+        files or a glob pattern were given, and (None, None) for stdin
+    """
+    if not file_paths:
+        return None, None
+    paths = expand_paths(file_paths)
+    if paths == file_paths and len(paths) == 1:
+        return paths[0], None
+    return None, paths
+
+
+def _load_file(
+    file_path: Path, lazy: bool, use_cache: bool = True, yaml_documents: bool = False
+) -> Any:
+    """Load a document from a file, lazily if requested.
+
+    Args:
+        file_path: File to load
+        lazy: Whether to defer parsing of JSON subtrees until accessed
+        use_cache: Whether to use the on-disk parse cache
+        yaml_documents: Whether a YAML stream is always a list of documents
+
+    Returns:
+        Parsed document or lazy proxy
+    """
+    if lazy:
+        return load_lazy_document(file_path=file_path)
+    return load_document(
+        file_path=file_path, use_cache=use_cache, yaml_documents=yaml_documents
+    )
+
+
+def _open_array_stream(
+    file_path: Path | None, keys: tuple, stdin: BinaryIO | None
+) -> JSONArrayStream:
+    """Bind '_' to a lazily read JSON array from a file or stdin.
+
+    Args:
+        file_path: JSON file to read, or None for stdin
+        keys: Subscript path to the array
+        stdin: Decompressed stdin stream, used when file_path is None
+
+    Returns:
+        JSONArrayStream over the array elements
+    """
+    if file_path is None:
+        return JSONArrayStream(
+            lambda: cast(BinaryIO, stdin),
+            keys,
+            "stdin",
+            reopenable=False,
+        )
+    if not file_path.exists():
+        raise DocumentLoadError(f"File not found: {file_path}")
+    return JSONArrayStream(lambda: open_binary(file_path), keys, str(file_path))
 
 
 if __name__ == "__main__":
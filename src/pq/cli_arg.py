@@ -17,8 +17,11 @@ Query = Annotated[
     str | None,
     typer.Argument(help="Python expression that returns a subset of given file"),
 ]
-FilePath = Annotated[
-    Path | None, typer.Argument(help="Input file, use '-' to read from stdin")
+FilePaths = Annotated[
+    list[Path] | None,
+    typer.Argument(
+        help="Input files or glob patterns (e.g. 'dumps/*.json'); with several files _ maps each file name to its document"
+    ),
 ]
 FileTypeJSON = Annotated[
     bool,
@@ -28,6 +31,29 @@ FileTypeJSON = Annotated[
         help="Specify JSON format for stdin input",
     ),
 ]
+FileTypeJSONL = Annotated[
+    bool,
+    typer.Option(
+        "-l",
+        "--jsonl",
+        help="Specify JSON Lines format for stdin input",
+    ),
+]
+FileTypeCSV = Annotated[
+    bool,
+    typer.Option(
+        "-c",
+        "--csv",
+        help="Specify CSV format for stdin input",
+    ),
+]
+FileTypeTSV = Annotated[
+    bool,
+    typer.Option(
+        "--tsv",
+        help="Specify TSV (tab-separated) format for stdin input",
+    ),
+]
 FileTypeYAML = Annotated[
     bool,
     typer.Option(
@@ -60,6 +86,111 @@ Theme = Annotated[
         help="Textual color theme (overrides config file)",
     ),
 ]
+Stream = Annotated[
+    bool,
+    typer.Option(
+        "--stream",
+        "-s",
+        help="Evaluate the query once per record and print each result as it is produced",
+    ),
+]
+XMLItemDepth = Annotated[
+    int | None,
+    typer.Option(
+        "--xml-item-depth",
+        min=1,
+        help="Run the query on each XML element at depth N (2 = children of the root) and print each result as it is produced",
+    ),
+]
+YAMLDocuments = Annotated[
+    bool,
+    typer.Option(
+        "--yaml-documents",
+        help="Bind _ to the list of YAML documents even when the stream holds only one",
+    ),
+]
+BuildIndex = Annotated[
+    bool,
+    typer.Option(
+        "--build-index",
+        help="Write a FILE.pqidx sidecar index of a JSON file's byte offsets; later subscript queries read only the indexed slice",
+    ),
+]
+IndexDepth = Annotated[
+    int,
+    typer.Option(
+        "--index-depth",
+        min=1,
+        help="Number of subscript levels --build-index records",
+    ),
+]
+ArrayPath = Annotated[
+    str | None,
+    typer.Option(
+        "--array-path",
+        "-a",
+        help="Read the JSON array at this path (e.g. \"_\" or \"_['items']\") one element at a time instead of loading the whole document",
+    ),
+]
+PerFile = Annotated[
+    bool,
+    typer.Option(
+        "--per-file",
+        help="With several files, run the query on each file separately and print results as they finish",
+    ),
+]
+Jobs = Annotated[
+    int | None,
+    typer.Option(
+        "--jobs",
+        min=1,
+        help="Number of processes used to parse several files (default: CPU count)",
+    ),
+]
+Lazy = Annotated[
+    bool,
+    typer.Option(
+        "--lazy",
+        help="Parse parts of a JSON file only when a query reaches them",
+    ),
+]
+NoCache = Annotated[
+    bool,
+    typer.Option(
+        "--no-cache",
+        help="Parse YAML and XML files from scratch instead of using the on-disk parse cache",
+    ),
+]
+Timeout = Annotated[
+    float | None,
+    typer.Option(
+        "--timeout",
+        min=0,
+        help="Stop the query after SECONDS (runs it in a separate process)",
+    ),
+]
+MaxMemory = Annotated[
+    int | None,
+    typer.Option(
+        "--max-memory",
+        min=1,
+        help="Limit the memory a query may allocate to MB (runs it in a separate process)",
+    ),
+]
+Progress = Annotated[
+    bool,
+    typer.Option(
+        "--progress",
+        help="Show how much of stdin has been read, and how fast, on stderr",
+    ),
+]
+Timings = Annotated[
+    bool,
+    typer.Option(
+        "--timings",
+        help="Report load and query times and the parser used on stderr",
+    ),
+]
 Version = Annotated[
     bool | None,
     typer.Option(
@@ -76,6 +207,9 @@ def consolidate_file_type_flags(
     yaml_flag: bool,
     xml_flag: bool,
     toml_flag: bool,
+    jsonl_flag: bool = False,
+    csv_flag: bool = False,
+    tsv_flag: bool = False,
 ) -> FileTypes | None:
     """Consolidate mutually exclusive file type flags.
 
@@ -84,6 +218,9 @@ def consolidate_file_type_flags(
         yaml_flag: YAML format flag
         xml_flag: XML format flag
         toml_flag: TOML format flag
+        jsonl_flag: JSON Lines format flag
+        csv_flag: CSV format flag
+        tsv_flag: TSV format flag
 
     Returns:
         FileTypes value if exactly one flag is set, None otherwise
@@ -91,7 +228,15 @@ def consolidate_file_type_flags(
     Raises:
         typer.BadParameter: If more than one flag is set
     """
-    flags_set = [json_flag, yaml_flag, xml_flag, toml_flag]
+    flags_set = [
+        json_flag,
+        yaml_flag,
+        xml_flag,
+        toml_flag,
+        jsonl_flag,
+        csv_flag,
+        tsv_flag,
+    ]
     flags_count = sum(flags_set)
 
     if flags_count == 0:
@@ -106,4 +251,10 @@ def consolidate_file_type_flags(
         return FileTypes.yaml
     if xml_flag:
         return FileTypes.xml
+    if jsonl_flag:
+        return FileTypes.jsonl
+    if csv_flag:
+        return FileTypes.csv
+    if tsv_flag:
+        return FileTypes.tsv
     return FileTypes.toml
@@ -2,10 +2,497 @@
 
 from __future__ import annotations
 
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+import heapq
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, islice
 import re
-from typing import Any
+import sys
+from typing import Any, Iterable, Iterator, NamedTuple
+
+__all__ = ["PathExtractor", "PathIndex", "FuzzyMatcher"]
+
+
+# "_" followed by complete subscripts with quoted keys or non-negative indices.
+_PATH_PREFIX = re.compile(r"_(?:\[(?:'[^']*'|\"[^\"]*\"|\d+)\])*")
+# The same, also accepting the "[*]" that stands for every element of a list.
+_SCHEMA_PREFIX = re.compile(r"_(?:\[(?:'[^']*'|\"[^\"]*\"|\d+|\*)\])*")
+_SUBSCRIPT = re.compile(r"\[(?:'([^']*)'|\"([^\"]*)\"|(\d+)|(\*))\]")
+# What may follow the complete subscripts of a query that is still being typed.
+_PARTIAL_KEY = re.compile(r"\[['\"]([^'\"]*)")
+_PARTIAL_INDEX = re.compile(r"\[(\d*)")
+
+# At most this many elements of each list are merged into its schema.
+_SAMPLE_SIZE = 1_000
+
+# Fuzzy scoring: every matched character earns a point, plus a bonus when it
+# follows the previous match directly or starts a word. Skipped characters
+# and case differences cost points.
+_MATCH_SCORE = 1.0
+_CONSECUTIVE_BONUS = 3.0
+_WORD_START_BONUS = 2.0
+_GAP_PENALTY = 0.5
+_MAX_GAP_PENALTY = 3.0
+_CASE_PENALTY = 0.5
+_LENGTH_PENALTY = 0.01
+# Keys scored per keystroke among the prefix and the subsequence matches.
+_MAX_SCORED = 200
+# Subsequence matches collected per keystroke before the scan gives up on
+# finding them all, and keys of a node scanned for them.
+_MAX_CANDIDATES = 2_000
+_MAX_SCANNED = 20_000
+# List indices offered for Tab completion of a subscript.
+_MAX_INDICES = 100
+
+# A dict key, a list index, or None for "[*]".
+_Key = str | int | None
+
+
+class _KeyText(NamedTuple):
+    """The keys of a dict node prepared for fuzzy search.
+
+    text holds one lowercase key per line, so one regex scan over it
+    filters every key at C speed; starts holds the offset of each line.
+    sorted_lower holds the lowercase keys in sorted order and order their
+    positions, so the keys starting with a prefix are found by bisection.
+    """
+
+    keys: list[str]
+    lower: list[str]
+    text: str
+    starts: array
+    sorted_lower: list[str]
+    order: array
+
+
+def _add_newline(offset: int, length: int) -> int:
+    return offset + length + 1
+
+
+class _PathNode:
+    """A dict in the path index.
+
+    children maps the interned keys of the dict to child nodes. Scalars are
+    stored as None instead of nodes of their own, so a leaf costs one slot
+    in its parent. The node is filled from its pending source objects the
+    first time its children are asked for.
+    """
+
+    __slots__ = ("_children", "_sources", "_lowered")
+
+    def __init__(self) -> None:
+        self._children: dict[str, _Node | None] = {}
+        self._sources: list[Mapping[Any, Any]] | None = None
+        self._lowered: _KeyText | None = None
+
+    @property
+    def children(self) -> dict[str, _Node | None]:
+        """Child nodes by key, expanded from the sources on first access."""
+        if self._sources is not None:
+            self._expand()
+        return self._children
+
+    def add_source(self, obj: Mapping[Any, Any]) -> None:
+        """Queue a dict whose keys are merged in on first access."""
+        if self._sources is None:
+            self._sources = []
+        self._sources.append(obj)
+
+    def _expand(self) -> None:
+        sources, self._sources = self._sources or [], None
+        children = self._children
+        for obj in sources:
+            for key, value in obj.items():
+                key = sys.intern(str(key))
+                child = children.get(key) or _new_node(value)
+                children[key] = child
+                if child is not None:
+                    _add_source(child, value)
+
+    def child(self, key: _Key) -> _Node | None:
+        """Return the container node below key, or None."""
+        return self.children.get(key) if isinstance(key, str) else None
+
+    def lowered(self) -> _KeyText:
+        """Return the node's keys prepared for fuzzy search, computed once."""
+        if self._lowered is None:
+            keys = list(self.children)
+            lower = list(map(str.lower, keys))
+            text = "\n".join(lower)
+            if text.count("\n") != max(len(lower) - 1, 0):
+                # A newline inside a key must not start a line of its own.
+                text = "\n".join(key.replace("\n", " ") for key in lower)
+            starts = array("q", accumulate(map(len, lower), _add_newline, initial=0))
+            order = sorted(range(len(lower)), key=lower.__getitem__)
+            ordered = [lower[i] for i in order]
+            self._lowered = _KeyText(keys, lower, text, starts, ordered, array("q", order))
+        return self._lowered
+
+    def items(self) -> Iterator[tuple[_Key, _Node | None]]:
+        """Yield (key, child) pairs in document order."""
+        return iter(self.children.items())
+
+
+class _ListNode:
+    """A list in the path index, collapsed to the schema of its elements.
+
+    Rather than one node per element, element holds the union of the
+    sampled elements' structure, and length the element count. When lists
+    from several sampled records merge into one node, length is that of
+    the longest, so every index valid in any of them is accepted. Like
+    _PathNode, the node is filled from its sources on first access.
+    """
+
+    __slots__ = ("_element", "_length", "_sources")
+
+    def __init__(self) -> None:
+        self._element: _Node | None = None
+        self._length = 0
+        self._sources: list[Sequence[Any]] | None = None
+
+    @property
+    def element(self) -> _Node | None:
+        """Merged schema of the elements, or None if they are scalars."""
+        if self._sources is not None:
+            self._expand()
+        return self._element
+
+    @property
+    def length(self) -> int:
+        """Number of elements."""
+        if self._sources is not None:
+            self._expand()
+        return self._length
+
+    def add_source(self, obj: Sequence[Any]) -> None:
+        """Queue a list whose elements are merged in on first access."""
+        if self._sources is None:
+            self._sources = []
+        self._sources.append(obj)
+
+    def _expand(self) -> None:
+        sources, self._sources = self._sources or [], None
+        for obj in sources:
+            self._length = max(self._length, len(obj))
+            for value in _sample(obj):
+                child = self._element or _new_node(value)
+                self._element = child
+                if child is not None:
+                    _add_source(child, value)
+
+    def child(self, key: _Key) -> _Node | None:
+        """Return the element schema for an in-bounds index or "[*]"."""
+        if key is None or (isinstance(key, int) and 0 <= key < self.length):
+            return self.element
+        return None
+
+    def items(self) -> Iterator[tuple[_Key, _Node | None]]:
+        """Yield the single "[*]" entry, unless the list is empty."""
+        return iter([(None, self.element)] if self.length else [])
+
+
+_Node = _PathNode | _ListNode
+
+
+def _is_list(obj: Any) -> bool:
+    """Check for a list-like container, including lazy proxies and tables."""
+    return isinstance(obj, Sequence) and not isinstance(obj, (str, bytes, bytearray))
+
+
+def _new_node(obj: Any) -> _Node | None:
+    """Create an empty node for a container, or None for a scalar."""
+    if isinstance(obj, Mapping):
+        return _PathNode()
+    if _is_list(obj):
+        return _ListNode()
+    return None
+
+
+def _subscripts(obj: Any) -> Iterator[tuple[_Key, Any]]:
+    """Iterate over the (key, value) pairs of a container, or nothing."""
+    if isinstance(obj, Mapping):
+        return ((str(key), value) for key, value in obj.items())
+    if _is_list(obj):
+        return enumerate(obj)
+    return iter(())
+
+
+def _add_source(node: _Node, obj: Any) -> None:
+    """Queue obj for merging into node if it is the same kind of container.
+
+    A key that holds a dict in one element and a list in another keeps the
+    kind it was first seen with.
+    """
+    if isinstance(node, _PathNode):
+        if isinstance(obj, Mapping):
+            node.add_source(obj)
+    elif _is_list(obj):
+        node.add_source(obj)
+
+
+def _sample(items: Sequence[Any]) -> Iterable[Any]:
+    """Pick at most _SAMPLE_SIZE elements spread evenly over a list."""
+    if len(items) <= _SAMPLE_SIZE:
+        return items
+    step = len(items) / _SAMPLE_SIZE
+    return (items[int(i * step)] for i in range(_SAMPLE_SIZE))
+
+
+def _score(query: str, query_lower: str, key: str, key_lower: str) -> float | None:
+    """Score how well query matches key as a subsequence.
+
+    Args:
+        query: Text typed by the user
+        query_lower: query in lowercase
+        key: Candidate key
+        key_lower: key in lowercase
+
+    Returns:
+        Score, higher for better matches, or None if the characters of
+        query do not all appear in key in order
+    """
+    score = -_LENGTH_PENALTY * (len(key) - len(query))
+    if len(key) != len(key_lower):
+        # Lowercasing changed the length (e.g. "İ"), so positions found in
+        # key_lower do not line up with key; judge words and case by the
+        # lowercase form instead.
+        key = key_lower
+    previous = -1
+    for char, char_lower in zip(query, query_lower):
+        pos = key_lower.find(char_lower, previous + 1)
+        if pos < 0:
+            return None
+        score += _MATCH_SCORE
+        gap = pos - previous - 1
+        if gap == 0 and previous >= 0:
+            score += _CONSECUTIVE_BONUS
+        elif (
+            pos == 0
+            or not key[pos - 1].isalnum()
+            or (key[pos - 1].islower() and key[pos].isupper())
+        ):
+            score += _WORD_START_BONUS
+        score -= min(gap * _GAP_PENALTY, _MAX_GAP_PENALTY)
+        if key[pos] != char:
+            score -= _CASE_PENALTY
+        previous = pos
+    return score
+
+
+def _prefix_matches(keys: _KeyText, prefix: str, limit: int) -> list[int]:
+    """Return positions of up to limit keys starting with prefix, in key order."""
+    sorted_lower = keys.sorted_lower
+    start = bisect_left(sorted_lower, prefix)
+    found: list[int] = []
+    for i in range(start, min(start + limit, len(sorted_lower))):
+        if not sorted_lower[i].startswith(prefix):
+            break
+        found.append(keys.order[i])
+    return found
+
+
+def _unique(positions: Iterable[int]) -> Iterator[int]:
+    """Drop consecutive repeats from ascending positions."""
+    last = -1
+    for position in positions:
+        if position != last:
+            yield position
+            last = position
+
+
+def _indices(length: int, prefix: str, limit: int) -> list[str]:
+    """List the indices below length that start with prefix, in order.
+
+    Indices with the digits of prefix followed by k more digits form one
+    contiguous range for each k, so only the indices returned are visited.
+
+    Args:
+        length: Length of the list
+        prefix: Digits typed so far
+        limit: Maximum number of indices to return
+
+    Returns:
+        Up to limit indices, as strings
+    """
+    if not prefix:
+        return [str(i) for i in range(min(length, limit))]
+    if not prefix.isdigit() or (prefix != "0" and prefix.startswith("0")):
+        return []
+    if prefix == "0":
+        return ["0"] if length else []
+    result: list[str] = []
+    start, stop = int(prefix), int(prefix) + 1
+    while start < length and len(result) < limit:
+        end = min(stop, length, start + limit - len(result))
+        result.extend(str(i) for i in range(start, end))
+        start, stop = start * 10, stop * 10
+    return result
+
+
+def _remember(cache: OrderedDict[Any, Any], key: Any, value: Any, maxsize: int) -> None:
+    """Store a value in an LRU cache, evicting the oldest entries over maxsize."""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
+def _render_path(base: str, key: _Key) -> str:
+    """Append one subscript to a path string.
+
+    Args:
+        base: Path so far, e.g. "_['items']"
+        key: Dict key, list index, or None for every element
+
+    Returns:
+        Extended path, e.g. "_['items'][0]" or "_['items'][*]"
+    """
+    if key is None:
+        return f"{base}[*]"
+    if isinstance(key, int):
+        return f"{base}[{key}]"
+    return f"{base}['{key}']"
+
+
+def _parse_path(
+    path: str, wildcard: bool = False
+) -> tuple[tuple[_Key, ...], str] | None:
+    """Split a path into its complete subscripts and the text after them.
+
+    Args:
+        path: Query text such as "_['items'][0]['na"
+        wildcard: Whether "[*]" is accepted as a subscript (parsed as None)
+
+    Returns:
+        (keys, rest), e.g. (("items", 0), "['na"), or None if path does not
+        start with "_"
+    """
+    match = (_SCHEMA_PREFIX if wildcard else _PATH_PREFIX).match(path)
+    if match is None:
+        return None
+    keys: list[_Key] = []
+    for subscript in _SUBSCRIPT.finditer(match.group(), 1):
+        single, double, index, _ = subscript.groups()
+        if index is not None:
+            keys.append(int(index))
+        elif single is not None or double is not None:
+            keys.append(single if single is not None else double)
+        else:
+            keys.append(None)
+    return tuple(keys), path[match.end() :]
+
+
+class PathIndex:
+    """Tree of the subscript paths in a document.
+
+    Nodes are expanded lazily: creating an index costs nothing, and a node
+    reads the keys of its part of the document only when completion first
+    asks about that path. Expanded nodes are kept, so memory grows with
+    what has been explored rather than with the document. Lazy JSON
+    proxies and CSV tables are walked through their mapping and sequence
+    interfaces, so only the explored parts are ever parsed or built.
+
+    Lists are not expanded element by element: a sample of each list's
+    elements is merged into one schema node, rendered as "[*]", so an array
+    of a million similar records costs about as much as one record.
+    """
+
+    def __init__(self, data: Any) -> None:
+        """Create the index of a document.
+
+        Args:
+            data: Document data to index
+        """
+        root = _new_node(data)
+        if root is not None:
+            _add_source(root, data)
+        self.root: _Node = root or _PathNode()
+
+    @classmethod
+    def from_paths(cls, paths: list[str]) -> PathIndex:
+        """Build an index from path strings such as "_['items'][0]".
+
+        Paths may use "[*]" for every element of a list, as iter_paths()
+        renders them. A list's length is one more than the largest index
+        given for it, or 1 if it only appears as "[*]".
+
+        Args:
+            paths: Path strings
+
+        Returns:
+            Index containing those paths
+        """
+        index = cls(None)
+        for path in paths:
+            parsed = _parse_path(path, wildcard=True)
+            if parsed is None or parsed[1] or not parsed[0]:
+                continue
+            keys = parsed[0]
+            if isinstance(index.root, _PathNode) and not index.root.children:
+                index.root = _PathNode() if isinstance(keys[0], str) else _ListNode()
+            node: _Node = index.root
+            for depth, key in enumerate(keys):
+                if isinstance(node, _PathNode) != isinstance(key, str):
+                    break
+                if isinstance(node, _PathNode):
+                    child = node.children.get(key)
+                else:
+                    child = node.element
+                if child is None and depth + 1 < len(keys):
+                    # The next subscript tells whether this is a dict or a list.
+                    child = (
+                        _PathNode()
+                        if isinstance(keys[depth + 1], str)
+                        else _ListNode()
+                    )
+                if isinstance(node, _PathNode):
+                    node.children[sys.intern(key)] = child
+                else:
+                    # "[*]" only tells that the list has elements.
+                    node._length = max(node.length, 1 if key is None else key + 1)
+                    node._element = child
+                if child is None:
+                    break
+                node = child
+        return index
+
+    def node(self, keys: tuple[_Key, ...]) -> _Node | None:
+        """Return the container node at a path.
 
-__all__ = ["PathExtractor", "FuzzyMatcher"]
+        Args:
+            keys: Dict keys, list indices, or None for "[*]", from the root
+
+        Returns:
+            Node at the path, or None if the path is missing, out of
+            bounds, or a scalar
+        """
+        node: _Node | None = self.root
+        for key in keys:
+            if node is None:
+                return None
+            node = node.child(key)
+        return node
+
+    def iter_paths(self) -> Iterator[str]:
+        """Yield every path string in document order, parents first.
+
+        Yields:
+            Paths such as "_['items'][*]['name']"
+        """
+        stack = [("_", self.root.items())]
+        while stack:
+            base, items = stack[-1]
+            for key, child in items:
+                path = _render_path(base, key)
+                yield path
+                if child is not None:
+                    # Resume this container's iterator after the subtree.
+                    stack.append((path, child.items()))
+                    break
+            else:
+                stack.pop()
 
 
 class PathExtractor:
@@ -18,26 +505,30 @@ class PathExtractor:
             data: Document data to extract paths from
         """
         self.data = data
-        self.paths: list[str] = []
-        self._extract_paths(self.data, "_")
+        self.index = PathIndex(data)
 
-    def _extract_paths(self, obj: Any, current_path: str) -> None:
-        """Recursively extract paths from object.
+    @property
+    def paths(self) -> list[str]:
+        """Every concrete path, e.g. "_['items'][0]['name']", in document order.
 
-        Args:
-            obj: Object to extract paths from
-            current_path: Current path prefix
+        Unlike the index, which merges list elements into "[*]", each
+        element gets its own paths, so these are all valid queries and
+        PathIndex.from_paths() recovers the lengths of the lists.
         """
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                new_path = f"{current_path}['{key}']"
-                self.paths.append(new_path)
-                self._extract_paths(value, new_path)
-        elif isinstance(obj, (list, tuple)):
-            for i, value in enumerate(obj):
-                new_path = f"{current_path}[{i}]"
-                self.paths.append(new_path)
-                self._extract_paths(value, new_path)
+        paths: list[str] = []
+        stack = [("_", _subscripts(self.data))]
+        while stack:
+            base, items = stack[-1]
+            for key, value in items:
+                path = _render_path(base, key)
+                paths.append(path)
+                if isinstance(value, Mapping) or _is_list(value):
+                    # Resume this container's iterator after the subtree.
+                    stack.append((path, _subscripts(value)))
+                    break
+            else:
+                stack.pop()
+        return paths
 
     def get_paths(self) -> list[str]:
         """Get all extracted paths.
@@ -51,13 +542,31 @@ class PathExtractor:
 class FuzzyMatcher:
     """Fuzzy matching for path suggestions."""
 
-    def __init__(self, paths: list[str]) -> None:
+    def __init__(self, paths: list[str] | PathIndex, maxsize: int = 64) -> None:
         """Initialize with paths.
 
         Args:
-            paths: List of path strings to match against
+            paths: PathIndex of a document, or a list of path strings to
+                index
+            maxsize: Maximum number of partial keys whose candidates are
+                kept for refining the next keystroke
         """
-        self.paths = paths
+        if isinstance(paths, PathIndex):
+            self.index = paths
+        else:
+            self.index = PathIndex.from_paths(paths)
+        self.maxsize = maxsize
+        # (node id, lowercase partial key) -> positions of the keys matching it
+        self._candidates: OrderedDict[tuple[int, str], array] = OrderedDict()
+        # (node id, partial key, limit) -> ranked keys
+        self._rankings: OrderedDict[tuple[int, str, int | None], list[str]] = (
+            OrderedDict()
+        )
+
+    @property
+    def paths(self) -> list[str]:
+        """All path strings, rendered from the index on each access."""
+        return list(self.index.iter_paths())
 
     def _get_path_depth(self, path: str) -> int:
         """Calculate depth of bracket access in path.
@@ -71,72 +580,142 @@ class FuzzyMatcher:
         complete_brackets = re.findall(r"\[[^\]]+\]", path)
         return len(complete_brackets)
 
-    def _matches_prefix(self, path: str, query: str) -> bool:
-        """Check if path matches query prefix.
+    def _next_level(self, query: str, limit: int) -> list[str]:
+        """Suggest the paths one level below the complete part of a query.
 
-        Handles partial keys with fuzzy matching.
+        A trailing partial key (e.g. "['na") keeps the keys it fuzzy
+        matches, best first; a trailing partial index (e.g. "[1") keeps
+        indices starting with it.
 
         Args:
-            path: Full path string
-            query: Query prefix (may be partial)
+            query: Current query string
+            limit: Maximum number of paths
 
         Returns:
-            True if path matches query prefix
+            Matching paths, in document order unless ranked by a partial key
         """
-        if not query or query == "_":
-            return path.startswith("_")
-
-        if path.startswith(query):
-            return True
-
-        path_lower = path.lower()
-
-        bracket_match = re.search(r"\['([^']*)$", query)
-        if bracket_match:
-            partial_key = bracket_match.group(1)
-            base_prefix = query[: bracket_match.start()]
-            if path_lower.startswith(base_prefix.lower()):
-                key_match = re.search(r"\['([^']+)'\]", path[len(base_prefix) :])
-                if key_match:
-                    actual_key = key_match.group(1)
-                    return partial_key.lower() in actual_key.lower()
-
-        return False
-
-    def _has_partial_key(self, query: str) -> bool:
-        """Check if query ends with a partial key.
+        parsed = _parse_path(query or "_")
+        if parsed is None:
+            return []
+        keys, rest = parsed
+        node = self.index.node(keys)
+        if node is None:
+            return []
+
+        base = "_"
+        for key in keys:
+            base = _render_path(base, key)
+
+        children: Iterable[_Key]
+        if not rest:
+            children = (
+                islice(node.children, limit)
+                if isinstance(node, _PathNode)
+                else range(min(node.length, limit))
+            )
+        elif (match := _PARTIAL_KEY.fullmatch(rest)) is not None:
+            if not isinstance(node, _PathNode):
+                return []
+            children = self._rank_keys(node, match.group(1), limit)
+        elif (match := _PARTIAL_INDEX.fullmatch(rest)) is not None:
+            if isinstance(node, _PathNode):
+                return []
+            children = map(int, _indices(node.length, match.group(1), limit))
+        else:
+            return []
+
+        return [_render_path(base, key) for key in children]
+
+    def _rank_keys(self, node: _PathNode, partial: str, limit: int | None) -> list[str]:
+        """Rank the keys of a node against a partially typed key.
+
+        Keys starting with partial are strong matches, found by bisecting
+        the node's sorted keys. The other keys matching partial as a
+        subsequence are found by refining the cached candidates of a
+        shorter typed prefix, or by a regex scan over the node's search
+        text. With a limit, at most _MAX_SCORED keys of each kind are
+        scored (the first in sorted and in document order respectively)
+        and the scan is bounded, so a keystroke costs about the same
+        however wide the node is. Rankings are cached per typed prefix.
 
         Args:
-            query: Query string to check
+            node: Node whose keys are ranked
+            partial: Partially typed key
+            limit: Maximum number of keys, or None for all
 
         Returns:
-            True if query ends with a partial key
+            Matching keys, best first, ties in document order
         """
-        return bool(re.search(r"\['([^']*)$", query))
-
-    def _filter_to_next_level(self, paths: list[str], query: str) -> list[str]:
-        """Filter paths to only show next-level suggestions.
-
-        Args:
-            paths: List of all available paths
-            query: Current query string
+        if not partial:
+            if limit is None:
+                return list(node.children)
+            return list(islice(node.children, limit))
+        ranking_key = (id(node), partial, limit)
+        ranked = self._rankings.get(ranking_key)
+        if ranked is not None:
+            self._rankings.move_to_end(ranking_key)
+            return ranked
+
+        keys = node.lowered()
+        names, lower = keys.keys, keys.lower
+        partial_lower = partial.lower()
+        candidates = self._find_candidates(node, partial_lower, keys)
+        if limit is None:
+            scored: Iterable[int] = candidates
+        else:
+            scored = set(candidates[:_MAX_SCORED])
+            scored.update(_prefix_matches(keys, partial_lower, _MAX_SCORED))
+
+        def rank(i: int) -> tuple[float, int]:
+            score = _score(partial, partial_lower, names[i], lower[i])
+            return (score if score is not None else float("-inf"), -i)
+
+        if limit is None:
+            best = sorted(scored, key=rank, reverse=True)
+        else:
+            best = heapq.nlargest(limit, scored, key=rank)
+        ranked = [names[i] for i in best]
+        _remember(self._rankings, ranking_key, ranked, self.maxsize)
+        return ranked
+
+    def _find_candidates(
+        self, node: _PathNode, partial_lower: str, keys: _KeyText
+    ) -> array:
+        """Return positions of keys containing partial_lower as a subsequence.
+
+        The scan stops after _MAX_CANDIDATES matches or _MAX_SCANNED keys.
+        Only complete lists are cached, since only those can be refined for
+        a longer prefix.
 
         Returns:
-            List of paths at the next level only
+            Positions in document order
         """
-        query_depth = self._get_path_depth(query)
-        target_depth = query_depth + 1
-
-        matched = []
-        for path in paths:
-            if not self._matches_prefix(path, query):
-                continue
-
-            path_depth = self._get_path_depth(path)
-            if path_depth == target_depth:
-                matched.append(path)
-
-        return matched
+        lower, text, starts = keys.lower, keys.text, keys.starts
+        pattern = "[^\n]*?".join(map(re.escape, partial_lower))
+        node_id = id(node)
+        # A key matching "abc" as a subsequence also matches "ab", so the
+        # candidates of a shorter prefix are a superset to filter.
+        for length in range(len(partial_lower), 0, -1):
+            previous = self._candidates.get((node_id, partial_lower[:length]))
+            if previous is not None:
+                search = re.compile(pattern).search
+                candidates = array("q", (i for i in previous if search(lower[i])))
+                break
+        else:
+            # On very wide nodes only the first _MAX_SCANNED keys are
+            # scanned; keys further on are still found by _prefix_matches.
+            # starts[i] - 1 is the newline ending line i - 1.
+            end = starts[min(len(lower), _MAX_SCANNED)] - 1
+            # Unanchored, the regex engine skips ahead to the first
+            # character, several times faster than matching at every line.
+            matches = re.compile(pattern).finditer(text, 0, end)
+            lines = (bisect_right(starts, m.start()) - 1 for m in matches)
+            candidates = array("q", islice(_unique(lines), _MAX_CANDIDATES + 1))
+            if len(candidates) > _MAX_CANDIDATES or end < len(text):
+                return candidates[:_MAX_CANDIDATES]
+
+        _remember(self._candidates, (node_id, partial_lower), candidates, self.maxsize)
+        return candidates
 
     def find_matches(self, query: str, max_results: int = 10) -> list[str]:
         """Find paths that fuzzy match the query.
@@ -148,10 +727,14 @@ class FuzzyMatcher:
         Returns:
             List of matching paths sorted by relevance
         """
-        if not query or query == "_":
-            return self._filter_to_next_level(self.paths, "_")
+        return self._next_level(query or "_", max_results)
 
-        return self._filter_to_next_level(self.paths, query)[:max_results]
+    def _node_at(self, base_path: str) -> _Node | None:
+        """Find the schema node of a complete literal path, if any."""
+        parsed = _parse_path(base_path)
+        if parsed is None or parsed[1]:
+            return None
+        return self.index.node(parsed[0])
 
     def get_keys_at_path(self, base_path: str) -> list[str]:
         """Get available keys at a given path.
@@ -160,29 +743,17 @@ class FuzzyMatcher:
             base_path: The path to get keys for (e.g., "_" or "_['items']")
 
         Returns:
-            List of available keys (string keys or integer indices)
+            List of available keys (string keys, or the first _MAX_INDICES
+            integer indices of a list)
         """
-        keys: set[str] = set()
-
-        for path in self.paths:
-            if not path.startswith(base_path):
-                continue
-
-            remaining = path[len(base_path) :]
-            if not remaining.startswith("[") or len(remaining) < 2:
-                continue
-
-            bracket_content = remaining[1:].split("]")[0]
-
-            if bracket_content.startswith("'"):
-                keys.add(bracket_content.strip("'"))
-            elif bracket_content.startswith('"'):
-                keys.add(bracket_content.strip('"'))
-            elif bracket_content.isdigit():
-                keys.add(bracket_content)
-
+        node = self._node_at(base_path)
+        if node is None:
+            return []
+        if isinstance(node, _ListNode):
+            return _indices(node.length, "", _MAX_INDICES)
         return sorted(
-            keys, key=lambda x: (not x.isdigit(), int(x) if x.isdigit() else x)
+            node.children,
+            key=lambda x: (not x.isdigit(), int(x) if x.isdigit() else x),
         )
 
     def get_common_prefix(self, keys: list[str]) -> str:
@@ -216,6 +787,9 @@ class FuzzyMatcher:
         Returns:
             List of matching keys
         """
+        node = self._node_at(base_path)
+        if isinstance(node, _ListNode):
+            return _indices(node.length, prefix, _MAX_INDICES)
         all_keys = self.get_keys_at_path(base_path)
         if not prefix:
             return all_keys
@@ -4,14 +4,26 @@ from __future__ import annotations
 
 import ast
 from collections import Counter, defaultdict, OrderedDict, deque, namedtuple
-from typing import Any
+from functools import reduce
+from operator import getitem
+import threading
+from types import CodeType
+from typing import Any, NamedTuple
 
 __all__ = [
     "ALLOWED_BUILTINS",
+    "PathResultCache",
+    "QUERY_CACHE_SIZE",
+    "QueryCacheInfo",
     "QueryEvaluationError",
+    "clear_query_cache",
     "evaluate_query",
+    "query_cache_info",
+    "subscript_path",
 ]
 
+QUERY_CACHE_SIZE = 256
+
 
 ALLOWED_BUILTINS = {
     "len": len,
@@ -150,6 +162,103 @@ class QueryEvaluationError(Exception):
     """Raised when query evaluation fails."""
 
 
+class QueryCacheInfo(NamedTuple):
+    """Statistics for the compiled query cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _CompiledQuery(NamedTuple):
+    """A validated query ready for evaluation."""
+
+    code: CodeType
+    keys: tuple[Any, ...] | None
+
+
+class _CompiledQueryCache:
+    """Bounded LRU cache of validated, compiled queries."""
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            maxsize: Maximum number of compiled queries to keep
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, _CompiledQuery] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, expression: str, count: bool = True) -> _CompiledQuery | None:
+        """Return the compiled form of an expression, if cached.
+
+        Args:
+            expression: Query expression text
+            count: Whether the lookup counts towards the hit/miss statistics
+
+        Returns:
+            Compiled query, or None on a cache miss
+        """
+        with self._lock:
+            code = self._entries.get(expression)
+            if code is None:
+                if count:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(expression)
+            if count:
+                self.hits += 1
+            return code
+
+    def put(self, expression: str, code: _CompiledQuery) -> None:
+        """Store a compiled query, evicting the least recently used.
+
+        Args:
+            expression: Query expression text
+            code: Validated, compiled query
+        """
+        with self._lock:
+            self._entries[expression] = code
+            self._entries.move_to_end(expression)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self) -> QueryCacheInfo:
+        """Return current cache statistics."""
+        with self._lock:
+            return QueryCacheInfo(
+                self.hits, self.misses, self.maxsize, len(self._entries)
+            )
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_query_cache = _CompiledQueryCache(QUERY_CACHE_SIZE)
+
+
+def query_cache_info() -> QueryCacheInfo:
+    """Report hit/miss statistics for the compiled query cache.
+
+    Returns:
+        QueryCacheInfo with hits, misses, maxsize and currsize
+    """
+    return _query_cache.info()
+
+
+def clear_query_cache() -> None:
+    """Empty the compiled query cache and reset its statistics."""
+    _query_cache.clear()
+
+
 def _validate_ast(node: ast.AST) -> None:
     """Walk the AST and reject dangerous node types.
 
@@ -203,12 +312,215 @@ def _validate_ast(node: ast.AST) -> None:
             )
 
 
-def evaluate_query(expression: str, data: Any) -> Any:
+def _constant_key(node: ast.AST) -> tuple[bool, Any]:
+    """Extract a constant subscript key from an AST node.
+
+    Args:
+        node: Slice node of an ast.Subscript
+
+    Returns:
+        (True, key) if the node is a constant key, otherwise (False, None)
+    """
+    if isinstance(node, ast.Constant):
+        return True, node.value
+    if (
+        isinstance(node, ast.UnaryOp)
+        and isinstance(node.op, ast.USub)
+        and isinstance(node.operand, ast.Constant)
+        and type(node.operand.value) in (int, float)
+    ):
+        return True, -node.operand.value
+    if isinstance(node, ast.Slice):
+        bounds = []
+        for part in (node.lower, node.upper, node.step):
+            if part is None:
+                bounds.append(None)
+                continue
+            ok, value = _constant_key(part)
+            if not ok or isinstance(value, slice):
+                return False, None
+            bounds.append(value)
+        return True, slice(*bounds)
+    return False, None
+
+
+def _subscript_chain(tree: ast.Expression) -> tuple[Any, ...] | None:
+    """Recognize a chain of constant subscripts applied to '_'.
+
+    Args:
+        tree: Parsed and validated expression
+
+    Returns:
+        Subscript keys for shapes like _['a'][0]['b'], otherwise None
+    """
+    keys: list[Any] = []
+    node = tree.body
+    while isinstance(node, ast.Subscript):
+        ok, key = _constant_key(node.slice)
+        if not ok:
+            return None
+        keys.append(key)
+        node = node.value
+
+    if not (isinstance(node, ast.Name) and node.id == "_"):
+        return None
+
+    keys.reverse()
+    return tuple(keys)
+
+
+def subscript_path(expression: str) -> tuple[Any, ...] | None:
+    """Return the keys of a pure subscript query on '_'.
+
+    Args:
+        expression: Query expression, e.g. "_['items'][0]"
+
+    Returns:
+        Tuple of subscript keys (empty for "_"), or None if the expression
+        is anything other than a chain of constant subscripts on '_'
+    """
+    try:
+        # Inspecting a query is not an evaluation, so it does not count in
+        # query_cache_info(); the compiled form is still shared.
+        compiled = _compile_query(expression, count=False)
+    except QueryEvaluationError:
+        return None
+    return compiled.keys
+
+
+def _compile_query(expression: str, count: bool = True) -> _CompiledQuery:
+    """Parse, validate and compile an expression, reusing cached results.
+
+    Args:
+        expression: Python expression to compile
+        count: Whether the cache lookup counts towards query_cache_info()
+
+    Returns:
+        Compiled query, with the keys of a pure subscript chain extracted
+        for direct traversal
+
+    Raises:
+        QueryEvaluationError: If the expression is invalid or unsafe
+    """
+    cached = _query_cache.get(expression, count)
+    if cached is not None:
+        return cached
+
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise QueryEvaluationError(
+            f"Invalid Python syntax: {e.msg} at position {e.offset}. Check for missing quotes, brackets, or operators."
+        )
+
+    _validate_ast(tree)
+
+    try:
+        code = compile(tree, "<query>", "eval")
+    except SyntaxError as e:
+        raise QueryEvaluationError(
+            f"Invalid Python syntax: {e.msg} at position {e.offset}. Check for missing quotes, brackets, or operators."
+        )
+
+    compiled = _CompiledQuery(code=code, keys=_subscript_chain(tree))
+    _query_cache.put(expression, compiled)
+    return compiled
+
+
+def _typed_prefix(keys: tuple[Any, ...]) -> tuple[tuple[type, Any], ...]:
+    """Pair each subscript key with its type, so 1, 1.0 and True differ."""
+    return tuple((type(key), key) for key in keys)
+
+
+class PathResultCache:
+    """Memoize intermediate results of subscript paths into one document.
+
+    Resolving ('users', 0, 'addr') stores the objects found at ('users',),
+    ('users', 0) and ('users', 0, 'addr'), so extending the path later only
+    walks the new suffix from the deepest cached parent. Prefixes are keyed
+    by the type of each key as well as its value, since keys that compare
+    equal, such as 1, 1.0 and True, can select different objects.
+    """
+
+    def __init__(self, data: Any, maxsize: int = 64) -> None:
+        """Initialize an empty cache for a document.
+
+        Args:
+            data: Document root the paths are resolved against
+            maxsize: Maximum number of path prefixes to keep
+        """
+        self.data = data
+        self.maxsize = maxsize
+        # Typed prefix, as made by _typed_prefix() -> object found there.
+        self._entries: OrderedDict[tuple[tuple[type, Any], ...], Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, keys: tuple[Any, ...]) -> Any:
+        """Resolve a subscript path, reusing the deepest cached prefix.
+
+        Args:
+            keys: Subscript keys as returned by subscript_path()
+
+        Returns:
+            Object found at the path
+
+        Raises:
+            QueryEvaluationError: If any subscript along the path fails
+        """
+        cacheable = len(keys)
+        for i, key in enumerate(keys):
+            if isinstance(key, slice):
+                cacheable = i
+                break
+
+        typed = _typed_prefix(keys[:cacheable])
+        obj = self.data
+        start = 0
+        with self._lock:
+            for depth in range(cacheable, 0, -1):
+                prefix = typed[:depth]
+                if prefix in self._entries:
+                    self._entries.move_to_end(prefix)
+                    obj = self._entries[prefix]
+                    start = depth
+                    break
+
+        resolved: list[tuple[tuple[tuple[type, Any], ...], Any]] = []
+        try:
+            for depth in range(start, len(keys)):
+                obj = obj[keys[depth]]
+                if depth < cacheable:
+                    resolved.append((typed[: depth + 1], obj))
+        except Exception as e:
+            raise _translate_error(e)
+        finally:
+            self._store(resolved)
+        return obj
+
+    def _store(self, resolved: list[tuple[tuple[tuple[type, Any], ...], Any]]) -> None:
+        """Add resolved prefixes, evicting the least recently used."""
+        with self._lock:
+            for prefix, obj in resolved:
+                self._entries[prefix] = obj
+                self._entries.move_to_end(prefix)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+def evaluate_query(
+    expression: str, data: Any, names: dict[str, Any] | None = None
+) -> Any:
     """Safely evaluate a Python expression with data context.
 
+    Plain chains of constant subscripts on '_' (e.g. _['a'][0]['b']) are
+    resolved directly with a precompiled getter chain; everything else is
+    evaluated with eval against the restricted globals.
+
     Args:
         expression: Python expression to evaluate
         data: Document data available as '_' variable
+        names: Extra variables available to the expression, e.g. the
+            loop variables of a comprehension being completed
 
     Returns:
         Result of the expression evaluation
@@ -221,58 +533,70 @@ def evaluate_query(expression: str, data: Any) -> Any:
             "Please enter a query. Try: _, _['key'], or _['items'][0]"
         )
 
-    try:
-        tree = ast.parse(expression, mode="eval")
-    except SyntaxError as e:
-        raise QueryEvaluationError(
-            f"Invalid Python syntax: {e.msg} at position {e.offset}. Check for missing quotes, brackets, or operators."
-        )
+    compiled = _compile_query(expression)
 
-    _validate_ast(tree)
+    if compiled.keys is not None and not (names and "_" in names):
+        try:
+            return reduce(getitem, compiled.keys, data)
+        except Exception as e:
+            raise _translate_error(e)
 
     restricted_globals = {
-        "__builtins__": ALLOWED_BUILTINS,
         "_": data,
+        **(names or {}),
+        "__builtins__": ALLOWED_BUILTINS,
     }
 
     try:
-        return eval(expression, restricted_globals, {"__builtins__": {}})
-    except SyntaxError as e:
-        raise QueryEvaluationError(
+        return eval(compiled.code, restricted_globals, {"__builtins__": {}})
+    except Exception as e:
+        raise _translate_error(e)
+
+
+def _translate_error(e: Exception) -> QueryEvaluationError:
+    """Convert an exception raised by a query into a user-facing error.
+
+    Args:
+        e: Exception raised while evaluating the query
+
+    Returns:
+        QueryEvaluationError with a helpful message
+    """
+    if isinstance(e, SyntaxError):
+        return QueryEvaluationError(
             f"Invalid Python syntax: {e.msg} at position {e.offset}. Check for missing quotes, brackets, or operators."
         )
-    except NameError as e:
+    if isinstance(e, NameError):
         name = str(e).split("'")[1]
         available = ", ".join(sorted(ALLOWED_BUILTINS.keys()))
-        raise QueryEvaluationError(
+        return QueryEvaluationError(
             f"'{name}' is not available. Use '_' to access the document. Available functions: {available}, ..."
         )
-    except TypeError as e:
+    if isinstance(e, TypeError):
         error_msg = str(e)
         if "subscriptable" in error_msg:
-            raise QueryEvaluationError(
+            return QueryEvaluationError(
                 "Cannot use brackets on this type. Make sure you're accessing a dictionary or list, not a string or number."
             )
         elif "not iterable" in error_msg:
-            raise QueryEvaluationError(
+            return QueryEvaluationError(
                 "This value cannot be iterated over. Use it directly or check if it's a list or dict first."
             )
         else:
-            raise QueryEvaluationError(f"Type mismatch: {error_msg}")
-    except KeyError as e:
+            return QueryEvaluationError(f"Type mismatch: {error_msg}")
+    if isinstance(e, KeyError):
         key = str(e).strip("'\"")
-        raise QueryEvaluationError(
+        return QueryEvaluationError(
             f"Key '{key}' not found. Check the document structure or use fuzzy matching to find available keys."
         )
-    except AttributeError as e:
-        raise QueryEvaluationError(
+    if isinstance(e, AttributeError):
+        return QueryEvaluationError(
             f"Invalid attribute access: {e}. Use bracket-style access: _['key']"
         )
-    except ValueError as e:
-        raise QueryEvaluationError(f"Invalid value: {e}")
-    except IndexError:
-        raise QueryEvaluationError(
+    if isinstance(e, ValueError):
+        return QueryEvaluationError(f"Invalid value: {e}")
+    if isinstance(e, IndexError):
+        return QueryEvaluationError(
             "Index out of range. The list is shorter than the index you're trying to access."
         )
-    except Exception as e:
-        raise QueryEvaluationError(f"Query evaluation failed: {e}")
+    return QueryEvaluationError(f"Query evaluation failed: {e}")
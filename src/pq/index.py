@@ -0,0 +1,332 @@
+"""Sidecar byte-offset index module."""
+
+from __future__ import annotations
+
+import json
+import marshal
+import mmap
+import os
+from pathlib import Path
+import struct
+import tempfile
+from typing import IO, Any
+import zlib
+
+from pq.jsonscan import (
+    OPEN_OBJECT,
+    OPENERS,
+    QUOTE,
+    SCALAR,
+    STRING,
+    WHITESPACE,
+    container_end,
+)
+from pq.loader import DocumentLoadError, load_content
+from pq.types import FileTypes
+
+__all__ = [
+    "DEFAULT_INDEX_DEPTH",
+    "INDEX_SUFFIX",
+    "build_index",
+    "index_path",
+    "load_index",
+    "load_indexed",
+]
+
+
+DEFAULT_INDEX_DEPTH = 2
+INDEX_SUFFIX = ".pqidx"
+
+_FORMAT_VERSION = 2
+
+# Magic, format version and header length at the start of an index file. The
+# marshalled header follows, then the entries in hash buckets, each
+# marshalled separately so a lookup only unmarshals the buckets it needs.
+_PREFIX = struct.Struct("<6sHQ")
+_MAGIC = b"PQIDX\0"
+_BUCKET_ENTRIES = 512
+
+_BACKSLASH = ord("\\")
+
+
+def index_path(file_path: Path) -> Path:
+    """Return the sidecar index file for a document, e.g. data.json.pqidx."""
+    return file_path.with_name(file_path.name + INDEX_SUFFIX)
+
+
+def build_index(file_path: Path, depth: int = DEFAULT_INDEX_DEPTH) -> int:
+    """Index the byte spans of a JSON file's values down to a depth.
+
+    The file is scanned once through a memory map. Every object member and
+    array element at most depth subscripts below the root is recorded as
+    (offset, length); deeper containers are skipped bracket by bracket. The
+    index is written next to the file together with the file's size and
+    modification time, so a later edit makes it stale rather than wrong.
+
+    Args:
+        file_path: Uncompressed JSON file to index
+        depth: Number of subscript levels to record
+
+    Returns:
+        Number of indexed paths
+
+    Raises:
+        DocumentLoadError: If the file is missing, compressed, not JSON, or
+            the index cannot be written
+    """
+    if not file_path.is_file():
+        raise DocumentLoadError(f"File not found: {file_path}")
+    if file_path.suffix.lower() != ".json":
+        raise DocumentLoadError(
+            f"Indexes can only be built for uncompressed JSON files: {file_path}"
+        )
+
+    stat = file_path.stat()
+    entries: dict[tuple[Any, ...], tuple[int, int]] = {}
+    if stat.st_size:
+        with open(file_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                start = _skip_ws(buf, 0)
+                if start < len(buf):
+                    _index_value(buf, start, (), depth, entries, str(file_path))
+
+    buckets: list[dict[tuple[Any, ...], tuple[int, int]]] = [
+        {} for _ in range(max(1, len(entries) // _BUCKET_ENTRIES))
+    ]
+    for path, span in entries.items():
+        buckets[_bucket_of(path, len(buckets))][path] = span
+    blobs = [marshal.dumps(bucket) for bucket in buckets]
+    ends = []
+    end = 0
+    for blob in blobs:
+        end += len(blob)
+        ends.append(end)
+    header = marshal.dumps(
+        {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "depth": depth,
+            "buckets": ends,
+        }
+    )
+    target = index_path(file_path)
+    try:
+        # Write to a temporary file first so a query never reads a partial index.
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_PREFIX.pack(_MAGIC, _FORMAT_VERSION, len(header)))
+                f.write(header)
+                f.writelines(blobs)
+            # mkstemp creates the file private; share it like the source.
+            os.chmod(tmp, stat.st_mode & 0o666)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError as e:
+        raise DocumentLoadError(f"Cannot write index {target}: {e}")
+    return len(entries)
+
+
+def load_index(file_path: Path) -> dict[tuple[Any, ...], tuple[int, int]] | None:
+    """Read the whole index of a file, if there is a current one.
+
+    Args:
+        file_path: Source document path
+
+    Returns:
+        Mapping of subscript paths to (offset, length), or None when there
+        is no index or it was built for a different version of the file
+    """
+    try:
+        with open(index_path(file_path), "rb") as f:
+            reader = _IndexReader(f, file_path.stat())
+            entries: dict[tuple[Any, ...], tuple[int, int]] = {}
+            for bucket in range(len(reader.ends)):
+                entries.update(reader.bucket(bucket))
+    except _INVALID_INDEX:
+        return None
+    return entries
+
+
+def load_indexed(file_path: Path, keys: tuple[Any, ...]) -> Any:
+    """Load just enough of an indexed file to resolve a subscript path.
+
+    The longest prefix of keys found in the index is parsed from its byte
+    span alone. The result is a skeleton document of nested dicts holding
+    only that prefix, so evaluating the original query against it yields
+    the same value (and the same errors for the remaining keys) as
+    evaluating it against the whole document. Only the index buckets
+    holding the prefixes looked up are read.
+
+    Args:
+        file_path: Source document path
+        keys: Subscript keys as returned by subscript_path()
+
+    Returns:
+        Skeleton document, or None when the file has no current index or
+        no prefix of keys is indexed
+    """
+    span = None
+    depth = 0
+    try:
+        with open(index_path(file_path), "rb") as f:
+            reader = _IndexReader(f, file_path.stat())
+            for key in keys:
+                # The index holds only str member names and int positions;
+                # keys that merely compare equal to them, such as 1.0 or
+                # True, must not match.
+                if type(key) not in (str, int):
+                    break
+                found = reader.get(keys[: depth + 1])
+                if found is None:
+                    break
+                span = found
+                depth += 1
+    except _INVALID_INDEX:
+        return None
+    if span is None:
+        return None
+
+    offset, length = span
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        raw = f.read(length)
+    document = load_content(content=raw, file_type=FileTypes.json, src=str(file_path))
+    for key in reversed(keys[:depth]):
+        document = {key: document}
+    return document
+
+
+# What reading a missing, truncated, foreign or stale index file raises.
+_INVALID_INDEX = (OSError, EOFError, ValueError, TypeError, KeyError, struct.error)
+
+
+class _IndexReader:
+    """Reads the buckets of an open index file on demand."""
+
+    def __init__(self, f: IO[bytes], stat: os.stat_result) -> None:
+        """Read and check the header of an index file.
+
+        Args:
+            f: Index file opened for binary reading
+            stat: Status of the source document
+
+        Raises:
+            ValueError: If the index is of another format or is stale
+        """
+        magic, version, length = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError("unsupported index format")
+        header = marshal.loads(f.read(length))
+        if header["size"] != stat.st_size or header["mtime_ns"] != stat.st_mtime_ns:
+            raise ValueError("stale index")
+        self.ends: list[int] = header["buckets"]
+        self._f = f
+        self._base = _PREFIX.size + length
+        self._buckets: dict[int, dict[tuple[Any, ...], tuple[int, int]]] = {}
+
+    def bucket(self, number: int) -> dict[tuple[Any, ...], tuple[int, int]]:
+        """Return the entries of one bucket, unmarshalling it once."""
+        entries = self._buckets.get(number)
+        if entries is None:
+            start = self.ends[number - 1] if number else 0
+            self._f.seek(self._base + start)
+            entries = marshal.loads(self._f.read(self.ends[number] - start))
+            self._buckets[number] = entries
+        return entries
+
+    def get(self, path: tuple[Any, ...]) -> tuple[int, int] | None:
+        """Return the (offset, length) of a path, or None if not indexed."""
+        return self.bucket(_bucket_of(path, len(self.ends))).get(path)
+
+
+def _bucket_of(path: tuple[Any, ...], count: int) -> int:
+    """Return the bucket a path is stored in, stable across processes."""
+    return zlib.crc32(repr(path).encode()) % count
+
+
+def _skip_ws(buf: mmap.mmap, pos: int) -> int:
+    return WHITESPACE.match(buf, pos).end()
+
+
+def _error(source: str, message: str, pos: int) -> DocumentLoadError:
+    return DocumentLoadError(f"Invalid JSON in {source}: {message} at byte {pos}")
+
+
+def _index_value(
+    buf: mmap.mmap,
+    pos: int,
+    path: tuple[Any, ...],
+    depth: int,
+    entries: dict[tuple[Any, ...], tuple[int, int]],
+    source: str,
+) -> int:
+    """Record the span of the value at pos and its indexed descendants.
+
+    Returns:
+        Offset just past the value
+    """
+    if pos >= len(buf):
+        raise _error(source, "Unexpected end of input", pos)
+    first = buf[pos]
+    if first in OPENERS:
+        if len(path) < depth:
+            end = _index_container(buf, pos, path, depth, entries, source)
+        else:
+            end = container_end(buf, pos, source)
+    else:
+        match = (STRING if first == QUOTE else SCALAR).match(buf, pos)
+        if match is None:
+            raise _error(source, "Expected a value", pos)
+        end = match.end()
+    if path:
+        entries[path] = (pos, end - pos)
+    return end
+
+
+def _index_container(
+    buf: mmap.mmap,
+    pos: int,
+    path: tuple[Any, ...],
+    depth: int,
+    entries: dict[tuple[Any, ...], tuple[int, int]],
+    source: str,
+) -> int:
+    """Index each member or element of the container opening at pos.
+
+    Returns:
+        Offset just past the closing bracket
+    """
+    is_object = buf[pos] == OPEN_OBJECT
+    closer = b"}" if is_object else b"]"
+    pos = _skip_ws(buf, pos + 1)
+    if buf[pos : pos + 1] == closer:
+        return pos + 1
+
+    index = 0
+    while True:
+        if is_object:
+            match = STRING.match(buf, pos)
+            if match is None:
+                raise _error(source, "Expected a string key", pos)
+            raw = match.group()
+            key: Any = (
+                json.loads(raw) if _BACKSLASH in raw else raw[1:-1].decode("utf-8")
+            )
+            pos = _skip_ws(buf, match.end())
+            if buf[pos : pos + 1] != b":":
+                raise _error(source, "Expected ':'", pos)
+            pos = _skip_ws(buf, pos + 1)
+        else:
+            key = index
+            index += 1
+        pos = _skip_ws(buf, _index_value(buf, pos, path + (key,), depth, entries, source))
+        char = buf[pos : pos + 1]
+        if char == b",":
+            pos = _skip_ws(buf, pos + 1)
+        elif char == closer:
+            return pos + 1
+        else:
+            raise _error(source, f"Expected ',' or '{closer.decode()}'", pos)
@@ -0,0 +1,64 @@
+"""JSON byte-scanning module."""
+
+from __future__ import annotations
+
+import re
+
+from pq.loader import Content, DocumentLoadError
+
+__all__ = [
+    "OPENERS",
+    "OPEN_ARRAY",
+    "OPEN_OBJECT",
+    "QUOTE",
+    "SCALAR",
+    "STRING",
+    "WHITESPACE",
+    "container_end",
+]
+
+
+WHITESPACE = re.compile(rb"[ \t\n\r]*")
+STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+SCALAR = re.compile(rb"[^,\]}\s]+")
+# Everything up to the next bracket, with strings consumed whole so brackets
+# inside them are never counted. Skipping a container therefore costs one
+# Python step per bracket rather than per token.
+_FILLER = re.compile(rb'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+
+QUOTE = ord('"')
+OPEN_OBJECT = ord("{")
+OPEN_ARRAY = ord("[")
+OPENERS = frozenset(b"[{")
+
+
+def container_end(buf: Content, pos: int, source: str) -> int:
+    """Return the offset just past the JSON container opening at pos.
+
+    Only brackets are inspected one at a time; everything between them,
+    including whole strings, is skipped by a single regex match.
+
+    Args:
+        buf: Buffer holding the JSON document
+        pos: Offset of the opening bracket
+        source: Source description for error messages
+
+    Returns:
+        Offset after the matching closing bracket
+
+    Raises:
+        DocumentLoadError: If the container is not closed
+    """
+    size = len(buf)
+    depth = 0
+    while pos < size:
+        if buf[pos] in OPENERS:
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos = _FILLER.match(buf, pos + 1).end()
+    raise DocumentLoadError(
+        f"Invalid JSON in {source}: Unterminated container at byte {pos}"
+    )
@@ -0,0 +1,412 @@
+"""Lazy, on-demand JSON document module."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Mapping, Sequence
+import json
+import mmap
+import os
+from pathlib import Path
+import threading
+from typing import Any, Iterator, cast
+
+from pq.jsonscan import (
+    OPEN_ARRAY,
+    OPEN_OBJECT,
+    OPENERS,
+    QUOTE,
+    SCALAR,
+    STRING,
+    WHITESPACE,
+    container_end,
+)
+from pq.loader import Content, DocumentLoadError, content_from_file
+from pq.types import FileTypes
+
+__all__ = [
+    "LazyArray",
+    "LazyObject",
+    "lazy_from_content",
+    "load_lazy_document",
+]
+
+
+_TRAILING_WHITESPACE = frozenset((b" ", b"\t", b"\n", b"\r"))
+
+# Guards the scan state of every lazy container. The TUI reads one document
+# from several threads, and a scan interrupted by another thread's lookup
+# would record children at the wrong offsets. Reentrant because a lookup
+# can finish a child container's scan while it scans its parent.
+_SCAN_LOCK = threading.RLock()
+
+
+def _acquire_scan_lock() -> None:
+    _SCAN_LOCK.acquire()
+
+
+def _release_scan_lock() -> None:
+    _SCAN_LOCK.release()
+
+
+def _reset_scan_lock() -> None:
+    global _SCAN_LOCK
+    _SCAN_LOCK = threading.RLock()
+
+
+if hasattr(os, "register_at_fork"):
+    # The TUI forks preview processes while other threads may be scanning.
+    # Forking waits for the scan in progress, so the child never inherits a
+    # half-recorded scan, and the child gets a lock no other thread holds.
+    os.register_at_fork(
+        before=_acquire_scan_lock,
+        after_in_parent=_release_scan_lock,
+        after_in_child=_reset_scan_lock,
+    )
+
+
+class _LazyContainer(ABC):
+    """Shared scanning state for a JSON container inside a byte buffer.
+
+    Children are located by a structural scan that records where each child
+    starts; nothing is parsed until a scalar is read or a container is
+    materialized. The scan stops as soon as the requested child is found and
+    resumes from there on the next lookup. A child container's end is only
+    sought once the scan has to move past it.
+    """
+
+    __slots__ = (
+        "buf",
+        "start",
+        "end",
+        "source",
+        "_pos",
+        "_pending",
+        "_complete",
+        "_children",
+    )
+
+    def __init__(self, buf: Content, start: int, source: str, closer: bytes) -> None:
+        """Initialize a container whose opening bracket is at start.
+
+        Args:
+            buf: Buffer holding the JSON document
+            start: Offset of the container's opening bracket
+            source: Source description for error messages
+            closer: Closing bracket of the container
+        """
+        self.buf = buf
+        self.start = start
+        self.end: int | None = None
+        self.source = source
+        self._pos = self._skip_ws(start + 1)
+        # Start of a child container whose end has not been located yet.
+        self._pending: int | None = None
+        self._complete = False
+        self._children: dict[Any, Any] = {}
+        if self.buf[self._pos : self._pos + 1] == closer:
+            self._complete = True
+            self.end = self._pos + 1
+
+    def _skip_ws(self, pos: int) -> int:
+        return WHITESPACE.match(self.buf, pos).end()
+
+    def _error(self, message: str, pos: int) -> DocumentLoadError:
+        return DocumentLoadError(
+            f"Invalid JSON in {self.source}: {message} at byte {pos}"
+        )
+
+    def _container_end(self, pos: int) -> int:
+        """Return the offset just past the container opening at pos."""
+        return container_end(self.buf, pos, self.source)
+
+    def _record_value(self, pos: int, closer: bytes) -> int:
+        """Note the value starting at pos and move the scan past it.
+
+        Scalars are skipped immediately. For containers the scan position is
+        left pending until a later lookup needs to move past them.
+
+        Returns:
+            The start offset of the value
+        """
+        if pos >= len(self.buf):
+            raise self._error("Unexpected end of input", pos)
+        if self.buf[pos] in OPENERS:
+            self._pending = pos
+            return pos
+        pattern = STRING if self.buf[pos] == QUOTE else SCALAR
+        match = pattern.match(self.buf, pos)
+        if match is None:
+            raise self._error("Expected a value", pos)
+        self._after_value(match.end(), closer)
+        return pos
+
+    def _resume(self, closer: bytes) -> None:
+        """Move the scan past a pending child container."""
+        if self._pending is None:
+            return
+        child = self._child_at(self._pending)
+        if isinstance(child, _LazyContainer) and child._complete:
+            end = cast(int, child.end)
+        else:
+            end = self._container_end(self._pending)
+        self._pending = None
+        self._after_value(end, closer)
+
+    def _child_at(self, start: int) -> Any:
+        """Return the cached child proxy starting at an offset, if any."""
+        return None
+
+    def _after_value(self, pos: int, closer: bytes) -> None:
+        """Consume the separator after a child; mark completion at the closer."""
+        pos = self._skip_ws(pos)
+        char = self.buf[pos : pos + 1]
+        if char == b",":
+            self._pos = self._skip_ws(pos + 1)
+            return
+        if char == closer:
+            self._complete = True
+            self.end = pos + 1
+            self._pos = pos + 1
+            return
+        raise self._error(f"Expected ',' or '{closer.decode()}'", pos)
+
+    def _value_at(self, start: int) -> Any:
+        """Wrap a child container lazily or parse a scalar child."""
+        first = self.buf[start]
+        if first == OPEN_OBJECT:
+            return LazyObject(self.buf, start, self.source)
+        if first == OPEN_ARRAY:
+            return LazyArray(self.buf, start, self.source)
+        pattern = STRING if first == QUOTE else SCALAR
+        match = pattern.match(self.buf, start)
+        if match is None:
+            raise self._error("Expected a value", start)
+        return _loads(match.group(), self.source)
+
+    @abstractmethod
+    def _scan_next(self) -> None:
+        """Record where the next child starts, or mark the scan complete."""
+
+    def _finish(self) -> None:
+        """Scan to the end of the container."""
+        while not self._complete:
+            self._scan_next()
+
+    def materialize(self) -> Any:
+        """Parse the whole container into plain Python objects.
+
+        Returns:
+            dict or list equivalent to this container
+        """
+        with _SCAN_LOCK:
+            if self.end is None:
+                self.end = self._container_end(self.start)
+        return _loads(self.buf[self.start : self.end], self.source)
+
+
+class LazyObject(_LazyContainer, Mapping):
+    """JSON object whose members are located and parsed on first access."""
+
+    __slots__ = ("_starts",)
+
+    def __init__(self, buf: Content, start: int, source: str) -> None:
+        super().__init__(buf, start, source, b"}")
+        self._starts: dict[str, int] = {}
+
+    def _scan_next(self) -> None:
+        """Record where the next member's value starts."""
+        self._resume(b"}")
+        if self._complete:
+            return
+        pos = self._pos
+        match = STRING.match(self.buf, pos)
+        if match is None:
+            raise self._error("Expected a string key", pos)
+        key = _loads(match.group(), self.source)
+        pos = self._skip_ws(match.end())
+        if self.buf[pos : pos + 1] != b":":
+            raise self._error("Expected ':'", pos)
+        self._starts[key] = self._record_value(self._skip_ws(pos + 1), b"}")
+
+    def _child_at(self, start: int) -> Any:
+        for key, value_start in reversed(self._starts.items()):
+            if value_start == start:
+                return self._children.get(key)
+        return None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._children:
+            return self._children[key]
+        with _SCAN_LOCK:
+            while key not in self._starts:
+                if self._complete or not isinstance(key, str):
+                    raise KeyError(key)
+                self._scan_next()
+            child = self._children.get(key)
+            if child is None:
+                child = self._value_at(self._starts[key])
+                self._children[key] = child
+        return child
+
+    def __iter__(self) -> Iterator[str]:
+        with _SCAN_LOCK:
+            self._finish()
+        # Complete containers never change, so no lock is needed from here.
+        return iter(self._starts)
+
+    def __len__(self) -> int:
+        with _SCAN_LOCK:
+            self._finish()
+        return len(self._starts)
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[key]  # type: ignore[index]
+        except KeyError:
+            return False
+        return True
+
+    def __repr__(self) -> str:
+        return f"LazyObject({self.source!r}, offset={self.start})"
+
+
+class LazyArray(_LazyContainer, Sequence):
+    """JSON array whose elements are located and parsed on first access."""
+
+    __slots__ = ("_starts",)
+
+    def __init__(self, buf: Content, start: int, source: str) -> None:
+        super().__init__(buf, start, source, b"]")
+        self._starts: list[int] = []
+
+    def _scan_next(self) -> None:
+        """Record where the next element starts."""
+        self._resume(b"]")
+        if self._complete:
+            return
+        self._starts.append(self._record_value(self._pos, b"]"))
+
+    def _child_at(self, start: int) -> Any:
+        return self._children.get(len(self._starts) - 1)
+
+    def __getitem__(self, index: int | slice) -> Any:  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index in self._children:
+            return self._children[index]
+        with _SCAN_LOCK:
+            if index < 0:
+                self._finish()
+                index += len(self._starts)
+            while index >= len(self._starts) and not self._complete:
+                self._scan_next()
+            if not 0 <= index < len(self._starts):
+                raise IndexError("list index out of range")
+            child = self._children.get(index)
+            if child is None:
+                child = self._value_at(self._starts[index])
+                self._children[index] = child
+        return child
+
+    def __iter__(self) -> Iterator[Any]:
+        index = 0
+        while True:
+            # The lock is not held across yield, where the caller may run
+            # arbitrary code, including lookups from other threads.
+            with _SCAN_LOCK:
+                while index >= len(self._starts) and not self._complete:
+                    self._scan_next()
+                if index >= len(self._starts):
+                    return
+                # Elements are not cached while iterating so memory stays flat.
+                if index in self._children:
+                    value = self._children[index]
+                else:
+                    value = self._value_at(self._starts[index])
+            yield value
+            index += 1
+
+    def __len__(self) -> int:
+        with _SCAN_LOCK:
+            self._finish()
+        return len(self._starts)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, LazyArray)):
+            return list(iter(self)) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"LazyArray({self.source!r}, offset={self.start})"
+
+
+def _loads(raw: bytes, source: str) -> Any:
+    """Parse a complete JSON value from bytes."""
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise DocumentLoadError(
+            f"Invalid JSON in {source}: {e.msg} at line {e.lineno}, column {e.colno}"
+        )
+
+
+def lazy_from_content(content: Content, source: str) -> Any:
+    """Wrap JSON content in lazy proxies.
+
+    Args:
+        content: JSON bytes or memory-mapped file
+        source: Source description for error messages
+
+    Returns:
+        LazyObject or LazyArray for container documents, otherwise the
+        parsed scalar
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    start = WHITESPACE.match(content, 0).end()
+    if start == len(content):
+        raise DocumentLoadError(f"Invalid JSON in {source}: document is empty")
+    if content[start] == OPEN_OBJECT:
+        root: _LazyContainer = LazyObject(content, start, source)
+    elif content[start] == OPEN_ARRAY:
+        root = LazyArray(content, start, source)
+    else:
+        return _loads(content[start:], source)
+    # The root spans the rest of the document, so printing all of it does not
+    # need a scan for its closing bracket; json.loads validates the span.
+    end = len(content)
+    while content[end - 1 : end] in _TRAILING_WHITESPACE:
+        end -= 1
+    root.end = end
+    return root
+
+
+def load_lazy_document(file_path: Path) -> Any:
+    """Open a JSON file for lazy, on-demand access.
+
+    The file stays memory-mapped (compressed files are decompressed into
+    memory); subtrees are parsed only when they are subscripted, iterated or
+    printed.
+
+    Args:
+        file_path: Path to the JSON file
+
+    Returns:
+        Lazy proxy for the document root
+
+    Raises:
+        DocumentLoadError: If the file is missing or not JSON
+    """
+    content, file_type = content_from_file(file_path)
+    if file_type != FileTypes.json:
+        if not isinstance(content, (str, bytes)):
+            content.close()
+        raise DocumentLoadError(f"Lazy loading only supports JSON files: {file_path}")
+    if not isinstance(content, (str, bytes, mmap.mmap)):
+        # A compressed file cannot be mapped; decompress it into memory once.
+        with content:
+            content = content.read()
+    return lazy_from_content(content, str(file_path))
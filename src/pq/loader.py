@@ -2,38 +2,203 @@
 
 from __future__ import annotations
 
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Callable, Iterator, NamedTuple, cast
 from xml.parsers import expat
+import bz2
+import csv
+import functools
+import gzip
+import io
 import json
+import lzma
+import mmap
+import re
 import tomllib
 
 import xmltodict
 import yaml
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None  # type: ignore[assignment]
+
+from pq.cache import load_cached, store_cached
+from pq.table import read_table
 from pq.types import FileTypes
 
 __all__ = [
+    "Content",
     "DocumentLoadError",
+    "LoadedDocument",
     "MAX_FILE_SIZE",
+    "ParserBackend",
+    "SNIFF_SIZE",
     "load_document",
+    "load_document_with_status",
     "content_from_file",
+    "decompress_stream",
+    "file_type_from_path",
+    "open_binary",
+    "iter_json_lines",
+    "iter_yaml_documents",
     "load_content",
+    "parser_backend",
+    "parser_backends",
+    "sniff_file_type",
+    "sniff_stream",
 ]
 
 
 MAX_FILE_SIZE = 2 * 1024 * 1024 * 1024
 
+# Document text from stdin, the raw bytes of a file (usually memory-mapped),
+# or a binary stream that decompresses as it is read.
+Content = str | bytes | mmap.mmap | BinaryIO
+
+_SUFFIX_ALIASES = {"ndjson": FileTypes.jsonl}
+
+_COMPRESSION_SUFFIXES: dict[str, Callable[..., BinaryIO]] = {
+    "gz": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+
+_COMPRESSION_MAGIC: tuple[tuple[bytes, Callable[..., BinaryIO]], ...] = (
+    (b"\x1f\x8b", gzip.open),
+    (b"BZh", bz2.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+)
+
+# 19 digits may exceed the signed 64-bit range (e.g. -9999999999999999999)
+# and 20 the unsigned one.
+_LONG_DIGITS = b"0" * 19
+_LONG_DIGITS_TEXT = re.compile(r"[0-9]{19}")
+_DIGIT_TABLE = bytes.maketrans(b"123456789", b"0" * 9)
+_SCAN_CHUNK_SIZE = 1024 * 1024
+
+_MAGIC_SIZE = max(len(magic) for magic, _ in _COMPRESSION_MAGIC)
+
+# Bytes of stdin examined to guess its format.
+SNIFF_SIZE = 8 * 1024
+
+_TOML_TABLE = re.compile(r"\[\[?\s*[\w\-]+(\s*\.\s*[\w\-\"]+)*\s*\]\]?\s*(#.*)?")
+_TOML_KEY_VALUE = re.compile(r"[\w\-\".]+\s*=\s*\S")
+
+# JSON and TOML parse about as fast as a cache entry unpickles, so only the
+# slow formats are worth caching.
+_CACHED_TYPES = frozenset((FileTypes.yaml, FileTypes.xml))
+
 
 class DocumentLoadError(Exception):
     """Raised when document loading fails."""
 
 
-def load_document(file_path: Path) -> Any:
+class ParserBackend(NamedTuple):
+    """A parser implementation for one file type.
+
+    YAML backends yield each document of a multi-document stream.
+    """
+
+    name: str
+    loads: Callable[[Any], Any]
+    errors: tuple[type[Exception], ...]
+
+
+class LoadedDocument(NamedTuple):
+    """A parsed document and whether the parse cache served it."""
+
+    document: Any
+    from_cache: bool
+
+
+def _json_backends() -> tuple[ParserBackend, ...]:
+    """Return the installed JSON parsers, fastest first."""
+    backends = []
+    if orjson is not None:
+        backends.append(ParserBackend("orjson", orjson.loads, (orjson.JSONDecodeError,)))
+    if msgspec is not None:
+        backends.append(
+            ParserBackend("msgspec", msgspec.json.decode, (msgspec.DecodeError,))
+        )
+    backends.append(ParserBackend("json", json.loads, (json.JSONDecodeError,)))
+    return tuple(backends)
+
+
+def _yaml_backends() -> tuple[ParserBackend, ...]:
+    """Return the available YAML loaders, libyaml first when compiled in."""
+    backends = []
+    if getattr(yaml, "__with_libyaml__", False):
+        backends.append(
+            ParserBackend(
+                "libyaml",
+                functools.partial(yaml.load_all, Loader=yaml.CSafeLoader),
+                (yaml.YAMLError,),
+            )
+        )
+    backends.append(ParserBackend("pyyaml", yaml.safe_load_all, (yaml.YAMLError,)))
+    return tuple(backends)
+
+
+_BACKENDS: dict[FileTypes, tuple[ParserBackend, ...]] = {
+    FileTypes.json: _json_backends(),
+    FileTypes.jsonl: _json_backends(),
+    FileTypes.yaml: _yaml_backends(),
+    FileTypes.xml: (ParserBackend("xmltodict", xmltodict.parse, (expat.ExpatError,)),),
+    FileTypes.toml: (
+        ParserBackend("tomllib", tomllib.loads, (tomllib.TOMLDecodeError,)),
+    ),
+    FileTypes.csv: (ParserBackend("csv", read_table, (csv.Error, ValueError)),),
+    FileTypes.tsv: (ParserBackend("csv", read_table, (csv.Error, ValueError)),),
+}
+
+
+def parser_backends(file_type: FileTypes) -> tuple[ParserBackend, ...]:
+    """Return the installed parsers for a file type in order of preference.
+
+    The last entry is always the standard implementation, which the faster
+    ones fall back to.
+
+    Args:
+        file_type: Document format
+
+    Returns:
+        Available parser backends, fastest first
+    """
+    return _BACKENDS[file_type]
+
+
+def parser_backend(file_type: FileTypes) -> ParserBackend:
+    """Return the parser used for a file type.
+
+    Args:
+        file_type: Document format
+
+    Returns:
+        Fastest installed parser backend
+    """
+    return _BACKENDS[file_type][0]
+
+
+def load_document(
+    file_path: Path, use_cache: bool = True, yaml_documents: bool = False
+) -> Any:
     """Load document from file path.
 
+    YAML and XML documents are served from the on-disk parse cache when the
+    file is unchanged since it was last loaded.
+
     Args:
         file_path: Path to the file to load
+        use_cache: Whether to read and update the parse cache
+        yaml_documents: Whether a YAML stream is always a list of documents
 
     Returns:
         Parsed document
@@ -41,12 +206,61 @@ def load_document(file_path: Path) -> Any:
     Raises:
         DocumentLoadError: If file loading fails
     """
+    return load_document_with_status(file_path, use_cache, yaml_documents).document
+
+
+def load_document_with_status(
+    file_path: Path, use_cache: bool = True, yaml_documents: bool = False
+) -> LoadedDocument:
+    """Load document from file path, noting whether the parse cache served it.
+
+    Args:
+        file_path: Path to the file to load
+        use_cache: Whether to read and update the parse cache
+        yaml_documents: Whether a YAML stream is always a list of documents
+
+    Returns:
+        Parsed document and whether it came from the parse cache
+
+    Raises:
+        DocumentLoadError: If file loading fails
+    """
+    cacheable = use_cache and _is_cacheable(file_path)
+    variant = "yaml-documents" if yaml_documents else ""
+    if cacheable:
+        document = load_cached(file_path, variant)
+        if document is not None:
+            return LoadedDocument(document, True)
+
     content, file_type = content_from_file(file_path)
-    return load_content(content, file_type, str(file_path))
+    try:
+        document = load_content(content, file_type, str(file_path), yaml_documents)
+    finally:
+        if not isinstance(content, (str, bytes)):
+            content.close()
 
+    if cacheable:
+        store_cached(file_path, document, variant=variant)
+    return LoadedDocument(document, False)
+
+
+def _is_cacheable(file_path: Path) -> bool:
+    """Check whether a file's parsed form belongs in the parse cache."""
+    try:
+        return file_path.is_file() and file_type_from_path(file_path) in _CACHED_TYPES
+    except DocumentLoadError:
+        return False
 
-def content_from_file(file_path: Path) -> tuple[str, FileTypes]:
-    """Load document from file path."""
+
+def content_from_file(file_path: Path) -> tuple[Content, FileTypes]:
+    """Load document from file path.
+
+    The file is memory-mapped rather than read and decoded up front, so
+    parsers that accept bytes or a binary stream never need a full text copy.
+    Compressed files (.gz, .bz2, .xz, or matching magic bytes) are returned
+    as a stream that decompresses as the parser reads it. The caller owns the
+    returned mapping or stream and should close it once parsed.
+    """
     if not file_path.exists():
         raise DocumentLoadError(f"File not found: {file_path}")
 
@@ -56,30 +270,273 @@ def content_from_file(file_path: Path) -> tuple[str, FileTypes]:
             f"File too large ({file_size / (1024 * 1024 * 1024):.2f}GB). Maximum size is {MAX_FILE_SIZE / (1024 * 1024 * 1024):.0f}GB"
         )
 
-    ft = FileTypes(file_path.suffix.lstrip("."))
-    return file_path.read_text(encoding="utf-8"), ft
+    file_type = file_type_from_path(file_path)
+    opener = _compression_opener(file_path)
+    if opener is not None:
+        return opener(file_path, "rb"), file_type
+    return _map_file(file_path), file_type
+
+
+def open_binary(file_path: Path) -> BinaryIO:
+    """Open a file for binary reading, decompressing it if needed.
+
+    Args:
+        file_path: Path to the file to open
+
+    Returns:
+        Binary stream of the (decompressed) file contents
+    """
+    opener = _compression_opener(file_path) or open
+    return opener(file_path, "rb")
+
+
+def sniff_file_type(prefix: bytes) -> FileTypes:
+    """Guess the format of a document from its first bytes.
+
+    XML starts with "<"; TOML with a table header followed by "key = value"
+    lines, or with a "key = value" line; JSON with "{" or "[" (several
+    complete JSON values on their own lines are JSON Lines). Lines that all
+    split into the same number of tab or comma separated fields are TSV or
+    CSV. Anything else is treated as YAML.
+
+    Args:
+        prefix: Leading bytes of the document, possibly cut mid-line
+
+    Returns:
+        Most likely file type
+    """
+    text = prefix.decode("utf-8", errors="replace").lstrip("\ufeff")
+    lines = [
+        line.strip()
+        for line in text.splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+    if not lines:
+        return FileTypes.yaml
+    first = lines[0]
+    if first.startswith("<"):
+        return FileTypes.xml
+    if _TOML_TABLE.fullmatch(first) and any(
+        _TOML_KEY_VALUE.match(line) for line in lines[1:]
+    ):
+        return FileTypes.toml
+    if first.startswith(("{", "[")):
+        if len(lines) > 1 and lines[1].startswith(("{", "[")) and _is_json(first):
+            return FileTypes.jsonl
+        return FileTypes.json
+    if _TOML_KEY_VALUE.match(first):
+        return FileTypes.toml
+    # The last line may be cut off, so only complete lines are compared.
+    complete = lines if text.endswith("\n") else lines[:-1]
+    return _delimited_type(complete) or FileTypes.yaml
+
+
+def _delimited_type(lines: list[str]) -> FileTypes | None:
+    """Recognize CSV or TSV from lines with a consistent field count.
+
+    YAML lists ("- a, b") and mappings ("key: a, b") are excluded, since
+    their lines can also contain the same number of commas.
+    """
+    if len(lines) < 2 or lines[0].startswith("-") or ": " in lines[0]:
+        return None
+    for delimiter, file_type in (("\t", FileTypes.tsv), (",", FileTypes.csv)):
+        try:
+            widths = {len(row) for row in csv.reader(lines, delimiter=delimiter)}
+        except csv.Error:
+            continue
+        if len(widths) == 1 and widths.pop() > 1:
+            return file_type
+    return None
+
+
+def _is_json(text: str) -> bool:
+    try:
+        json.loads(text)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+def sniff_stream(stream: BinaryIO) -> tuple[BinaryIO, FileTypes]:
+    """Detect the format of a stream without consuming it.
+
+    At most SNIFF_SIZE bytes are read up front. They are replayed ahead of
+    the rest of the stream, so the parser still sees the whole input and
+    nothing beyond the prefix is buffered or copied.
+
+    Args:
+        stream: Binary stream, e.g. decompressed stdin
+
+    Returns:
+        A stream yielding the complete input, and the detected file type
+    """
+    prefix = stream.read(SNIFF_SIZE)
+    replayed = io.BufferedReader(_PrefixedStream(prefix, stream))
+    return cast(BinaryIO, replayed), sniff_file_type(prefix)
+
+
+class _PrefixedStream(io.RawIOBase):
+    """Raw stream that returns already read bytes before the rest of a stream."""
+
+    def __init__(self, prefix: bytes, stream: BinaryIO) -> None:
+        self._prefix = memoryview(prefix)
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
 
+    def readinto(self, buffer: Any) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
 
-def load_content(content: str, file_type: FileTypes, src: str) -> Any:
-    """Load content using parser based on file type."""
-    match file_type:
-        case "json":
-            return _parse_json(content, src)
-        case "yaml":
-            return _parse_yaml(content, src)
-        case "xml":
-            return _parse_xml(content, src)
-        case "toml":
-            return _parse_toml(content, src)
-        case _:
-            raise RuntimeError(f"{file_type} currently not supported")
 
+def decompress_stream(stream: BinaryIO) -> BinaryIO:
+    """Wrap a stream in a decompressor if it starts with compression magic.
 
-def _parse_json(content: str, source: str) -> Any:
+    Args:
+        stream: Buffered binary stream, e.g. sys.stdin.buffer
+
+    Returns:
+        Decompressing stream, or the original stream if it is not compressed
+    """
+    peek = getattr(stream, "peek", None)
+    if peek is None:
+        return stream
+    head = peek(_MAGIC_SIZE)[:_MAGIC_SIZE]
+    for magic, opener in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return opener(stream, "rb")
+    return stream
+
+
+def _compression_opener(file_path: Path) -> Callable[..., BinaryIO] | None:
+    """Return the opener for a compressed file, detected by suffix or magic."""
+    opener = _COMPRESSION_SUFFIXES.get(file_path.suffix.lstrip("."))
+    if opener is not None:
+        return opener
+    with open(file_path, "rb") as f:
+        head = f.read(_MAGIC_SIZE)
+    for magic, magic_opener in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return magic_opener
+    return None
+
+
+def file_type_from_path(file_path: Path) -> FileTypes:
+    """Derive the file type from a file's suffix.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        File type matching the suffix
+
+    Raises:
+        DocumentLoadError: If the suffix is not a supported file type
+    """
+    suffix = file_path.suffix.lstrip(".")
+    if suffix in _COMPRESSION_SUFFIXES:
+        # data.json.gz is a JSON document.
+        suffix = Path(file_path.stem).suffix.lstrip(".")
+    try:
+        return _SUFFIX_ALIASES.get(suffix) or FileTypes(suffix)
+    except ValueError:
+        raise DocumentLoadError(f"Unsupported file type: {file_path}")
+
+
+def _map_file(file_path: Path) -> bytes | mmap.mmap:
+    """Memory-map a file read-only.
+
+    Args:
+        file_path: Path to the file to map
+
+    Returns:
+        Read-only mapping of the file, or empty bytes for an empty file
+    """
+    with open(file_path, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Zero-length files cannot be mapped.
+            return b""
+
+
+def _as_text(content: Content) -> str:
+    """Decode content to text for parsers that only accept str.
+
+    Decoding straight from the buffer avoids an intermediate bytes copy, and
+    the mapped pages are released once the text exists.
+    """
+    if isinstance(content, str):
+        return content
+    if not isinstance(content, (bytes, mmap.mmap)):
+        wrapper = io.TextIOWrapper(content, encoding="utf-8")
+        try:
+            return wrapper.read()
+        finally:
+            # Leave the stream open for its owner.
+            wrapper.detach()
+    text = str(content, "utf-8")
+    if isinstance(content, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED"):
+        content.madvise(mmap.MADV_DONTNEED)
+    return text
+
+
+def _as_stream(content: Content) -> Content:
+    """Return content in a form streaming parsers can read incrementally.
+
+    A mapping is rewound and handed over as a binary file-like object so the
+    parser pulls and decodes it chunk by chunk.
+    """
+    if isinstance(content, mmap.mmap):
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            content.madvise(mmap.MADV_SEQUENTIAL)
+        content.seek(0)
+    return content
+
+
+def load_content(
+    content: Content, file_type: FileTypes, src: str, yaml_documents: bool = False
+) -> Any:
+    """Load content using parser based on file type.
+
+    With yaml_documents, a YAML stream is parsed into the list of its
+    documents even when it holds only one.
+    """
+    try:
+        match file_type:
+            case "json":
+                return _parse_json(content, src)
+            case "jsonl":
+                return _parse_jsonl(content, src)
+            case "yaml":
+                return _parse_yaml(content, src, yaml_documents)
+            case "xml":
+                return _parse_xml(content, src)
+            case "toml":
+                return _parse_toml(content, src)
+            case "csv":
+                return _parse_table(content, src, ",")
+            case "tsv":
+                return _parse_table(content, src, "\t")
+            case _:
+                raise RuntimeError(f"{file_type} currently not supported")
+    except (OSError, EOFError, lzma.LZMAError) as e:
+        # Raised by the decompressors for truncated or corrupt input.
+        raise DocumentLoadError(f"Failed to decompress {src}: {e}")
+
+
+def _parse_json(content: Content, source: str) -> Any:
     """Parse JSON content.
 
     Args:
-        content: JSON string to parse
+        content: JSON text or bytes to parse
         source: Source description for error messages
 
     Returns:
@@ -88,38 +545,189 @@ def _parse_json(content: str, source: str) -> Any:
     Raises:
         DocumentLoadError: If JSON is invalid
     """
+    if parser_backend(FileTypes.json).name != "json":
+        if not isinstance(content, (str, bytes, mmap.mmap)):
+            content = content.read()
+    backend = _json_backend(content)
+    if backend.name != "json":
+        try:
+            with _buffer(content) as data:
+                return backend.loads(data)
+        except backend.errors:
+            # Fast parsers are stricter than json (NaN, integers over 64
+            # bits), so json decides whether the document is really invalid
+            # and produces the error message.
+            pass
     try:
-        return json.loads(content)
+        return json.loads(_as_text(content))
     except json.JSONDecodeError as e:
         raise DocumentLoadError(
             f"Invalid JSON in {source}: {e.msg} at line {e.lineno}, column {e.colno}"
         )
 
 
-def _parse_yaml(content: str, source: str) -> Any:
+def _json_backend(content: str | bytes | mmap.mmap) -> ParserBackend:
+    """Pick the JSON backend for content without losing integer precision."""
+    backend = parser_backend(FileTypes.json)
+    if backend.name != "json" and _has_long_number(content):
+        return parser_backends(FileTypes.json)[-1]
+    return backend
+
+
+def _has_long_number(content: str | bytes | mmap.mmap) -> bool:
+    """Check for digit runs too long for a 64-bit integer.
+
+    orjson and msgspec turn such integers into floats, silently losing
+    precision, so documents containing them are left to json. Digits inside
+    strings also match, which only costs the faster parse.
+    """
+    if isinstance(content, str):
+        return _LONG_DIGITS_TEXT.search(content) is not None
+    # Mapping every digit to "0" turns the search into a plain substring
+    # find, several times faster than a regex.
+    # Chunks overlap so runs that straddle a boundary are still found.
+    overlap = len(_LONG_DIGITS) - 1
+    for start in range(0, len(content), _SCAN_CHUNK_SIZE):
+        chunk = content[start : start + _SCAN_CHUNK_SIZE + overlap]
+        if chunk.translate(_DIGIT_TABLE).find(_LONG_DIGITS) != -1:
+            return True
+    return False
+
+
+@contextmanager
+def _buffer(content: str | bytes | mmap.mmap) -> Iterator[str | bytes | memoryview]:
+    """Expose content to parsers that take any buffer, without copying it.
+
+    The view of a mapping is released on exit so the mapping can be closed,
+    and its pages are dropped like in _as_text.
+    """
+    if not isinstance(content, mmap.mmap):
+        yield content
+        return
+    with memoryview(content) as view:
+        yield view
+    if hasattr(mmap, "MADV_DONTNEED"):
+        content.madvise(mmap.MADV_DONTNEED)
+
+
+def _parse_jsonl(content: Content, source: str) -> list[Any]:
+    """Parse JSON Lines content into a list of records.
+
+    Args:
+        content: JSON Lines text or bytes to parse
+        source: Source description for error messages
+
+    Returns:
+        List with one parsed value per non-blank line
+
+    Raises:
+        DocumentLoadError: If any line is not valid JSON
+    """
+    if isinstance(content, (str, bytes)):
+        lines: Any = content.splitlines()
+    else:
+        if isinstance(content, mmap.mmap):
+            content.seek(0)
+        lines = iter(content.readline, b"")
+    return list(iter_json_lines(lines, source))
+
+
+def iter_json_lines(lines: Any, source: str) -> Iterator[Any]:
+    """Parse JSON Lines one line at a time.
+
+    Memory use is bounded by the longest line, whatever the input size.
+
+    Args:
+        lines: Iterable of str or bytes lines
+        source: Source description for error messages
+
+    Yields:
+        Parsed value of each non-blank line
+
+    Raises:
+        DocumentLoadError: If a line is not valid JSON
+    """
+    for lineno, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        backend = _json_backend(line)
+        try:
+            value = backend.loads(line)
+        except backend.errors:
+            value = _load_json_line(line, lineno, source)
+        yield value
+
+
+def _load_json_line(line: str | bytes, lineno: int, source: str) -> Any:
+    """Parse one JSON Lines record with the standard json module.
+
+    json also accepts NaN and big integers that fast backends reject.
+
+    Raises:
+        DocumentLoadError: If the line is not valid JSON
+    """
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise DocumentLoadError(
+            f"Invalid JSON Lines in {source}: {e.msg} at line {lineno}, column {e.colno}"
+        )
+
+
+def _parse_yaml(content: Content, source: str, as_list: bool = False) -> Any:
     """Parse YAML content.
 
+    A stream of several "---" separated documents is returned as a list of
+    the documents.
+
     Args:
-        content: YAML string to parse
+        content: YAML text or bytes to parse
         source: Source description for error messages
+        as_list: Whether to return a list for any number of documents
 
     Returns:
         Parsed YAML content
 
+    Raises:
+        DocumentLoadError: If YAML is invalid
+    """
+    documents = list(iter_yaml_documents(_as_stream(content), source))
+    if as_list:
+        return documents
+    if not documents:
+        return None
+    if len(documents) == 1:
+        return documents[0]
+    return documents
+
+
+def iter_yaml_documents(stream: Content, source: str) -> Iterator[Any]:
+    """Parse the documents of a YAML stream one at a time.
+
+    The stream is read incrementally, so memory use is bounded by the
+    largest document rather than the whole stream.
+
+    Args:
+        stream: YAML text, bytes or binary stream
+        source: Source description for error messages
+
+    Yields:
+        Each parsed document
+
     Raises:
         DocumentLoadError: If YAML is invalid
     """
     try:
-        return yaml.safe_load(content)
+        yield from parser_backend(FileTypes.yaml).loads(stream)
     except yaml.YAMLError as e:
         raise DocumentLoadError(f"Invalid YAML in {source}: {e}")
 
 
-def _parse_xml(content: str, source: str) -> Any:
+def _parse_xml(content: Content, source: str) -> Any:
     """Parse XML content.
 
     Args:
-        content: XML string to parse
+        content: XML text or bytes to parse
         source: Source description for error messages
 
     Returns:
@@ -129,18 +737,18 @@ def _parse_xml(content: str, source: str) -> Any:
         DocumentLoadError: If XML is invalid
     """
     try:
-        return xmltodict.parse(content)
+        return xmltodict.parse(_as_stream(content))
     except expat.ExpatError as e:
         raise DocumentLoadError(f"Invalid XML in {source}: {e}")
     except Exception as e:
         raise DocumentLoadError(f"Failed to parse XML from {source}: {e}")
 
 
-def _parse_toml(content: str, source: str) -> Any:
+def _parse_toml(content: Content, source: str) -> Any:
     """Parse TOML content.
 
     Args:
-        content: TOML string to parse
+        content: TOML text or bytes to parse
         source: Source description for error messages
 
     Returns:
@@ -150,6 +758,35 @@ def _parse_toml(content: str, source: str) -> Any:
         DocumentLoadError: If TOML is invalid
     """
     try:
-        return tomllib.loads(content)
+        return tomllib.loads(_as_text(content))
     except tomllib.TOMLDecodeError as e:
         raise DocumentLoadError(f"Invalid TOML in {source}: {e}")
+
+
+def _parse_table(content: Content, source: str, delimiter: str) -> Any:
+    """Parse CSV or TSV content with a header row into a ColumnTable.
+
+    Args:
+        content: Delimited text or bytes to parse
+        source: Source description for error messages
+        delimiter: Field separator
+
+    Returns:
+        ColumnTable that behaves like a list of row mappings
+
+    Raises:
+        DocumentLoadError: If the text is malformed
+    """
+    name = "CSV" if delimiter == "," else "TSV"
+    if isinstance(content, str):
+        # newline="" leaves line endings inside quoted fields to the csv module.
+        lines: Any = io.StringIO(content, newline="")
+    else:
+        if isinstance(content, bytes):
+            content = io.BytesIO(content)
+        content = _as_stream(content)
+        lines = map(bytes.decode, iter(content.readline, b""))
+    try:
+        return read_table(lines, delimiter)
+    except (csv.Error, ValueError) as e:
+        raise DocumentLoadError(f"Invalid {name} in {source}: {e}")
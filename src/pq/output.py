@@ -9,6 +9,23 @@ from typing import Any
 __all__ = ["OutputFormatter"]
 
 
+def _materialize(obj: Any) -> Any:
+    """Convert lazy values nested inside a result for json.dumps.
+
+    Args:
+        obj: Object json.dumps cannot serialize natively
+
+    Returns:
+        Plain Python equivalent of obj
+
+    Raises:
+        TypeError: If obj is not a lazy value
+    """
+    if hasattr(obj, "materialize"):
+        return obj.materialize()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 class OutputFormatter:
     """Format output for display and piping."""
 
@@ -22,12 +39,17 @@ class OutputFormatter:
         Returns:
             Formatted JSON string
         """
+        if hasattr(result, "materialize"):
+            result = result.materialize()
+
         if result is None:
             return "null"
         elif isinstance(result, (str, int, float, bool)):
             return json.dumps(result)
         elif isinstance(result, (dict, list)):
-            return json.dumps(result, indent=2, ensure_ascii=False)
+            return json.dumps(
+                result, indent=2, ensure_ascii=False, default=_materialize
+            )
         else:
             return str(result)
 
@@ -38,7 +60,15 @@ class OutputFormatter:
         Args:
             result: Result to print
         """
-        output = OutputFormatter.format_output(result)
+        OutputFormatter.write_formatted(OutputFormatter.format_output(result))
+
+    @staticmethod
+    def write_formatted(output: str) -> None:
+        """Write already formatted output to stdout.
+
+        Args:
+            output: Text produced by format_output
+        """
         sys.stdout.write(output)
         if not output.endswith("\n"):
             sys.stdout.write("\n")
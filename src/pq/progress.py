@@ -0,0 +1,107 @@
+"""Input progress reporting module."""
+
+from __future__ import annotations
+
+import io
+import sys
+import time
+from typing import Any, BinaryIO, TextIO, cast
+
+__all__ = ["ProgressReader", "with_progress"]
+
+
+# Pipes deliver at most 64 KB per read on Linux; larger reads gain nothing.
+_CHUNK_SIZE = 64 * 1024
+
+_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
+class ProgressReader(io.RawIOBase):
+    """Raw stream wrapper that reports bytes read and throughput on stderr.
+
+    The status line is rewritten in place at most every interval seconds,
+    and a summary is printed once the stream is exhausted.
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        output: TextIO | None = None,
+        interval: float = 0.25,
+    ) -> None:
+        """Initialize the reader.
+
+        Args:
+            stream: Binary stream to read from
+            output: Where to report progress; defaults to sys.stderr
+            interval: Minimum seconds between progress updates
+        """
+        self._stream = stream
+        self._output = output or sys.stderr
+        self._interval = interval
+        self._started = time.monotonic()
+        self._reported = self._started
+        self._done = False
+        self._width = 0
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._stream.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.bytes_read += size
+        if size == 0:
+            self._finish()
+        else:
+            now = time.monotonic()
+            if now - self._reported >= self._interval:
+                self._reported = now
+                self._write(self._status(now))
+        return size
+
+    def _status(self, now: float) -> str:
+        elapsed = max(now - self._started, 1e-9)
+        rate = _format_size(self.bytes_read / elapsed)
+        return f"{_format_size(self.bytes_read)} read ({rate}/s)"
+
+    def _finish(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        now = time.monotonic()
+        self._write(f"{self._status(now)} in {now - self._started:.1f}s", end="\n")
+
+    def _write(self, status: str, end: str = "") -> None:
+        # Pad to the previous length so a shorter line fully overwrites it.
+        self._width = max(self._width, len(status))
+        self._output.write(f"\r{status:<{self._width}}{end}")
+        self._output.flush()
+
+
+def with_progress(stream: BinaryIO) -> BinaryIO:
+    """Wrap a stream so reading it reports progress on stderr.
+
+    Args:
+        stream: Binary stream to read, e.g. sys.stdin.buffer
+
+    Returns:
+        Buffered stream over a ProgressReader
+    """
+    reader = io.BufferedReader(ProgressReader(stream), buffer_size=_CHUNK_SIZE)
+    return cast(BinaryIO, reader)
+
+
+def _format_size(size: float) -> str:
+    """Format a byte count with a binary unit, e.g. "3.2 MB"."""
+    for unit in _UNITS[:-1]:
+        if size < 1024:
+            break
+        size /= 1024
+    else:
+        unit = _UNITS[-1]
+    if unit == "B":
+        return f"{size:.0f} B"
+    return f"{size:.1f} {unit}"
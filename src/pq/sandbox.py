@@ -0,0 +1,235 @@
+"""Resource-limited query evaluation module."""
+
+from __future__ import annotations
+
+import multiprocessing
+from multiprocessing.connection import Connection
+import os
+import signal
+from typing import Any, Callable
+
+from pq.evaluator import QueryEvaluationError, evaluate_query
+from pq.output import OutputFormatter
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+__all__ = ["QueryProcess", "evaluate_formatted", "evaluate_in_subprocess"]
+
+
+# Exit codes (negated signal numbers) of a child killed for lack of memory.
+_MEMORY_EXIT_CODES = frozenset(
+    -getattr(signal, name) for name in ("SIGKILL", "SIGSEGV") if hasattr(signal, name)
+)
+
+
+class QueryProcess:
+    """A computation over a document, running in a child process.
+
+    Where the platform supports fork the child inherits the parsed document
+    directly, so it is neither re-read nor copied up front. The child can be
+    killed at any time, which a thread evaluating Python cannot.
+    """
+
+    def __init__(
+        self,
+        function: Callable[..., Any],
+        *args: Any,
+        max_memory: int | None = None,
+    ) -> None:
+        """Start computing function(*args) in a child process.
+
+        Args:
+            function: Module-level function to call in the child
+            *args: Arguments for function, typically including the document
+            max_memory: Megabytes the child may allocate beyond the loaded
+                document
+
+        Raises:
+            QueryEvaluationError: If max_memory is not supported here
+        """
+        if max_memory is not None and resource is None:
+            raise QueryEvaluationError("--max-memory is not supported on this platform")
+        self.max_memory = max_memory
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        self._conn, child_conn = ctx.Pipe(duplex=False)
+        self._process = ctx.Process(
+            target=_run_child,
+            args=(child_conn, max_memory, function, args),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait until the result is ready or the child has ended.
+
+        Args:
+            timeout: Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            False if the timeout expired first
+        """
+        return self._conn.poll(timeout)
+
+    def result(self) -> Any:
+        """Wait for the child and return what function returned.
+
+        Raises:
+            QueryEvaluationError: If function raised, or the child ended
+                without a result, e.g. because it was killed
+        """
+        try:
+            try:
+                status, payload = self._conn.recv()
+            except EOFError:
+                self._process.join()
+                raise QueryEvaluationError(
+                    _describe_exit(self._process.exitcode, self.max_memory)
+                )
+        finally:
+            self.close()
+        if status == "error":
+            raise QueryEvaluationError(payload)
+        return payload
+
+    def kill(self) -> None:
+        """Stop the child if it is still running. Safe to call from any thread."""
+        if self._process.is_alive():
+            self._process.kill()
+
+    def close(self) -> None:
+        """Stop the child and release the pipe to it."""
+        self.kill()
+        self._process.join()
+        self._conn.close()
+
+
+def evaluate_formatted(expression: str, data: Any) -> str:
+    """Evaluate a query and format its result, as done in the child.
+
+    Args:
+        expression: Python expression to evaluate
+        data: Document data available as '_' variable
+
+    Returns:
+        Result formatted by OutputFormatter.format_output
+    """
+    return OutputFormatter.format_output(evaluate_query(expression, data))
+
+
+def evaluate_in_subprocess(
+    expression: str,
+    data: Any,
+    timeout: float | None = None,
+    max_memory: int | None = None,
+) -> str:
+    """Evaluate a query in a child process with resource limits applied.
+
+    Args:
+        expression: Python expression to evaluate
+        data: Document data available as '_' variable
+        timeout: Seconds the query may run before the child is killed
+        max_memory: Megabytes the query may allocate beyond the loaded
+            document
+
+    Returns:
+        Result formatted by OutputFormatter.format_output
+
+    Raises:
+        QueryEvaluationError: If evaluation fails or a limit is exceeded
+    """
+    process = QueryProcess(evaluate_formatted, expression, data, max_memory=max_memory)
+    if not process.wait(timeout):
+        process.close()
+        raise QueryEvaluationError(
+            f"Query timed out after {timeout:g} seconds and was stopped."
+        )
+    return process.result()
+
+
+def _run_child(
+    conn: Connection,
+    max_memory: int | None,
+    function: Callable[..., Any],
+    args: tuple[Any, ...],
+) -> None:
+    """Call the function inside the child process and send back the outcome.
+
+    Args:
+        conn: Write end of the pipe to the parent
+        max_memory: Megabytes the child may allocate, or None for no limit
+        function: Function to call
+        args: Arguments for function
+    """
+    if max_memory is not None:
+        _limit_memory(max_memory)
+
+    try:
+        outcome = ("ok", function(*args))
+    except QueryEvaluationError as e:
+        if isinstance(e.__context__, MemoryError):
+            outcome = ("error", _memory_message(max_memory))
+        else:
+            outcome = ("error", str(e))
+    except MemoryError:
+        outcome = ("error", _memory_message(max_memory))
+    except Exception as e:
+        # Formatting can fail on results JSON cannot represent, e.g. dicts
+        # with tuple keys.
+        outcome = ("error", f"Cannot display result: {e}")
+
+    conn.send(outcome)
+    conn.close()
+
+
+def _limit_memory(max_memory: int) -> None:
+    """Cap the address space of the current process.
+
+    The limit is relative to the current size so the inherited document does
+    not count against the query's allowance.
+
+    Args:
+        max_memory: Megabytes the process may grow by
+    """
+    assert resource is not None
+    limit = _address_space_size() + max_memory * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _address_space_size() -> int:
+    """Return the current virtual memory size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[0])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        assert resource is not None
+        # ru_maxrss is kilobytes on Linux and bytes on macOS; either way it
+        # is a conservative stand-in when /proc is unavailable.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _memory_message(max_memory: int | None) -> str:
+    """Build the error shown when a query runs out of memory."""
+    if max_memory is None:
+        return "Query ran out of memory."
+    return f"Query exceeded the memory limit of {max_memory} MB and was stopped."
+
+
+def _describe_exit(exitcode: int | None, max_memory: int | None) -> str:
+    """Explain why the child process ended without reporting a result.
+
+    Hitting the address-space limit outside Python's allocator (e.g. in a C
+    extension or the kernel's OOM handling) ends the child with SIGSEGV or
+    SIGKILL; only those exits are blamed on the memory limit.
+    """
+    if max_memory is not None and exitcode in _MEMORY_EXIT_CODES:
+        return _memory_message(max_memory)
+    return f"Query process exited unexpectedly (exit code {exitcode})."
@@ -0,0 +1,509 @@
+"""Streaming record parsing module."""
+
+from __future__ import annotations
+
+from itertools import islice
+import io
+import json
+from pathlib import Path
+import queue
+import re
+import threading
+from typing import Any, BinaryIO, Callable, Iterator
+from xml.parsers import expat
+
+import xmltodict
+
+from pq.loader import (
+    DocumentLoadError,
+    file_type_from_path,
+    open_binary,
+    iter_json_lines,
+    iter_yaml_documents,
+    load_content,
+    load_document,
+)
+from pq.types import FileTypes
+
+__all__ = [
+    "JSONArrayStream",
+    "iter_json_array",
+    "iter_json_records",
+    "iter_records",
+    "iter_xml_items",
+    "open_records",
+]
+
+
+_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# A decode error this close to the end of the buffer may be a token cut off
+# by the chunk boundary, such as a literal, a number or a \uXXXX escape.
+_TOKEN_MARGIN = 16
+
+# Parsed XML items allowed to wait for the consumer before the parser blocks.
+_XML_QUEUE_SIZE = 64
+
+_XML_DONE = object()
+
+
+def _maybe_truncated(error: json.JSONDecodeError, length: int) -> bool:
+    """Check whether a decode error may only mean the buffer ends too early.
+
+    Args:
+        error: Error raised while decoding the buffer
+        length: Number of characters in the buffer
+
+    Returns:
+        True if the error is within the last few characters, where a token
+        such as "tru" or "\\u12" may be cut off, or is an unterminated
+        string, which is reported at its start
+    """
+    return (
+        error.pos >= length - _TOKEN_MARGIN
+        or error.msg.startswith("Unterminated string")
+    )
+
+
+class _JSONReader:
+    """Pull JSON tokens and values from a binary stream a chunk at a time."""
+
+    def __init__(self, stream: BinaryIO, source: str) -> None:
+        """Initialize the reader.
+
+        Args:
+            stream: Binary stream containing UTF-8 JSON
+            source: Source description for error messages
+        """
+        self.text = io.TextIOWrapper(stream, encoding="utf-8")
+        self.source = source
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.consumed = 0
+
+    def detach(self) -> None:
+        """Release the underlying stream without closing it."""
+        self.text.detach()
+
+    def _fill(self, size: int = _CHUNK_SIZE) -> bool:
+        """Append the next chunk to the buffer, dropping consumed text.
+
+        Args:
+            size: Number of characters to read
+
+        Returns:
+            False once the stream is exhausted
+        """
+        if self.eof:
+            return False
+        chunk = self.text.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.consumed += self.pos
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it.
+
+        Returns:
+            Next significant character, or "" at end of input
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume a structural character.
+
+        Args:
+            char: Character that must come next
+
+        Raises:
+            DocumentLoadError: If the next character is different
+        """
+        found = self.peek()
+        if found != char:
+            raise self.error(f"Expected '{char}' but found '{found or 'end of input'}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value.
+
+        Returns:
+            Parsed value
+
+        Raises:
+            DocumentLoadError: If the value is invalid
+        """
+        self.peek()
+        size = _CHUNK_SIZE
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # Only an error at the end of the buffer can be cured by
+                # more input; anything earlier is reported at once rather
+                # than after buffering the rest of the stream.
+                if _maybe_truncated(e, len(self.buf)) and self._fill(size):
+                    size *= 2
+                    continue
+                self.pos = e.pos
+                raise self.error(e.msg)
+            # A number or literal that ends exactly at the buffer edge may
+            # continue in the next chunk.
+            if end == len(self.buf) and self._fill(size):
+                size *= 2
+                continue
+            self.pos = end
+            return value
+
+    def error(self, message: str) -> DocumentLoadError:
+        """Build a load error pointing at the current character offset."""
+        offset = self.consumed + self.pos
+        return DocumentLoadError(
+            f"Invalid JSON in {self.source}: {message} at character {offset}"
+        )
+
+    def descend(self, keys: tuple[Any, ...]) -> None:
+        """Advance to the value found at a subscript path.
+
+        Sibling values passed on the way are decoded and discarded one at a
+        time, so memory is bounded by the largest sibling.
+
+        Args:
+            keys: Subscript keys, e.g. ("data", "items")
+
+        Raises:
+            DocumentLoadError: If the path does not exist
+        """
+        for key in keys:
+            if isinstance(key, str):
+                self._descend_object(key)
+            elif isinstance(key, int) and key >= 0:
+                self._descend_array(key)
+            else:
+                raise DocumentLoadError(
+                    f"Unsupported array path key {key!r}; use string keys and non-negative indices"
+                )
+
+    def _descend_object(self, key: str) -> None:
+        """Advance to the value of a key in the next object."""
+        self.expect("{")
+        if self.peek() != "}":
+            while True:
+                name = self.value()
+                self.expect(":")
+                if name == key:
+                    return
+                self.value()
+                if self.peek() != ",":
+                    break
+                self.pos += 1
+        raise DocumentLoadError(f"Key '{key}' not found in {self.source}")
+
+    def _descend_array(self, index: int) -> None:
+        """Advance to an element of the next array."""
+        self.expect("[")
+        for _ in range(index):
+            if self.peek() == "]":
+                break
+            self.value()
+            if self.peek() != ",":
+                break
+            self.pos += 1
+        else:
+            if self.peek() != "]":
+                return
+        raise DocumentLoadError(f"Index {index} out of range in {self.source}")
+
+    def elements(self) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                self.pos -= 1
+                raise self.error("Expected ',' or ']' between array elements")
+
+
+def iter_json_array(
+    stream: BinaryIO, keys: tuple[Any, ...] = (), source: str = "stdin"
+) -> Iterator[Any]:
+    """Yield the elements of a JSON array one at a time.
+
+    Only one element is held in memory at once, so arrays far larger than
+    available memory can be processed.
+
+    Args:
+        stream: Binary stream containing UTF-8 JSON
+        keys: Subscript path to the array; empty for a top-level array
+        source: Source description for error messages
+
+    Yields:
+        Parsed array elements
+
+    Raises:
+        DocumentLoadError: If the JSON is invalid or the path is not an array
+    """
+    reader = _JSONReader(stream, source)
+    try:
+        reader.descend(keys)
+        yield from reader.elements()
+    finally:
+        reader.detach()
+
+
+def iter_json_records(stream: BinaryIO, source: str = "stdin") -> Iterator[Any]:
+    """Yield the records of a JSON stream.
+
+    A top-level array yields its elements incrementally; any other document
+    is yielded whole as a single record.
+
+    Args:
+        stream: Binary stream containing UTF-8 JSON
+        source: Source description for error messages
+
+    Yields:
+        Parsed records
+    """
+    reader = _JSONReader(stream, source)
+    try:
+        if reader.peek() == "[":
+            yield from reader.elements()
+        else:
+            value = reader.value()
+            if reader.peek():
+                raise reader.error("Extra data")
+            yield value
+    finally:
+        reader.detach()
+
+
+def iter_xml_items(
+    stream: BinaryIO, item_depth: int, source: str = "stdin"
+) -> Iterator[Any]:
+    """Yield the XML elements found at a nesting depth one at a time.
+
+    xmltodict reports items through a callback, so the parser runs in a
+    background thread and hands items over through a bounded queue. Memory
+    is bounded by the queue size times the largest item, and the parser is
+    stopped if the consumer stops early.
+
+    Args:
+        stream: Binary stream containing XML
+        item_depth: Depth of the elements to yield; 1 is the root element,
+            2 its children
+        source: Source description for error messages
+
+    Yields:
+        Each element at item_depth, converted like xmltodict.parse
+
+    Raises:
+        DocumentLoadError: If the XML is invalid
+    """
+    items: queue.Queue = queue.Queue(maxsize=_XML_QUEUE_SIZE)
+    stopped = threading.Event()
+
+    def handle_item(path: list, item: Any) -> bool:
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def parse() -> None:
+        outcome: Any = _XML_DONE
+        try:
+            xmltodict.parse(stream, item_depth=item_depth, item_callback=handle_item)
+        except xmltodict.ParsingInterrupted:
+            return
+        except expat.ExpatError as e:
+            outcome = DocumentLoadError(f"Invalid XML in {source}: {e}")
+        except Exception as e:
+            outcome = DocumentLoadError(f"Failed to parse XML from {source}: {e}")
+        while not stopped.is_set():
+            try:
+                items.put(outcome, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    worker = threading.Thread(target=parse, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _XML_DONE:
+                return
+            if isinstance(item, DocumentLoadError):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        worker.join()
+
+
+class JSONArrayStream:
+    """Lazily iterated JSON array, usable as '_' in queries.
+
+    Iterating re-reads the source from the start, so queries like
+    len(_) and [x for x in _ if ...] never hold more than one element in
+    memory. Sources that can only be read once (stdin) may be iterated once.
+    """
+
+    def __init__(
+        self,
+        opener: Callable[[], BinaryIO],
+        keys: tuple[Any, ...] = (),
+        source: str = "stdin",
+        reopenable: bool = True,
+    ) -> None:
+        """Initialize the stream.
+
+        Args:
+            opener: Callable returning a fresh binary stream of the document
+            keys: Subscript path to the array; empty for a top-level array
+            source: Source description for error messages
+            reopenable: Whether opener may be called more than once
+        """
+        self.opener = opener
+        self.keys = keys
+        self.source = source
+        self.reopenable = reopenable
+        self._opened = False
+        self._length: int | None = None
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._opened and not self.reopenable:
+            raise DocumentLoadError(
+                f"The array from {self.source} can only be iterated once"
+            )
+        self._opened = True
+        stream = self.opener()
+        try:
+            yield from iter_json_array(stream, self.keys, self.source)
+        finally:
+            if self.reopenable:
+                stream.close()
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._length = sum(1 for _ in self)
+        return self._length
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            if all(i is None or i >= 0 for i in (index.start, index.stop)):
+                return list(islice(self, index.start, index.stop, index.step))
+            return self.materialize()[index]
+        if index < 0:
+            return self.materialize()[index]
+        for element in islice(self, index, None):
+            return element
+        raise IndexError("list index out of range")
+
+    def __repr__(self) -> str:
+        return f"JSONArrayStream({self.source!r}, keys={self.keys!r})"
+
+    def materialize(self) -> list[Any]:
+        """Read every element into a list.
+
+        Returns:
+            List of all array elements
+        """
+        # list(self) would call __len__ first, costing an extra pass.
+        return list(iter(self))
+
+
+def open_records(
+    file_path: Path,
+    keys: tuple[Any, ...] | None = None,
+    use_cache: bool = True,
+    xml_item_depth: int | None = None,
+) -> Iterator[Any]:
+    """Yield the records of a file one at a time.
+
+    JSON Lines files yield one record per line, JSON arrays one record per
+    element and YAML streams one record per document, all read
+    incrementally so memory use does not depend on the file size and
+    MAX_FILE_SIZE does not apply. XML yields the elements at xml_item_depth
+    when it is given. Other formats are loaded whole and yielded as a single
+    record.
+
+    Args:
+        file_path: Path to the file to read
+        keys: Subscript path to the JSON array to stream, if not top-level
+        use_cache: Whether whole-document formats may use the parse cache
+        xml_item_depth: Depth of the XML elements to yield as records
+
+    Yields:
+        Parsed records
+
+    Raises:
+        DocumentLoadError: If the file is missing or a record is invalid
+    """
+    if not file_path.exists():
+        raise DocumentLoadError(f"File not found: {file_path}")
+
+    file_type = file_type_from_path(file_path)
+    streamable = (FileTypes.json, FileTypes.jsonl, FileTypes.yaml)
+    if file_type not in streamable and not (
+        file_type == FileTypes.xml and xml_item_depth is not None
+    ):
+        yield load_document(file_path, use_cache=use_cache)
+        return
+
+    with open_binary(file_path) as f:
+        yield from iter_records(f, file_type, str(file_path), keys, xml_item_depth)
+
+
+def iter_records(
+    stream: BinaryIO,
+    file_type: FileTypes,
+    src: str,
+    keys: tuple[Any, ...] | None = None,
+    xml_item_depth: int | None = None,
+) -> Iterator[Any]:
+    """Yield records parsed incrementally from a binary stream.
+
+    Args:
+        stream: Binary stream to read, e.g. sys.stdin.buffer
+        file_type: Format of the stream
+        src: Source description for error messages
+        keys: Subscript path to the JSON array to stream, if not top-level
+        xml_item_depth: Depth of the XML elements to yield as records
+
+    Yields:
+        Parsed records
+    """
+    match file_type:
+        case "jsonl":
+            yield from iter_json_lines(stream, src)
+        case "yaml":
+            yield from iter_yaml_documents(stream, src)
+        case "xml" if xml_item_depth is not None:
+            yield from iter_xml_items(stream, xml_item_depth, src)
+        case "json" if keys is not None:
+            yield from iter_json_array(stream, keys, src)
+        case "json":
+            yield from iter_json_records(stream, src)
+        case _:
+            yield load_content(stream.read(), file_type, src)
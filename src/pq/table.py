@@ -0,0 +1,217 @@
+"""Column-oriented table module for CSV and TSV documents."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping, Sequence
+import csv
+from itertools import islice
+import re
+import sys
+from typing import Any, Iterable, Iterator
+
+__all__ = ["ColumnTable", "Row", "read_table"]
+
+
+# Rows are transposed into columns this many at a time, which keeps the
+# transposition in C without holding every row in memory at once.
+_CHUNK_ROWS = 1_000
+
+# Only canonical spellings are converted, so "007" or "1_000" stay strings.
+# Converted values do not always print as their cells: a column with any
+# non-integer number is float throughout ("10" becomes 10.0, "1e3" 1000.0),
+# and an integer column reads "-0" as 0. A whole column is checked with one
+# match over its newline-joined cells.
+_INTEGER = r"-?(?:0|[1-9][0-9]*)"
+_NUMBER = _INTEGER + r"(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?"
+_INTEGER_COLUMN = re.compile(rf"{_INTEGER}(?:\n{_INTEGER})*")
+_NUMBER_COLUMN = re.compile(rf"{_NUMBER}(?:\n{_NUMBER})*")
+
+
+class ColumnTable(Sequence):
+    """Table stored as one compact column per header.
+
+    Integer and float columns are typed arrays; other columns are lists of
+    strings in which repetitive values are interned. The table behaves
+    like a list of row mappings, and each row is a view into the columns
+    rather than a dict of its own.
+    """
+
+    __slots__ = ("columns", "_length")
+
+    def __init__(self, columns: dict[str, Sequence[Any]], length: int) -> None:
+        """Initialize a table from its columns.
+
+        Args:
+            columns: Column values by header, all of the same length
+            length: Number of rows
+        """
+        self.columns = columns
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int | slice) -> Any:  # type: ignore[override]
+        if isinstance(index, slice):
+            return [Row(self, i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("list index out of range")
+        return Row(self, index)
+
+    def __iter__(self) -> Iterator[Row]:
+        for index in range(self._length):
+            yield Row(self, index)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, ColumnTable)):
+            return len(self) == len(other) and all(
+                row == item for row, item in zip(self, other)
+            )
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def materialize(self) -> list[dict[str, Any]]:
+        """Convert the table to a list of row dicts.
+
+        Returns:
+            One dict per row
+        """
+        names = list(self.columns)
+        return [dict(zip(names, values)) for values in zip(*self.columns.values())]
+
+    def __repr__(self) -> str:
+        return f"ColumnTable(columns={list(self.columns)!r}, rows={self._length})"
+
+
+class Row(Mapping):
+    """One table row, read from the table's columns on access."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: ColumnTable, index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        return self._table.columns[key][self._index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.columns)
+
+    def __len__(self) -> int:
+        return len(self._table.columns)
+
+    def materialize(self) -> dict[str, Any]:
+        """Convert the row to a dict.
+
+        Returns:
+            Mapping of header to value
+        """
+        index = self._index
+        return {name: column[index] for name, column in self._table.columns.items()}
+
+    def __repr__(self) -> str:
+        return repr(self.materialize())
+
+
+def read_table(lines: Iterable[str], delimiter: str = ",") -> ColumnTable:
+    """Read delimited text with a header row into a ColumnTable.
+
+    Blank lines are skipped. Columns whose cells are all integers or all
+    numbers become typed arrays.
+
+    Args:
+        lines: Text lines, e.g. a file opened with newline=""
+        delimiter: Field separator
+
+    Returns:
+        Table with one column per header
+
+    Raises:
+        csv.Error: If the text cannot be parsed
+        ValueError: If headers repeat or a row has the wrong number of fields
+    """
+    reader = csv.reader(lines, delimiter=delimiter)
+    header = next((row for row in reader if row), None)
+    if header is None:
+        return ColumnTable({}, 0)
+    # Spreadsheet exports often start with a byte order mark.
+    header[0] = header[0].lstrip("\ufeff")
+    names = [sys.intern(name) for name in header]
+    if len(set(names)) != len(names):
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        raise ValueError(f"Duplicate column names: {', '.join(duplicates)}")
+
+    width = len(names)
+    builders = [_ColumnBuilder() for _ in names]
+    length = 0
+    rows = filter(None, reader)
+    while chunk := list(islice(rows, _CHUNK_ROWS)):
+        if set(map(len, chunk)) != {width}:
+            offset, row = next(
+                (offset, row) for offset, row in enumerate(chunk) if len(row) != width
+            )
+            raise ValueError(
+                f"Row {length + offset + 1} has {len(row)} fields, expected {width}"
+            )
+        for builder, values in zip(builders, zip(*chunk)):
+            builder.extend(values)
+        length += len(chunk)
+
+    columns = {name: builder.finish() for name, builder in zip(names, builders)}
+    return ColumnTable(columns, length)
+
+
+class _ColumnBuilder:
+    """Accumulate one column chunk by chunk in its most compact form.
+
+    A column starts as an integer array, widens to a float array, and falls
+    back to a list of strings at the first chunk that is not numeric. The
+    text of numeric chunks is kept as one joined string per chunk, so the
+    original cells can be restored exactly on that fallback.
+    """
+
+    __slots__ = ("numbers", "chunks", "strings")
+
+    def __init__(self) -> None:
+        self.numbers: array = array("q")
+        self.chunks: list[str] = []
+        self.strings: list[str] | None = None
+
+    def extend(self, values: tuple[str, ...]) -> None:
+        if self.strings is None:
+            joined = "\n".join(values)
+            try:
+                if self.numbers.typecode == "q" and _INTEGER_COLUMN.fullmatch(joined):
+                    self.numbers.extend(array("q", map(int, values)))
+                    self.chunks.append(joined)
+                    return
+                if _NUMBER_COLUMN.fullmatch(joined):
+                    if self.numbers.typecode == "q":
+                        self.numbers = array("d", self.numbers)
+                    self.numbers.extend(array("d", map(float, values)))
+                    self.chunks.append(joined)
+                    return
+            except (ValueError, OverflowError):
+                # A quoted cell containing a newline matched as several
+                # numbers, or an integer does not fit in 64 bits.
+                pass
+            self.strings = [text for chunk in self.chunks for text in chunk.split("\n")]
+            self.numbers = array("q")
+            self.chunks = []
+        # Interning pays off for repetitive columns such as categories; for
+        # mostly unique values it would only cost time.
+        if len(set(values)) * 2 <= len(values):
+            self.strings.extend(map(sys.intern, values))
+        else:
+            self.strings.extend(values)
+
+    def finish(self) -> Sequence[Any]:
+        """Return the compact column."""
+        if self.strings is not None:
+            return self.strings
+        return self.numbers
@@ -1,53 +1,233 @@
 """Main Textual application module."""
 
 import asyncio
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import queue
 import re
-from typing import Any, ClassVar, cast
+import threading
+from typing import Any, Callable, ClassVar, cast
 
 from rich.syntax import Syntax
 from textual.app import App, ComposeResult
 from textual.binding import BindingType
+from textual.message import Message
 from textual.types import CSSPathType
 from textual.widget import Widget
-from textual.widgets import Footer, Header, OptionList, Static
+from textual.widgets import Footer, Header, OptionList, ProgressBar, Static
 from textual.widgets._input import Input as BaseInput, Selection
 from textual.widgets.option_list import Option
 
-from pq.completion import FuzzyMatcher, PathExtractor
-from pq.evaluator import QueryEvaluationError, evaluate_query
+from pq.completion import FuzzyMatcher, PathIndex
+from pq.evaluator import (
+    PathResultCache,
+    QueryEvaluationError,
+    evaluate_query,
+    subscript_path,
+)
 from pq.output import OutputFormatter
+from pq.sandbox import QueryProcess, evaluate_formatted
 from pq.theme_mapping import map_theme_to_pygments
 
-_BRACKET_PATH_RE = r"(_(?:\[(?:\d+|'[^']*'|\"[^\"]*\")\])*)"
-
 _DEBOUNCE_DELAY = 0.15
 
+# Tab waits at most this long (seconds) for the expression being subscripted.
+_COMPLETION_BUDGET = 0.2
+_COMPLETION_CACHE_SIZE = 32
+
+_STATUS_HINT = "Type a Python expression to query the data. Press Enter to exit."
+
+_LOADING_HINT = "Loading document… keep typing, the query runs once it is loaded."
+
+_COMPLETION_PENDING = "Still evaluating the expression to complete. Press Tab again."
+
+
+# An unclosed subscript at the end of the text: "[", "['partial" or '["partial'.
+_OPEN_SUBSCRIPT_RE = re.compile(r"\[(?:(['\"])([^'\"]*))?$")
+# "_" followed by constant subscripts, answered from the path index.
+_LITERAL_PATH_RE = re.compile(r"_(?:\[(?:\d+|'[^']*'|\"[^\"]*\")\])*")
+# "for <target> in " of a comprehension, and the keywords that end its iterable.
+_FOR_CLAUSE_RE = re.compile(r"\bfor\s+([A-Za-z_][\w\s,()]*?)\s+in\b\s*")
+_CLAUSE_END_RE = re.compile(r"\s+(?:for|if)\b")
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_]\w*")
+
+_OPENERS = {")": "(", "]": "[", "}": "{"}
+
+# (expression, comprehension clauses) whose keys Tab completes.
+_CompletionKey = tuple[str, tuple[tuple[str, str], ...]]
+
 
-def _parse_bracket_context(before_cursor: str) -> tuple[str, str, str] | None:
-    """Parse bracket context from text before cursor.
+def _expression_before(text: str) -> str:
+    """Return the expression that ends text, e.g. "f(x)[0]" in "1 + f(x)[0]".
 
-    Returns (base_path, partial_key, quote_char) or None if not in a bracket.
+    The text is walked backwards over names, attribute dots, string literals
+    and balanced brackets, stopping at an unmatched opening bracket or at
+    anything else outside brackets.
+
+    Args:
+        text: Text before a subscript
+
+    Returns:
+        The trailing expression, or "" if there is none
+    """
+    closers: list[str] = []
+    i = len(text) - 1
+    while i >= 0:
+        char = text[i]
+        if char in "'\"":
+            i = text.rfind(char, 0, i)
+            if i < 0:
+                return ""
+        elif char in _OPENERS:
+            closers.append(char)
+        elif char in "([{":
+            if not closers or _OPENERS[closers.pop()] != char:
+                break
+        elif not closers and not (char.isalnum() or char in "_."):
+            break
+        i -= 1
+    return text[i + 1 :]
+
+
+def _comprehension_clauses(text: str, expression: str) -> tuple[tuple[str, str], ...]:
+    """Find the comprehension clauses that bind names used in an expression.
+
+    Args:
+        text: Whole query, which may continue past the cursor
+        expression: Expression whose names must be bound
+
+    Returns:
+        (target, iterable) pairs in query order, up to the last clause
+        binding a name the expression uses
+    """
+    used = set(_IDENTIFIER_RE.findall(expression))
+    clauses: list[tuple[str, str]] = []
+    needed = 0
+    for match in _FOR_CLAUSE_RE.finditer(text):
+        target = match.group(1).strip()
+        end = _iterable_end(text, match.end())
+        clauses.append((target, text[match.end() : end].strip()))
+        if used & set(_IDENTIFIER_RE.findall(target)):
+            needed = len(clauses)
+    return tuple(clauses[:needed])
+
+
+def _iterable_end(text: str, start: int) -> int:
+    """Return where the iterable of a "for ... in" clause starting at start ends."""
+    depth = 0
+    i = start
+    while i < len(text):
+        char = text[i]
+        if char in "'\"":
+            close = text.find(char, i + 1)
+            if close < 0:
+                return len(text)
+            i = close
+        elif char in "([{":
+            depth += 1
+        elif char in _OPENERS:
+            if depth == 0:
+                break
+            depth -= 1
+        elif depth == 0 and _CLAUSE_END_RE.match(text, i):
+            break
+        i += 1
+    return i
+
+
+def _bind_target(target: str, value: Any, names: dict[str, Any]) -> None:
+    """Assign value to a comprehension target such as "x" or "k, v"."""
+    targets = [name.strip() for name in target.strip("() ").split(",")]
+    if len(targets) == 1:
+        names[targets[0]] = value
+        return
+    values = tuple(value)
+    if len(values) != len(targets):
+        raise QueryEvaluationError(f"Cannot unpack into {target}")
+    names.update(zip(targets, values))
+
+
+def _mapping_keys(obj: Any) -> list[str]:
+    """Return the string keys of a mapping, or [] for anything else."""
+    if not isinstance(obj, Mapping):
+        return []
+    return sorted(key for key in obj if isinstance(key, str))
+
+
+def _expression_keys(
+    expression: str, clauses: tuple[tuple[str, str], ...], data: Any
+) -> list[str]:
+    """Evaluate an expression and return the keys of its result.
+
+    Args:
+        expression: Expression being subscripted
+        clauses: (target, iterable) of the comprehensions it appears in,
+            whose targets are bound to the first element of their iterable
+        data: Document data
+
+    Returns:
+        String keys of the result, or [] if it is not a mapping
     """
-    for pattern, quote in [
-        (_BRACKET_PATH_RE + r"\[('?)$", "'"),
-        (_BRACKET_PATH_RE + r'\[("?)$', '"'),
-    ]:
-        match = re.search(pattern, before_cursor)
-        if match:
-            base_path = match.group(1) or "_"
-            return base_path, "", quote
-
-    for pattern, quote in [
-        (_BRACKET_PATH_RE + r"\['([^']*)$", "'"),
-        (_BRACKET_PATH_RE + r'\["([^"]*)$', '"'),
-    ]:
-        match = re.search(pattern, before_cursor)
-        if match:
-            base_path = match.group(1) or "_"
-            partial = match.group(2) or ""
-            return base_path, partial, quote
-
-    return None
+    names: dict[str, Any] = {}
+    for target, iterable in clauses:
+        items = evaluate_query(iterable, data, names)
+        _bind_target(target, next(iter(items)), names)
+    return _mapping_keys(evaluate_query(expression, data, names))
+
+
+class _SerialWorker:
+    """Runs submitted calls on one background thread, in submission order."""
+
+    def __init__(self, name: str) -> None:
+        """Create a worker whose thread is started by the first call.
+
+        Args:
+            name: Name of the worker thread
+        """
+        self.name = name
+        self._tasks: queue.SimpleQueue[tuple[Future, Callable[..., Any], tuple]] = (
+            queue.SimpleQueue()
+        )
+        self._thread: threading.Thread | None = None
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue a call and return a future for its result.
+
+        Args:
+            fn: Function to call on the worker thread
+            *args: Arguments to pass to fn
+
+        Returns:
+            Future resolved with fn's return value or exception
+        """
+        future: Future = Future()
+        self._tasks.put((future, fn, args))
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+        return future
+
+    def _run(self) -> None:
+        while True:
+            future, fn, args = self._tasks.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class SuggestionsReady(Message):
+    """Posted by the index worker when suggestions for a query are found."""
+
+    def __init__(self, query: str, suggestions: list[str]) -> None:
+        self.query = query
+        self.suggestions = suggestions
+        super().__init__()
 
 
 class QueryInput(BaseInput):
@@ -64,29 +244,27 @@ class QueryInput(BaseInput):
             self._handle_tab_completion()
 
     def _handle_tab_completion(self) -> None:
-        """Handle tab completion for keys in bracket expressions."""
+        """Complete the key of the subscript being typed before the cursor.
+
+        The keys come from the path index when the subscripted expression
+        is a literal path such as "_['items'][0]", and otherwise from
+        evaluating that expression.
+        """
         value = self.value
         cursor_pos = self.cursor_position
         before_cursor = value[:cursor_pos]
 
-        ctx = _parse_bracket_context(before_cursor)
-        if ctx is None:
+        match = _OPEN_SUBSCRIPT_RE.search(before_cursor)
+        if match is None:
             return
+        base = _expression_before(before_cursor[: match.start()])
+        if not base:
+            return
+        quote = match.group(1) or "'"
+        partial = match.group(2) or ""
 
-        base_path, partial, quote = ctx
-        self._complete_key(base_path, partial, quote)
-
-    def _complete_key(self, base_path: str, partial: str, quote: str) -> None:
-        """Complete the key at the current position.
-
-        Args:
-            base_path: The base path before the bracket (e.g., "_" or "_['items']")
-            partial: The partial key being typed
-            quote: The quote character being used (' or ")
-        """
         app = cast(QueryApp, self.app)
-        keys = app.fuzzy_matcher.find_keys_at_path(base_path, partial)
-
+        keys = app.completion_keys(base, partial, value)
         if not keys:
             return
 
@@ -95,23 +273,10 @@ class QueryInput(BaseInput):
         else:
             completed_key = app.fuzzy_matcher.get_common_prefix(keys)
 
-        value = self.value
-        cursor_pos = self.cursor_position
-        before_cursor = value[:cursor_pos]
-
-        if partial:
-            ctx = _parse_bracket_context(before_cursor)
-            if ctx is not None:
-                actual_base = ctx[0]
-                new_before = actual_base + "[" + quote + completed_key + quote + "]"
-                after_cursor = value[cursor_pos:]
-                self.value = new_before + after_cursor
-                self.cursor_position = len(new_before)
-                return
-
-        new_before = base_path + "[" + quote + completed_key + quote + "]"
-        after_cursor = value[cursor_pos:]
-        self.value = new_before + after_cursor
+        new_before = (
+            before_cursor[: match.start()] + "[" + quote + completed_key + quote + "]"
+        )
+        self.value = new_before + value[cursor_pos:]
         self.cursor_position = len(new_before)
 
 
@@ -157,10 +322,17 @@ class ResultDisplay(Static):
         if is_error:
             self.update(f"[error]{result}[/error]")
         else:
-            formatted = OutputFormatter.format_output(result)
-            pygments_theme = map_theme_to_pygments(cast(QueryApp, self.app).theme)
-            syntax = Syntax(formatted, "json", theme=pygments_theme, line_numbers=False)
-            self.update(syntax)
+            self.update_formatted(OutputFormatter.format_output(result))
+
+    def update_formatted(self, formatted: str) -> None:
+        """Update the display with an already formatted result.
+
+        Args:
+            formatted: Result text as produced by OutputFormatter.format_output
+        """
+        pygments_theme = map_theme_to_pygments(cast(QueryApp, self.app).theme)
+        syntax = Syntax(formatted, "json", theme=pygments_theme, line_numbers=False)
+        self.update(syntax)
 
 
 class SuggestionBox(Widget):
@@ -247,21 +419,50 @@ class QueryApp(App[None]):
 
     _pending_query: str | None = None
     _eval_timer: Any = None
-
-    def __init__(self, data: Any, theme: str | None = None) -> None:
-        """Initialize app with document data.
+    _eval_generation: int = 0
+    # Child process computing the current preview, killed once stale.
+    _preview: QueryProcess | None = None
+    # Query whose suggestions should be shown; older ones are dropped.
+    _suggestion_query: str | None = None
+    # Expression Tab last asked keys for, the future computing them, and the
+    # child evaluating it; work for any other expression is dropped.
+    _completion_key: _CompletionKey | None = None
+    _completion_future: Future | None = None
+    _completion_process: QueryProcess | None = None
+
+    def __init__(
+        self,
+        data: Any = None,
+        theme: str | None = None,
+        loader: Callable[[], Any] | None = None,
+    ) -> None:
+        """Initialize app with document data, or with a way to load it.
+
+        With a loader the first frame is drawn at once: the document is
+        loaded and its paths are extracted in a background thread while a
+        progress bar is shown. Anything typed meanwhile stays in the input
+        and is evaluated as soon as the data arrives.
 
         Args:
             data: Document data to query
             theme: Textual theme name (optional)
+            loader: Callable returning the document data, run off the UI
+                thread instead of passing data
         """
-        self.data = data
-        self.final_result: Any = None
-
-        path_extractor = PathExtractor(data)
-        self.paths = path_extractor.get_paths()
-        self.fuzzy_matcher = FuzzyMatcher(self.paths)
+        # Formatted result of the query on display, or None.
+        self.final_result: str | None = None
         self.query_string: str = "_"
+        self.load_error: str | None = None
+        self._loader = loader
+        # Expanding the path index can scan a large part of a lazily loaded
+        # document, so it never runs on the UI thread; a single thread also
+        # means the index and its caches are never used concurrently.
+        self._index_worker = _SerialWorker("pq-index")
+        self._completion_worker = _SerialWorker("pq-complete")
+        if loader is None:
+            self._set_data(data, FuzzyMatcher(PathIndex(data)))
+        else:
+            self._set_data(None, FuzzyMatcher(PathIndex(None)))
 
         super().__init__()
 
@@ -273,10 +474,141 @@ class QueryApp(App[None]):
                 )
             self.theme = theme
 
+    @property
+    def is_loading(self) -> bool:
+        """Whether the document is still being loaded in the background."""
+        return self._loader is not None
+
+    def _set_data(self, data: Any, fuzzy_matcher: FuzzyMatcher) -> None:
+        """Make a document and its path matcher the subject of queries."""
+        self.data = data
+        self._path_cache = PathResultCache(data)
+        self._path_lock = threading.Lock()
+        self.fuzzy_matcher = fuzzy_matcher
+        # Completion keys of evaluated expressions. Replaced rather than
+        # cleared, so work started for the previous document cannot write
+        # into it.
+        self._completion_cache: OrderedDict[_CompletionKey, list[str]] = OrderedDict()
+
+    def completion_keys(self, base: str, partial: str, query: str) -> list[str]:
+        """Find the keys that can complete a subscript of an expression.
+
+        Literal paths are answered from the path index, on the index worker
+        within the same time budget as evaluation. Any other expression
+        is evaluated, binding the loop variables of the comprehensions it
+        appears in to their first elements, and the keys of the resulting
+        mapping are offered. Evaluation runs in a child process started by
+        the completion worker, one expression at a time: asking for another
+        expression kills the child evaluating the previous one. Tab waits
+        for at most _COMPLETION_BUDGET seconds; a slower evaluation keeps
+        running and its keys are ready on a later Tab. Results are cached.
+
+        Args:
+            base: Expression being subscripted, e.g. "x" or "sorted(_)[0]"
+            partial: Start of the key typed so far
+            query: Whole query, for finding comprehension clauses
+
+        Returns:
+            Matching keys
+        """
+        if _LITERAL_PATH_RE.fullmatch(base):
+            lookup = self._index_worker.submit(
+                self.fuzzy_matcher.find_keys_at_path, base, partial
+            )
+            try:
+                keys = lookup.result(_COMPLETION_BUDGET)
+            except FutureTimeoutError:
+                self.query_one("#status-bar", StatusBar).set_status(_COMPLETION_PENDING)
+                return []
+            if keys:
+                return keys
+        if self.is_loading or self.load_error is not None:
+            return []
+
+        cache = self._completion_cache
+        cache_key = (base, _comprehension_clauses(query, base))
+        keys = cache.get(cache_key)
+        if keys is not None:
+            cache.move_to_end(cache_key)
+        else:
+            future = self._completion_future
+            if cache_key != self._completion_key or future is None or future.done():
+                self._stop_completion()
+                self._completion_key = cache_key
+                future = self._completion_worker.submit(
+                    self._complete_in_worker, cache, cache_key
+                )
+                self._completion_future = future
+            try:
+                keys = future.result(_COMPLETION_BUDGET) or []
+            except FutureTimeoutError:
+                self.query_one("#status-bar", StatusBar).set_status(_COMPLETION_PENDING)
+                return []
+
+        prefix = partial.lower()
+        return [key for key in keys if key.lower().startswith(prefix)]
+
+    def _stop_completion(self) -> None:
+        """Drop the completion work in progress, killing its child if any."""
+        self._completion_key = None
+        future = self._completion_future
+        if future is not None:
+            future.cancel()
+        process = self._completion_process
+        if process is not None:
+            process.kill()
+
+    def _complete_in_worker(
+        self,
+        cache: OrderedDict[_CompletionKey, list[str]],
+        cache_key: _CompletionKey,
+    ) -> list[str] | None:
+        """Find the keys of an expression's result and cache them.
+
+        Subscript paths are resolved here through the path cache; anything
+        else is evaluated in a child process that _stop_completion can kill.
+
+        Args:
+            cache: Completion cache the keys are stored in
+            cache_key: (expression, comprehension clauses) to evaluate
+
+        Returns:
+            The keys, or None if the work was superseded meanwhile
+        """
+        base, clauses = cache_key
+        path = None if clauses else subscript_path(base)
+        try:
+            if path is not None:
+                with self._path_lock:
+                    keys = _mapping_keys(self._path_cache.resolve(path))
+            else:
+                process = QueryProcess(_expression_keys, base, clauses, self.data)
+                self._completion_process = process
+                if cache_key != self._completion_key:
+                    # Superseded while starting, possibly before the UI
+                    # could see this child to kill it.
+                    process.kill()
+                try:
+                    keys = process.result()
+                finally:
+                    self._completion_process = None
+        except Exception:
+            # Anything the user has not finished typing may fail; there is
+            # simply nothing to complete then.
+            keys = []
+        if cache_key != self._completion_key:
+            return None
+        cache[cache_key] = keys
+        while len(cache) > _COMPLETION_CACHE_SIZE:
+            cache.popitem(last=False)
+        return keys
+
     def compose(self) -> ComposeResult:
         """Compose the UI."""
         yield Header()
         yield QueryPrompt(query=self.query_string)
+        if self.is_loading:
+            yield ProgressBar(total=None, show_eta=False, id="loading-bar")
         yield SuggestionBox(id="suggestion-box")
         yield SectionHeader("Results", id="results-header")
         yield ResultDisplay(id="result-display")
@@ -287,27 +619,222 @@ class QueryApp(App[None]):
         """Set up the app on mount."""
         self.query_one("#query-input", QueryInput).focus()
         status_bar = self.query_one("#status-bar", StatusBar)
-        status_bar.set_status(
-            "Type a Python expression to query the data. Press Enter to exit."
-        )
+        if self.is_loading:
+            status_bar.set_status(_LOADING_HINT)
+            thread = threading.Thread(
+                target=self._load_in_thread,
+                args=(self._loader,),
+                name="pq-load",
+                daemon=True,
+            )
+            thread.start()
+        else:
+            status_bar.set_status(_STATUS_HINT)
+
+    def _load_in_thread(self, loader: Callable[[], Any]) -> None:
+        """Load the document and index its paths, then hand both to the UI.
+
+        Args:
+            loader: Callable returning the document data
+        """
+        try:
+            data = loader()
+            fuzzy_matcher = FuzzyMatcher(PathIndex(data))
+            # Listing the top-level keys of a lazy document scans the whole
+            # file; do it here rather than on the first keystroke.
+            fuzzy_matcher.find_matches("_")
+            outcome = (data, fuzzy_matcher, None)
+        except Exception as e:
+            # Report the failure in the UI rather than losing it with the
+            # thread and leaving the progress bar running forever.
+            outcome = (None, None, str(e))
+        try:
+            self.call_from_thread(self._finish_loading, *outcome)
+        except RuntimeError:
+            # The app exited while the document was still loading.
+            pass
+
+    def _finish_loading(
+        self, data: Any, fuzzy_matcher: FuzzyMatcher | None, error: str | None
+    ) -> None:
+        """Leave the loading state and run the query typed so far.
+
+        Args:
+            data: Loaded document (None on error)
+            fuzzy_matcher: Matcher over the document's paths (None on error)
+            error: Error message, or None on success
+        """
+        self._loader = None
+        self.query_one("#loading-bar", ProgressBar).remove()
+        status_bar = self.query_one("#status-bar", StatusBar)
+        if error is not None:
+            self.load_error = error
+            self.query_one("#result-display", ResultDisplay).update_result(
+                error, is_error=True
+            )
+            status_bar.set_status(
+                "The document could not be loaded. Press Ctrl+C to exit."
+            )
+            return
+
+        self._set_data(data, cast(FuzzyMatcher, fuzzy_matcher))
+        status_bar.set_status(_STATUS_HINT)
+        query = self.query_one("#query-input", QueryInput).value
+        if query.strip():
+            self._update_suggestions(query)
+            self._evaluate_and_display(query)
 
     def _update_suggestions(self, query: str) -> None:
-        """Update suggestion box immediately (no debounce)."""
+        """Find suggestions for a query on the index worker (no debounce)."""
+        self._suggestion_query = query
+        self._index_worker.submit(self._suggest_in_thread, query, self.fuzzy_matcher)
+
+    def _suggest_in_thread(self, query: str, fuzzy_matcher: FuzzyMatcher) -> None:
+        """Find the suggestions for a query and post them to the UI.
+
+        Args:
+            query: Query to suggest paths for
+            fuzzy_matcher: Matcher of the document the query was typed for
+        """
+        if query != self._suggestion_query:
+            # Superseded while queued.
+            return
+        self.post_message(SuggestionsReady(query, fuzzy_matcher.find_matches(query)))
+
+    def on_suggestions_ready(self, message: SuggestionsReady) -> None:
+        """Show suggestions unless the query has changed since."""
+        if message.query != self._suggestion_query:
+            return
         suggestion_box = self.query_one("#suggestion-box", SuggestionBox)
-        suggestions = self.fuzzy_matcher.find_matches(query)
-        suggestion_box.update_suggestions(suggestions)
+        suggestion_box.update_suggestions(message.suggestions)
 
     def _evaluate_and_display(self, query: str) -> None:
-        """Evaluate query and update result display."""
-        result_display = self.query_one("#result-display", ResultDisplay)
+        """Evaluate query in a child process and update the display.
+
+        Evaluation runs off the event loop so slow queries never block
+        typing. Each run is tagged with a generation number; results from a
+        query that has since been superseded are discarded. A thread
+        evaluating Python cannot be interrupted, so the preview is computed
+        in a child process (see pq.sandbox), and the child computing a
+        stale preview is killed.
+
+        Args:
+            query: Query string to evaluate
+        """
+        self._eval_generation += 1
+        generation = self._eval_generation
+        self.query_one("#status-bar", StatusBar).set_status("Computing…")
+        self._stop_preview()
+        threading.Thread(
+            target=self._evaluate_in_thread,
+            args=(query, generation),
+            name="pq-eval",
+            daemon=True,
+        ).start()
+
+    def _stop_preview(self) -> None:
+        """Kill the child computing the current preview, if any."""
+        preview = self._preview
+        if preview is not None:
+            preview.kill()
+
+    def _evaluate_in_thread(self, query: str, generation: int) -> None:
+        """Compute a preview in a child process and hand it to the UI.
+
+        Args:
+            query: Query string to evaluate
+            generation: Generation number the evaluation was started with
+        """
+        if generation != self._eval_generation:
+            # Superseded before it started.
+            return
+        preview = None
         try:
-            result = evaluate_query(query, self.data)
-            result_display.update_result(result, is_error=False)
-            self.query_string = query
-            self.final_result = result
+            preview = self._start_preview(query)
+            self._preview = preview
+            if generation != self._eval_generation:
+                # Superseded while starting, possibly before the UI could
+                # see this child to kill it.
+                preview.kill()
+            outcome: tuple[str | None, str | None] = (preview.result(), None)
         except QueryEvaluationError as e:
-            result_display.update_result(str(e), is_error=True)
+            outcome = (None, str(e))
+        finally:
+            if preview is not None and self._preview is preview:
+                self._preview = None
+        if generation != self._eval_generation:
+            return
+
+        try:
+            self.call_from_thread(self._display_outcome, query, generation, *outcome)
+        except RuntimeError:
+            # The app exited while the query was still running.
+            pass
+
+    def _start_preview(self, query: str) -> QueryProcess:
+        """Start the child process computing a query's formatted result.
+
+        Subscript paths are resolved here, reusing cached results for their
+        prefixes, and only formatting happens in the child.
+
+        Args:
+            query: Query string to evaluate
+
+        Returns:
+            The running child
+
+        Raises:
+            QueryEvaluationError: If a subscript path cannot be resolved
+        """
+        keys = subscript_path(query)
+        if keys is not None:
+            with self._path_lock:
+                result = self._path_cache.resolve(keys)
+            return QueryProcess(OutputFormatter.format_output, result)
+        return QueryProcess(evaluate_formatted, query, self.data)
+
+    def _display_outcome(
+        self,
+        query: str,
+        generation: int,
+        formatted: str | None,
+        error: str | None,
+    ) -> None:
+        """Show an evaluation outcome unless a newer query has started.
+
+        Args:
+            query: Query string that was evaluated
+            generation: Generation number the evaluation was started with
+            formatted: Formatted result text (None on error)
+            error: Error message, or None on success
+        """
+        if generation != self._eval_generation:
+            return
+
+        result_display = self.query_one("#result-display", ResultDisplay)
+        if error is not None:
+            result_display.update_result(error, is_error=True)
             self.final_result = None
+        else:
+            result_display.update_formatted(cast(str, formatted))
+            self.query_string = query
+            self.final_result = formatted
+        self.query_one("#status-bar", StatusBar).set_status(_STATUS_HINT)
+
+    def _evaluate(self, query: str) -> Any:
+        """Evaluate a query, reusing cached results for subscript prefixes.
+
+        Args:
+            query: Query string to evaluate
+
+        Returns:
+            Result of the query
+        """
+        keys = subscript_path(query)
+        if keys is not None:
+            with self._path_lock:
+                return self._path_cache.resolve(keys)
+        return evaluate_query(query, self.data)
 
     def on_input_changed(self, event: QueryInput.Changed) -> None:
         """Handle input changes for real-time evaluation with debouncing.
@@ -315,14 +842,22 @@ class QueryApp(App[None]):
         Args:
             event: Input changed event
         """
+        if self.is_loading or self.load_error is not None:
+            # The input keeps what is typed; _finish_loading evaluates it.
+            return
+
         query = event.value
         result_display = self.query_one("#result-display", ResultDisplay)
 
         if not query.strip():
             result_display.update_result("")
+            self._suggestion_query = None
             self.query_one("#suggestion-box", SuggestionBox).update_suggestions([])
             self.final_result = None
             self._cancel_eval_timer()
+            self._eval_generation += 1
+            self._stop_preview()
+            self.query_one("#status-bar", StatusBar).set_status(_STATUS_HINT)
             return
 
         self._update_suggestions(query)
@@ -352,6 +887,11 @@ class QueryApp(App[None]):
 
         self._eval_timer = self.set_timer(_DEBOUNCE_DELAY, _debounced_eval)
 
+    def on_unmount(self) -> None:
+        """Stop the children computing a preview or completion, if any."""
+        self._stop_preview()
+        self._stop_completion()
+
     def action_accept_query(self) -> None:
         """Accept the current query and exit."""
         self.exit(return_code=0)
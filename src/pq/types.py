@@ -3,6 +3,9 @@ from enum import StrEnum
 
 class FileTypes(StrEnum):
     json = "json"
+    jsonl = "jsonl"
     yaml = "yaml"
     xml = "xml"
     toml = "toml"
+    csv = "csv"
+    tsv = "tsv"
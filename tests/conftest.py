@@ -17,3 +17,10 @@ def test_data():
 def test_data_path():
     """Return path to test_data.json."""
     return Path(__file__).parent / "test_data.json"
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep the parse cache out of the real user cache directory."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return tmp_path / "cache"
@@ -1,9 +1,16 @@
 """Test QueryApp logic without TUI."""
 
+import asyncio
 from collections import Counter, defaultdict
+from collections.abc import Mapping
+import threading
+import time
 
+import pytest
 
-from pq.evaluator import evaluate_query
+from pq.evaluator import PathResultCache, QueryEvaluationError, evaluate_query
+from pq.loader import DocumentLoadError
+from pq.tui import QueryApp, _comprehension_clauses, _expression_before
 
 
 class TestSimpleQueries:
@@ -57,3 +64,344 @@ class TestDefaultdictQueries:
         result = evaluate_query("defaultdict(list, {'a': [1, 2]})", test_data)
         assert isinstance(result, defaultdict)
         assert result["a"] == [1, 2]
+
+
+class TestPathResultCache:
+    def test_resolves_path(self, test_data):
+        cache = PathResultCache(test_data)
+        assert cache.resolve(("items", 0, "name")) == "Alice"
+        assert cache.resolve(()) is test_data
+
+    def test_extends_from_cached_prefix(self):
+        class CountingDict(dict):
+            lookups = 0
+
+            def __getitem__(self, key):
+                CountingDict.lookups += 1
+                return super().__getitem__(key)
+
+        data = CountingDict(a=CountingDict(b=CountingDict(c=1)))
+        cache = PathResultCache(data)
+        cache.resolve(("a", "b"))
+        assert CountingDict.lookups == 2
+        assert cache.resolve(("a", "b", "c")) == 1
+        assert CountingDict.lookups == 3
+
+    def test_slices_are_not_cached(self, test_data):
+        cache = PathResultCache(test_data)
+        assert cache.resolve(("items", slice(0, 1), 0, "name")) == "Alice"
+
+    def test_equal_keys_of_other_types_are_not_shared(self, test_data):
+        cache = PathResultCache(test_data)
+        assert cache.resolve(("items", 1, "name")) == "Bob"
+        with pytest.raises(QueryEvaluationError):
+            cache.resolve(("items", 1.0, "name"))
+
+        class TypedKeys(Mapping):
+            def __getitem__(self, key):
+                return type(key).__name__
+
+            def __iter__(self):
+                return iter(())
+
+            def __len__(self):
+                return 0
+
+        cache = PathResultCache(TypedKeys())
+        assert [cache.resolve((key,)) for key in (1, 1.0, True)] == [
+            "int",
+            "float",
+            "bool",
+        ]
+
+    def test_errors_are_translated(self, test_data):
+        cache = PathResultCache(test_data)
+        with pytest.raises(QueryEvaluationError, match="Key 'nope' not found"):
+            cache.resolve(("items", 0, "nope"))
+        assert cache.resolve(("items", 0, "age")) == 30
+
+    def test_bounded(self, test_data):
+        cache = PathResultCache(test_data, maxsize=2)
+        cache.resolve(("items", 0, "name"))
+        assert len(cache._entries) == 2
+
+
+class TestBackgroundEvaluation:
+    def test_stale_outcome_discarded(self, test_data):
+        app = QueryApp(test_data)
+        app._eval_generation = 2
+        app._display_outcome("_['items']", 1, "[1]", None)
+        assert app.final_result is None
+        assert app.query_string == "_"
+
+    def test_stale_thread_does_not_post(self, test_data):
+        app = QueryApp(test_data)
+        app._eval_generation = 2
+        # Posting to the (not running) app would raise, so returning quietly
+        # shows the stale result was dropped before reaching the UI.
+        app._evaluate_in_thread("len(_['items'])", 1)
+        assert app.final_result is None
+
+    def test_unformattable_result_is_an_error(self):
+        async def scenario():
+            app = QueryApp({"a": 1})
+            async with app.run_test() as pilot:
+                app.query_one("#query-input").value = "{(1, 2): 3}"
+                result_display = app.query_one("#result-display")
+                for _ in range(50):
+                    await pilot.pause(0.1)
+                    if str(result_display.render()):
+                        break
+                assert "Cannot display result" in str(result_display.render())
+                assert "Computing" not in str(app.query_one("#status-bar").render())
+                assert app.final_result is None
+
+        asyncio.run(scenario())
+
+    def test_runaway_preview_is_killed(self, test_data):
+        async def scenario():
+            app = QueryApp(test_data)
+            async with app.run_test() as pilot:
+                query_input = app.query_one("#query-input")
+                query_input.value = "sum(range(10**12))"
+                for _ in range(50):
+                    await pilot.pause(0.1)
+                    if app._preview is not None:
+                        break
+                runaway = app._preview
+                assert runaway is not None
+
+                query_input.value = "len(_['items'])"
+                for _ in range(50):
+                    await pilot.pause(0.1)
+                    if app.final_result is not None:
+                        break
+                assert app.final_result == "3"
+                assert app.query_string == "len(_['items'])"
+                assert not runaway._process.is_alive()
+
+        asyncio.run(scenario())
+
+    def test_stale_thread_skips_evaluation(self, test_data, monkeypatch):
+        app = QueryApp(test_data)
+        app._eval_generation = 2
+        monkeypatch.setattr(
+            app, "_start_preview", lambda query: pytest.fail("evaluated")
+        )
+        app._evaluate_in_thread("len(_['items'])", 1)
+
+
+class TestBackgroundLoading:
+    def test_keystrokes_wait_for_data(self, test_data):
+        release = threading.Event()
+
+        def loader():
+            release.wait(5)
+            return test_data
+
+        async def scenario():
+            app = QueryApp(loader=loader)
+            async with app.run_test() as pilot:
+                assert app.is_loading
+                assert app.query_one("#loading-bar")
+                await pilot.press("end", *"['items'][0]['name']")
+                await pilot.pause(0.3)
+                assert app.final_result is None
+
+                release.set()
+                for _ in range(50):
+                    await pilot.pause(0.1)
+                    if app.final_result is not None:
+                        break
+                assert not app.is_loading
+                assert not app.query("#loading-bar")
+                assert app.final_result == '"Alice"'
+                assert app.query_string == "_['items'][0]['name']"
+
+        asyncio.run(scenario())
+
+    def test_load_error_is_shown(self):
+        def loader():
+            raise DocumentLoadError("File not found: missing.json")
+
+        async def scenario():
+            app = QueryApp(loader=loader)
+            async with app.run_test() as pilot:
+                for _ in range(50):
+                    await pilot.pause(0.1)
+                    if not app.is_loading:
+                        break
+                assert app.load_error == "File not found: missing.json"
+                await pilot.press("x")
+                await pilot.pause(0.3)
+                assert app.final_result is None
+
+        asyncio.run(scenario())
+
+    def test_index_never_expanded_on_ui_thread(self, test_data):
+        listed_by: list[str] = []
+
+        class Recording(Mapping):
+            def __init__(self, data):
+                self._data = data
+
+            def __getitem__(self, key):
+                value = self._data[key]
+                return Recording(value) if isinstance(value, dict) else value
+
+            def __iter__(self):
+                listed_by.append(threading.current_thread().name)
+                return iter(self._data)
+
+            def __len__(self):
+                return len(self._data)
+
+        async def scenario():
+            app = QueryApp(loader=lambda: Recording(test_data))
+            async with app.run_test() as pilot:
+                query_input = app.query_one("#query-input")
+                for _ in range(50):
+                    await pilot.pause(0.1)
+                    if not app.is_loading:
+                        break
+                query_input.value = "_['metadata']['v"
+                expected = ["_['metadata']['version']"]
+                suggestion_box = app.query_one("#suggestion-box")
+                for _ in range(50):
+                    await pilot.pause(0.1)
+                    if suggestion_box.suggestions == expected:
+                        break
+                assert suggestion_box.suggestions == expected
+                assert listed_by
+                assert threading.main_thread().name not in listed_by
+
+        asyncio.run(scenario())
+
+    def test_paths_extracted_with_data(self, test_data):
+        app = QueryApp(test_data)
+        assert not app.is_loading
+        assert app.fuzzy_matcher.find_matches("_") == ["_['items']", "_['metadata']"]
+
+
+class TestExpressionCompletion:
+    def test_expression_before(self):
+        assert _expression_before("len(_['items']") == "_['items']"
+        assert _expression_before("1 + sorted(_['a'], key=len)[0]") == (
+            "sorted(_['a'], key=len)[0]"
+        )
+        assert _expression_before("[x") == "x"
+        assert _expression_before("a + ") == ""
+
+    def test_comprehension_clauses(self):
+        query = "[y['n'] for x in _['items'] if x for y in x['tags']]"
+        assert _comprehension_clauses(query, "y") == (
+            ("x", "_['items']"),
+            ("y", "x['tags']"),
+        )
+        assert _comprehension_clauses(query, "_") == ()
+
+    def test_literal_path_uses_index(self, test_data):
+        app = QueryApp(test_data)
+        assert app.completion_keys("_['metadata']", "v", "") == ["version"]
+
+    def test_comprehension_variable(self, test_data):
+        app = QueryApp(test_data)
+        query = "[x['na'] for x in _['items']]"
+        assert app.completion_keys("x", "na", query) == ["name"]
+
+    def test_tuple_target(self, test_data):
+        app = QueryApp(test_data)
+        query = "[v['c'] for k, v in _.items()]"
+        assert app.completion_keys("v", "", query) == []
+        query = "[v['a'] for i, v in enumerate(_['items'])]"
+        assert app.completion_keys("v", "a", query) == ["active", "age"]
+
+    def test_evaluated_expression(self, test_data):
+        app = QueryApp(test_data)
+        base = "sorted(_['items'], key=len)[0]"
+        assert app.completion_keys(base, "ci", base) == ["city"]
+
+    def test_non_mapping_or_invalid_gives_nothing(self, test_data):
+        app = QueryApp(test_data)
+        assert app.completion_keys("len(_)", "", "len(_)") == []
+        assert app.completion_keys("missing", "", "missing") == []
+
+    def test_result_is_cached(self, test_data):
+        app = QueryApp(test_data)
+        app.completion_keys("dict(_)", "", "")
+        entry = app._completion_cache[("dict(_)", ())]
+        assert entry == ["items", "metadata"]
+
+    def test_tab_keeps_surrounding_text(self, test_data):
+        async def scenario():
+            app = QueryApp(test_data)
+            async with app.run_test() as pilot:
+                query_input = app.query_one("#query-input")
+                query_input.value = "[x['na for x in _['items']]"
+                query_input.cursor_position = len("[x['na")
+                await pilot.press("tab")
+                assert query_input.value == "[x['name'] for x in _['items']]"
+                assert query_input.cursor_position == len("[x['name']")
+
+                query_input.value = "len(_['ite"
+                query_input.cursor_position = len(query_input.value)
+                await pilot.press("tab")
+                assert query_input.value == "len(_['items']"
+
+        asyncio.run(scenario())
+
+    def test_slow_expression_does_not_block_tab(self, test_data):
+        class SlowMapping(Mapping):
+            def __getitem__(self, key):
+                return {"name": 1}[key]
+
+            def __iter__(self):
+                time.sleep(1)
+                return iter(["name"])
+
+            def __len__(self):
+                return 1
+
+        async def scenario():
+            app = QueryApp({"slow": SlowMapping()})
+            async with app.run_test() as pilot:
+                query_input = app.query_one("#query-input")
+                query_input.value = "dict(_['slow'])['n"
+                query_input.cursor_position = len(query_input.value)
+                await pilot.press("tab")
+                assert query_input.value == "dict(_['slow'])['n"
+                assert "Press Tab again" in str(
+                    app.query_one("#status-bar").render()
+                )
+
+                for _ in range(50):
+                    await pilot.pause(0.1)
+                    await pilot.press("tab")
+                    if query_input.value != "dict(_['slow'])['n":
+                        break
+                assert query_input.value == "dict(_['slow'])['name']"
+
+        asyncio.run(scenario())
+
+    def test_superseded_expression_is_stopped(self, test_data):
+        async def scenario():
+            app = QueryApp(test_data)
+            async with app.run_test() as pilot:
+                while app.final_result is None:
+                    await pilot.pause(0.1)
+                slow = "{k: sum(range(10**12)) for k in 'ab'}"
+                assert app.completion_keys(slow, "", slow) == []
+                runaway = app._completion_process
+                assert runaway is not None
+
+                base = "sorted(_['items'], key=len)[0]"
+                for _ in range(50):
+                    keys = app.completion_keys(base, "ci", base)
+                    if keys:
+                        break
+                    await pilot.pause(0.1)
+                assert keys == ["city"]
+                assert not runaway._process.is_alive()
+                assert (slow, ()) not in app._completion_cache
+
+        asyncio.run(scenario())
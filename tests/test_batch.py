@@ -0,0 +1,70 @@
+"""Test multi-file loading and querying."""
+
+import json
+
+import pytest
+
+from pq.batch import expand_paths, load_documents, query_documents
+from pq.evaluator import QueryEvaluationError
+from pq.loader import DocumentLoadError
+
+
+@pytest.fixture
+def dumps(tmp_path):
+    """Create a directory of small per-host JSON documents."""
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"host{i}.json"
+        path.write_text(json.dumps({"host": f"h{i}", "up": i % 2 == 0}))
+        paths.append(path)
+    (tmp_path / "notes.txt").write_text("ignored")
+    return paths
+
+
+class TestExpandPaths:
+    def test_glob_pattern(self, tmp_path, dumps):
+        assert expand_paths([tmp_path / "*.json"]) == dumps
+
+    def test_plain_paths_kept_in_order(self, dumps):
+        assert expand_paths([dumps[2], dumps[0]]) == [dumps[2], dumps[0]]
+
+    def test_existing_name_with_glob_characters(self, tmp_path):
+        path = tmp_path / "odd[1].json"
+        path.write_text("{}")
+        assert expand_paths([path]) == [path]
+
+    def test_no_matches(self, tmp_path):
+        with pytest.raises(DocumentLoadError, match="No files match"):
+            expand_paths([tmp_path / "*.yaml"])
+
+
+class TestLoadDocuments:
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_maps_file_names_to_documents(self, dumps, jobs):
+        documents = load_documents(dumps, jobs=jobs)
+        assert list(documents) == [str(path) for path in dumps]
+        assert documents[str(dumps[3])] == {"host": "h3", "up": False}
+
+    def test_load_error_propagates(self, dumps, tmp_path):
+        with pytest.raises(DocumentLoadError, match="File not found"):
+            load_documents([*dumps, tmp_path / "missing.json"], jobs=2)
+
+    def test_unsupported_file_type(self, dumps, tmp_path):
+        with pytest.raises(DocumentLoadError, match="Unsupported file type"):
+            load_documents([*dumps, tmp_path / "notes.txt"], jobs=1)
+
+
+class TestQueryDocuments:
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_results_per_file(self, dumps, jobs):
+        outputs = [json.loads(o) for o in query_documents("_['host']", dumps, jobs)]
+        merged = {name: result for output in outputs for name, result in output.items()}
+        assert merged == {str(path): f"h{i}" for i, path in enumerate(dumps)}
+
+    def test_unencodable_result_is_stringified(self, dumps):
+        (output,) = query_documents("set(_)", dumps[:1])
+        assert json.loads(output)[str(dumps[0])] in ("{'host', 'up'}", "{'up', 'host'}")
+
+    def test_query_error_propagates(self, dumps):
+        with pytest.raises(QueryEvaluationError):
+            list(query_documents("_['missing']", dumps, jobs=2))
@@ -0,0 +1,107 @@
+"""Test the on-disk parsed document cache."""
+
+import os
+
+from pq import cache
+from pq.cache import cache_dir, clear_document_cache, load_cached, store_cached
+from pq.loader import load_document, load_document_with_status
+
+
+def write_yaml(tmp_path, text="items:\n  - a\n  - b\n"):
+    path = tmp_path / "doc.yaml"
+    path.write_text(text)
+    return path
+
+
+class TestDocumentCache:
+    def test_cache_dir_uses_xdg(self, isolated_cache):
+        assert cache_dir() == isolated_cache / "pq-cli" / "documents"
+
+    def test_load_populates_and_reuses_cache(self, tmp_path, monkeypatch):
+        path = write_yaml(tmp_path)
+        assert load_document(path) == {"items": ["a", "b"]}
+        assert len(list(cache_dir().glob("*.pickle"))) == 1
+
+        def fail(*args):
+            raise AssertionError("document was parsed again")
+
+        monkeypatch.setattr("pq.loader.load_content", fail)
+        assert load_document(path) == {"items": ["a", "b"]}
+
+    def test_yaml_documents_cached_separately(self, tmp_path):
+        path = write_yaml(tmp_path)
+        assert load_document(path) == {"items": ["a", "b"]}
+        assert load_document(path, yaml_documents=True) == [{"items": ["a", "b"]}]
+        assert load_document(path, yaml_documents=True) == [{"items": ["a", "b"]}]
+        assert load_document(path) == {"items": ["a", "b"]}
+        assert len(list(cache_dir().glob("*.pickle"))) == 2
+
+    def test_status_reports_cache_hit(self, tmp_path):
+        path = write_yaml(tmp_path)
+        assert not load_document_with_status(path).from_cache
+        assert load_document_with_status(path) == ({"items": ["a", "b"]}, True)
+        assert not load_document_with_status(path, use_cache=False).from_cache
+
+    def test_modified_file_is_reparsed(self, tmp_path):
+        path = write_yaml(tmp_path)
+        load_document(path)
+        path.write_text("items: [c]\n")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert load_document(path) == {"items": ["c"]}
+
+    def test_version_is_part_of_key(self, tmp_path, monkeypatch):
+        path = write_yaml(tmp_path)
+        store_cached(path, {"stale": True})
+        monkeypatch.setattr(cache, "_version", lambda: "99.0.0")
+        assert load_cached(path) is None
+
+    def test_use_cache_false_bypasses_cache(self, tmp_path):
+        path = write_yaml(tmp_path)
+        assert load_document(path, use_cache=False) == {"items": ["a", "b"]}
+        assert not cache_dir().exists()
+
+    def test_json_is_not_cached(self, tmp_path):
+        path = tmp_path / "doc.json"
+        path.write_text('{"a": 1}')
+        load_document(path)
+        assert not cache_dir().exists()
+
+    def test_corrupt_entry_is_ignored(self, tmp_path):
+        path = write_yaml(tmp_path)
+        load_document(path)
+        for entry in cache_dir().glob("*.pickle"):
+            entry.write_bytes(b"not a pickle")
+        assert load_document(path) == {"items": ["a", "b"]}
+
+    def test_entry_failing_to_load_is_dropped(self, tmp_path, monkeypatch):
+        path = write_yaml(tmp_path)
+        load_document(path)
+
+        def broken_load(f):
+            raise MemoryError
+
+        monkeypatch.setattr(cache.pickle, "load", broken_load)
+        assert load_cached(path) is None
+        assert list(cache_dir().glob("*.pickle")) == []
+        assert load_document(path) == {"items": ["a", "b"]}
+
+    def test_eviction_drops_least_recently_used(self, tmp_path):
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"doc{i}.yaml"
+            path.write_text(f"n: {i}\n")
+            paths.append(path)
+            store_cached(path, {"payload": "x" * 1000})
+            entry = cache._entry_path(path)
+            os.utime(entry, (i, i))
+        store_cached(tmp_path / "doc0.yaml", {"payload": "x" * 1000}, limit=2500)
+        assert load_cached(paths[0]) is not None
+        assert load_cached(paths[1]) is None
+        assert load_cached(paths[2]) is not None
+
+    def test_clear(self, tmp_path):
+        path = write_yaml(tmp_path)
+        load_document(path)
+        clear_document_cache()
+        assert load_cached(path) is None
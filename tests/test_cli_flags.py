@@ -1,5 +1,7 @@
 """Test CLI flag functionality."""
 
+import json
+import os
 import subprocess
 import sys
 
@@ -129,6 +131,228 @@ def test_toml_flag_long():
     assert result.returncode == 0
 
 
+def test_jsonl_flag():
+    """Test -l flag for JSON Lines stdin."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pq.cli", "-l", "[r['key'] for r in _]"],
+        input='{"key": "a"}\n{"key": "b"}\n',
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0
+    assert json.loads(result.stdout) == ["a", "b"]
+
+
+def test_stream_flag_evaluates_per_record():
+    """Test --stream runs the query once per JSON Lines record."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pq.cli", "--jsonl", "--stream", "_['key']"],
+        input='{"key": "a"}\n{"key": "b"}\n',
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0
+    assert result.stdout.splitlines() == ['"a"', '"b"']
+
+
+def test_array_path_flag():
+    """Test --array-path binds _ to the streamed array elements."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pq.cli", "-j", "-a", "_['items']", "len(_)"],
+        input='{"items": [1, 2, 3]}',
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0
+    assert result.stdout.strip() == "3"
+
+
+
+def test_lazy_flag():
+    """Test --lazy gives the same result as an eager load."""
+    query = "_['items'][1]"
+    _, eager, _ = run_cli(query, "tests/test_data.json")
+    returncode, lazy, stderr = run_cli(query, "tests/test_data.json", "--lazy")
+    assert returncode == 0, stderr
+    assert lazy == eager
+
+
+def test_no_cache_flag(tmp_path):
+    """Test --no-cache loads YAML without writing a cache entry."""
+    doc = tmp_path / "doc.yaml"
+    doc.write_text("key: value\n")
+    returncode, stdout, stderr = run_cli("_['key']", str(doc), "--no-cache")
+    assert returncode == 0, stderr
+    assert stdout.strip() == '"value"'
+    assert not (tmp_path / "cache").exists()
+
+
+def test_multiple_files(tmp_path):
+    """Test a glob binds _ to a mapping of file name to document."""
+    for i in range(3):
+        (tmp_path / f"doc{i}.json").write_text(json.dumps({"n": i}))
+    returncode, stdout, stderr = run_cli(
+        "sorted(d['n'] for d in _.values())", str(tmp_path / "*.json")
+    )
+    assert returncode == 0, stderr
+    assert json.loads(stdout) == [0, 1, 2]
+
+
+def test_per_file_flag(tmp_path):
+    """Test --per-file prints one result object per file."""
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"doc{i}.json"
+        path.write_text(json.dumps({"n": i}))
+        paths.append(str(path))
+    returncode, stdout, stderr = run_cli("_['n']", *paths, "--per-file")
+    assert returncode == 0, stderr
+    assert f'"{paths[0]}": 0' in stdout
+    assert f'"{paths[1]}": 1' in stdout
+
+
+def test_glob_matching_unsupported_file(tmp_path):
+    """Test a glob matching a sidecar index reports a clean error."""
+    (tmp_path / "d.json").write_text(json.dumps({"n": 1}))
+    (tmp_path / "d.json.pqidx").write_bytes(b"\0")
+    for flags in ((), ("--per-file",)):
+        returncode, stdout, stderr = run_cli("_", str(tmp_path / "d.*"), *flags)
+        assert returncode == 1
+        assert stderr.startswith("Error: Unsupported file type:"), stderr
+
+
+def test_glob_without_matches(tmp_path):
+    """Test a glob matching nothing reports a clean error."""
+    returncode, stdout, stderr = run_cli("_", str(tmp_path / "*.json"))
+    assert returncode == 1
+    assert stderr.startswith("Error: No files match:")
+
+
+def test_timings_flag():
+    """Test --timings reports phases and the parser on stderr only."""
+    returncode, stdout, stderr = run_cli(
+        "_['metadata']['count']", "tests/test_data.json", "--timings"
+    )
+    assert returncode == 0, stderr
+    assert stdout.strip() == "3"
+    assert "load:" in stderr and "query:" in stderr
+    assert "json: " in stderr
+
+
+def test_timings_reports_parse_cache(tmp_path):
+    """Test --timings names the parse cache when it served the document."""
+    doc = tmp_path / "doc.yaml"
+    doc.write_text("key: value\n")
+    env = {**os.environ, "XDG_CACHE_HOME": str(tmp_path / "cache")}
+    command = [sys.executable, "-m", "pq.cli", "_['key']", str(doc), "--timings"]
+    first = subprocess.run(command, capture_output=True, text=True, env=env)
+    second = subprocess.run(command, capture_output=True, text=True, env=env)
+    assert first.returncode == 0 and second.returncode == 0, second.stderr
+    assert "yaml: " in first.stderr and "parse cache" not in first.stderr
+    assert "(parse cache)" in second.stderr
+
+
+def test_stream_yaml_documents():
+    """Test --stream evaluates the query once per YAML document."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pq.cli", "-y", "-s", "_['name']"],
+        input="name: a\n---\nname: b\n",
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['"a"', '"b"']
+
+
+def test_yaml_documents_flag():
+    """Test --yaml-documents binds a list even for a single YAML document."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pq.cli", "-y", "--yaml-documents", "len(_)"],
+        input="name: a\nkind: b\n",
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "1"
+
+
+def test_xml_item_depth_flag():
+    """Test --xml-item-depth runs the query once per element."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pq.cli", "-x", "--xml-item-depth", "2", "_['@id']"],
+        input="<feed><p id='1'/><p id='2'/></feed>",
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['"1"', '"2"']
+
+
+def test_xml_item_depth_requires_xml():
+    """Test --xml-item-depth is rejected for other formats."""
+    returncode, stdout, stderr = run_cli(
+        "_", "tests/test_data.json", "--xml-item-depth", "2"
+    )
+    assert returncode != 0
+    assert "only applies to XML" in stderr
+
+def test_build_index_flag(tmp_path):
+    """Test --build-index writes a sidecar that later lookups use."""
+    path = tmp_path / "doc.json"
+    path.write_text(json.dumps({"shards": [{"id": i} for i in range(3)]}))
+    returncode, stdout, stderr = run_cli(str(path), "--build-index")
+    assert returncode == 0, stderr
+    assert "Indexed 4 paths" in stderr
+    assert (tmp_path / "doc.json.pqidx").exists()
+
+    returncode, stdout, stderr = run_cli(
+        "_['shards'][2]['id']", str(path), "--timings"
+    )
+    assert returncode == 0, stderr
+    assert stdout.strip() == "2"
+    assert "sidecar index" in stderr
+
+
+def test_build_index_requires_file():
+    """Test --build-index rejects a missing file."""
+    returncode, stdout, stderr = run_cli("missing.json", "--build-index")
+    assert returncode != 0
+    assert "--build-index takes a single JSON file" in stderr
+
+
+def test_build_index_invalid_json(tmp_path):
+    """Test --build-index reports a file it cannot index without a traceback."""
+    path = tmp_path / "doc.json"
+    path.write_text('{"a": [1, 2}')
+    returncode, stdout, stderr = run_cli(str(path), "--build-index")
+    assert returncode == 1
+    assert stderr.startswith("Error: Invalid JSON")
+    assert "Traceback" not in stderr
+
+
+def test_csv_file(tmp_path):
+    """Test querying a CSV file as a list of rows."""
+    path = tmp_path / "orders.csv"
+    path.write_text("id,region,qty\n1,eu,3\n2,us,5\n3,eu,4\n")
+    returncode, stdout, stderr = run_cli(
+        "sum(r['qty'] for r in _ if r['region'] == 'eu')", str(path)
+    )
+    assert returncode == 0, stderr
+    assert stdout.strip() == "7"
+
+
+def test_tsv_stdin_flag():
+    """Test --tsv reads tab-separated stdin."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pq.cli", "--tsv", "_[0]['b']"],
+        input="a\tb\n1\tx\n",
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '"x"'
+
+
 def test_mutually_exclusive_flags():
     """Test that multiple file type flags are rejected."""
     json_data = '{"key": "value"}'
@@ -156,16 +380,28 @@ def test_mutually_exclusive_flags_long():
 
 
 def test_stdin_without_file_type():
-    """Test that stdin without file type flag is rejected."""
-    json_data = '{"key": "value"}'
+    """Test that the format of stdin is detected without a file type flag."""
+    for document in ('{"key": "value"}', "key: value\n", "<key>value</key>", 'key = "value"\n'):
+        result = subprocess.run(
+            [sys.executable, "-m", "pq.cli", "_['key']"],
+            input=document,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == '"value"'
+
+
+def test_stdin_file_type_flag_overrides_detection():
+    """Test that a file type flag wins over format detection."""
     result = subprocess.run(
-        [sys.executable, "-m", "pq.cli", "key"],
-        input=json_data,
+        [sys.executable, "-m", "pq.cli", "-y", "_"],
+        input='{"key": "value"}',
         capture_output=True,
         text=True,
     )
-    assert result.returncode != 0
-    assert "file type flag" in result.stderr.lower()
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == {"key": "value"}
 
 
 def test_old_file_flag_removed():
@@ -2,7 +2,12 @@
 
 import pytest
 
-from pq.completion import FuzzyMatcher, PathExtractor
+from collections.abc import Mapping
+import sys
+
+from pq.completion import FuzzyMatcher, PathExtractor, PathIndex
+from pq.lazy import lazy_from_content
+from pq.table import read_table
 
 
 @pytest.fixture
@@ -21,6 +26,248 @@ class TestPathExtraction:
         assert "_['metadata']" in paths
 
 
+class TestPathIndex:
+    def test_paths_in_document_order(self):
+        index = PathIndex({"a": [{"b": 1}, {"c": 2}], "d": 3})
+        assert list(index.iter_paths()) == [
+            "_['a']",
+            "_['a'][*]",
+            "_['a'][*]['b']",
+            "_['a'][*]['c']",
+            "_['d']",
+        ]
+
+    def test_scalar_document_has_no_paths(self):
+        assert list(PathIndex(None).iter_paths()) == []
+        assert FuzzyMatcher(PathIndex(42)).find_matches("_") == []
+
+    def test_top_level_list(self):
+        matcher = FuzzyMatcher(PathIndex([{"x": 1}, {"x": 2}]))
+        assert matcher.find_matches("_") == ["_[0]", "_[1]"]
+        assert matcher.find_matches("_[1]") == ["_[1]['x']"]
+
+    def test_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() + 100
+        data: dict = {}
+        node = data
+        for _ in range(depth):
+            node["k"] = {}
+            node = node["k"]
+        index = PathIndex(data)
+        assert index.node(("k",) * depth) is not None
+        assert sum(1 for _ in index.iter_paths()) == depth
+
+    def test_keys_are_interned(self):
+        data = {str(i): {"".join(["na", "me"]): i} for i in range(3)}
+        index = PathIndex(data)
+        keys = [next(iter(index.node((str(i),)).children)) for i in range(3)]
+        assert keys[0] is keys[1] is keys[2]
+
+    def test_from_paths_round_trip(self, test_data):
+        paths = PathExtractor(test_data).get_paths()
+        index = PathIndex.from_paths(paths)
+        assert list(index.iter_paths()) == list(PathIndex(test_data).iter_paths())
+        assert index.node(("items",)).length == len(test_data["items"])
+
+    def test_extracted_paths_are_concrete(self):
+        extractor = PathExtractor({"items": [{"a": 1}, {"a": 2}, {"b": 3}]})
+        paths = extractor.get_paths()
+        assert "_['items'][2]['b']" in paths
+        assert not any("[*]" in path for path in paths)
+        matcher = FuzzyMatcher(paths)
+        assert matcher.find_matches("_['items'][1]") == [
+            "_['items'][1]['a']",
+            "_['items'][1]['b']",
+        ]
+        assert matcher.get_keys_at_path("_['items']") == ["0", "1", "2"]
+
+    def test_from_paths_with_indices(self):
+        index = PathIndex.from_paths(
+            ["_['a']", "_['a'][0]", "_['a'][0]['c']", "_['a'][2]['b']"]
+        )
+        assert index.node(("a",)).length == 3
+        assert list(index.iter_paths()) == [
+            "_['a']",
+            "_['a'][*]",
+            "_['a'][*]['c']",
+            "_['a'][*]['b']",
+        ]
+
+
+class TestSchemaCollapse:
+    def test_elements_share_one_schema(self):
+        rows = [{"id": i, "name": f"row {i}"} for i in range(10_000)]
+        paths = list(PathIndex({"rows": rows}).iter_paths())
+        assert paths == [
+            "_['rows']",
+            "_['rows'][*]",
+            "_['rows'][*]['id']",
+            "_['rows'][*]['name']",
+        ]
+
+    def test_keys_are_union_of_elements(self):
+        matcher = FuzzyMatcher(PathIndex({"rows": [{"a": 1}, {"b": 2}]}))
+        assert matcher.find_matches("_['rows'][1]") == [
+            "_['rows'][1]['a']",
+            "_['rows'][1]['b']",
+        ]
+
+    def test_element_count_kept(self):
+        index = PathIndex({"rows": list(range(5_000))})
+        assert index.node(("rows",)).length == 5_000
+        matcher = FuzzyMatcher(index)
+        assert matcher.find_matches("_['rows'][4999") == ["_['rows'][4999]"]
+        assert matcher.find_keys_at_path("_['rows']", "4999") == ["4999"]
+
+    def test_long_list_suggestions_are_bounded(self):
+        matcher = FuzzyMatcher(PathIndex(list(range(1_000_000))))
+        assert matcher.find_matches("_", max_results=3) == ["_[0]", "_[1]", "_[2]"]
+        assert len(matcher.find_matches("")) == 10
+        assert matcher.find_matches("_[99999", max_results=3) == [
+            "_[99999]",
+            "_[999990]",
+            "_[999991]",
+        ]
+        assert len(matcher.get_keys_at_path("_")) == 100
+        assert matcher.find_keys_at_path("_", "12")[:3] == ["12", "120", "121"]
+        assert matcher.find_keys_at_path("_", "0") == ["0"]
+        assert matcher.find_keys_at_path("_", "01") == []
+        assert matcher.find_keys_at_path("_", "x") == []
+
+    def test_out_of_bounds_index(self):
+        matcher = FuzzyMatcher(PathIndex({"rows": [{"a": 1}, {"a": 2}]}))
+        assert matcher.find_matches("_['rows'][2]") == []
+        assert matcher.get_keys_at_path("_['rows'][2]") == []
+
+    def test_sample_is_capped(self):
+        rows = [{"a": 1}] * 100_000 + [{"rare": 1}]
+        index = PathIndex(rows)
+        assert index.node((0,)).children.keys() == {"a"}
+        assert index.root.length == 100_001
+
+    def test_nested_lists_merge(self):
+        data = {"rows": [{"tags": ["x"]}, {"tags": ["y", "z"]}]}
+        index = PathIndex(data)
+        assert index.node(("rows", 0, "tags")).length == 2
+        assert "_['rows'][*]['tags'][*]" in list(index.iter_paths())
+
+
+class _CountingDict(Mapping):
+    """Mapping that records how often its keys are listed."""
+
+    def __init__(self, data, log, name):
+        self._data = data
+        self._log = log
+        self._name = name
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        self._log.append(self._name)
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TestLazyExpansion:
+    def test_nothing_read_until_asked(self):
+        log: list[str] = []
+        inner = _CountingDict({"x": 1}, log, "inner")
+        data = _CountingDict({"a": inner, "b": 2}, log, "root")
+        matcher = FuzzyMatcher(PathIndex(data))
+        assert log == []
+
+        assert matcher.find_matches("_") == ["_['a']", "_['b']"]
+        assert log == ["root"]
+
+        assert matcher.find_keys_at_path("_['a']", "") == ["x"]
+        assert matcher.find_keys_at_path("_['a']", "") == ["x"]
+        assert log == ["root", "inner"]
+
+    def test_lazy_proxy_document(self):
+        doc = lazy_from_content(b'{"big": [1, 2, 3], "meta": {"v": 1}}', "test")
+        matcher = FuzzyMatcher(PathIndex(doc))
+        assert matcher.find_matches("_['meta']") == ["_['meta']['v']"]
+        assert matcher.get_keys_at_path("_['big']") == ["0", "1", "2"]
+
+    def test_column_table(self):
+        table = read_table(["id,name\n", "1,a\n", "2,b\n"])
+        matcher = FuzzyMatcher(PathIndex(table))
+        assert matcher.find_matches("_") == ["_[0]", "_[1]"]
+        assert matcher.find_matches("_[1]['n") == ["_[1]['name']"]
+
+
+class TestFuzzyScoring:
+    @pytest.fixture
+    def scored(self):
+        data = {
+            "panama": 1,
+            "n_a": 2,
+            "userName": 3,
+            "name": 4,
+            "NAME": 5,
+            "nothing": 6,
+        }
+        return FuzzyMatcher(PathIndex(data))
+
+    def test_best_match_first(self, scored):
+        assert scored.find_matches("_['na") == [
+            "_['name']",
+            "_['NAME']",
+            "_['n_a']",
+            "_['userName']",
+            "_['panama']",
+        ]
+
+    def test_subsequence_match(self, scored):
+        assert scored.find_matches("_['ug") == []
+        assert scored.find_matches("_['ntg") == ["_['nothing']"]
+        assert scored.find_matches("_['usnm") == ["_['userName']"]
+
+    def test_exact_case_preferred(self, scored):
+        assert scored.find_matches("_['NA")[:2] == ["_['NAME']", "_['name']"]
+
+    def test_top_k(self, scored):
+        assert scored.find_matches("_['na", max_results=2) == [
+            "_['name']",
+            "_['NAME']",
+        ]
+
+    def test_refines_cached_prefix(self, scored):
+        scored.find_matches("_['n")
+        scored.find_matches("_['na")
+        root = id(scored.index.root)
+        assert list(scored._candidates[(root, "n")]) == [0, 1, 2, 3, 4, 5]
+        assert list(scored._candidates[(root, "na")]) == [0, 1, 2, 3, 4]
+
+    def test_wide_node_finds_prefix_match_beyond_scan(self):
+        data = {f"k{i}": i for i in range(50_000)}
+        data["zebra"] = 1
+        matcher = FuzzyMatcher(PathIndex(data))
+        assert matcher.find_matches("_['zeb") == ["_['zebra']"]
+        assert matcher.find_matches("_['k4999")[0] == "_['k4999']"
+
+    def test_empty_partial_key_honours_limit(self):
+        matcher = FuzzyMatcher(PathIndex({f"k{i}": i for i in range(50_000)}))
+        assert matcher.find_matches("_['", max_results=2) == ["_['k0']", "_['k1']"]
+
+    def test_cache_is_bounded(self):
+        matcher = FuzzyMatcher(PathIndex({"abcdef": 1}), maxsize=2)
+        for query in ["_['a", "_['ab", "_['abc"]:
+            matcher.find_matches(query)
+        assert len(matcher._candidates) == 2
+
+    def test_key_changing_length_when_lowered(self):
+        matcher = FuzzyMatcher(PathIndex({"İstanbul": 1, "la": 2}))
+        assert matcher.find_matches("_['l") == ["_['la']", "_['İstanbul']"]
+
+    def test_regex_characters_in_query(self):
+        matcher = FuzzyMatcher(PathIndex({"a.b": 1, "axb": 2, "a\nb": 3}))
+        assert matcher.find_matches("_['a.") == ["_['a.b']"]
+
+
 class TestFuzzyMatching:
     def test_match_name_via_path(self, matcher):
         matches = matcher.find_matches("name")
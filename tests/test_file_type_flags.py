@@ -35,6 +35,24 @@ def test_single_toml_flag():
     assert result == FileTypes.toml
 
 
+def test_single_jsonl_flag():
+    """Test with only JSON Lines flag set."""
+    result = consolidate_file_type_flags(False, False, False, False, True)
+    assert result == FileTypes.jsonl
+
+
+def test_single_csv_flag():
+    """Test with only CSV flag set."""
+    result = consolidate_file_type_flags(False, False, False, False, csv_flag=True)
+    assert result == FileTypes.csv
+
+
+def test_single_tsv_flag():
+    """Test with only TSV flag set."""
+    result = consolidate_file_type_flags(False, False, False, False, tsv_flag=True)
+    assert result == FileTypes.tsv
+
+
 def test_multiple_flags_raises_error():
     """Test that multiple flags raise an error."""
     with pytest.raises(Exception) as exc_info:
@@ -0,0 +1,141 @@
+"""Test the sidecar byte-offset index."""
+
+import json
+import marshal
+import os
+
+import pytest
+
+from pq.evaluator import QueryEvaluationError, evaluate_query, subscript_path
+from pq.index import build_index, index_path, load_index, load_indexed
+from pq.loader import DocumentLoadError
+
+DOCUMENT = {
+    "shards": [{"id": i, "tags": ["a", "b"]} for i in range(5)],
+    "meta": {"name": 'x "y"', "count": 5},
+    "empty": [],
+}
+
+
+@pytest.fixture
+def indexed_file(tmp_path):
+    path = tmp_path / "doc.json"
+    path.write_text(json.dumps(DOCUMENT, indent=2))
+    build_index(path)
+    return path
+
+
+class TestBuildIndex:
+    def test_records_spans_down_to_depth(self, indexed_file):
+        entries = load_index(indexed_file)
+        raw = indexed_file.read_bytes()
+        for keys in [("shards",), ("shards", 3), ("meta", "name"), ("empty",)]:
+            offset, length = entries[keys]
+            value = json.loads(raw[offset : offset + length])
+            expected = DOCUMENT
+            for key in keys:
+                expected = expected[key]
+            assert value == expected
+        assert ("shards", 3, "id") not in entries
+
+    def test_depth_is_configurable(self, tmp_path):
+        path = tmp_path / "doc.json"
+        path.write_text(json.dumps(DOCUMENT))
+        assert build_index(path, depth=1) == 3
+        assert ("shards", 0) not in load_index(path)
+
+    def test_escaped_keys(self, tmp_path):
+        path = tmp_path / "doc.json"
+        path.write_text('{"a\\"b": 1, "caf\\u00e9": [2]}')
+        build_index(path)
+        assert set(load_index(path)) == {('a"b',), ("café",), ("café", 0)}
+
+    def test_rejects_non_json(self, tmp_path):
+        path = tmp_path / "doc.yaml"
+        path.write_text("a: 1\n")
+        with pytest.raises(DocumentLoadError, match="uncompressed JSON"):
+            build_index(path)
+
+    def test_rejects_invalid_json(self, tmp_path):
+        path = tmp_path / "doc.json"
+        path.write_text('{"a": [1, 2}')
+        with pytest.raises(DocumentLoadError, match="Invalid JSON"):
+            build_index(path)
+
+    def test_stale_index_is_ignored(self, indexed_file):
+        indexed_file.write_text(json.dumps({"shards": []}))
+        stat = indexed_file.stat()
+        os.utime(indexed_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert load_index(indexed_file) is None
+
+    def test_foreign_index_is_ignored(self, indexed_file):
+        index_path(indexed_file).write_bytes(b"\0")
+        assert load_index(indexed_file) is None
+        assert load_indexed(indexed_file, ("shards", 0)) is None
+
+    def test_missing_index(self, tmp_path):
+        path = tmp_path / "doc.json"
+        path.write_text("{}")
+        assert not index_path(path).exists()
+        assert load_index(path) is None
+
+
+class TestLoadIndexed:
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "_['shards'][3]",
+            "_['shards'][3]['tags'][-1]",
+            "_['shards'][-1]",
+            "_['shards'][1:3]",
+            "_['meta']['name']",
+        ],
+    )
+    def test_matches_full_evaluation(self, indexed_file, query):
+        data = load_indexed(indexed_file, subscript_path(query))
+        assert data is not None
+        assert evaluate_query(query, data) == evaluate_query(query, DOCUMENT)
+
+    def test_reads_only_the_slice(self, indexed_file, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("whole file was mapped")
+
+        monkeypatch.setattr("pq.loader.content_from_file", fail)
+        data = load_indexed(indexed_file, ("shards", 2))
+        assert data == {"shards": {2: DOCUMENT["shards"][2]}}
+
+    def test_unindexed_prefix(self, indexed_file):
+        assert load_indexed(indexed_file, ("missing",)) is None
+        assert load_indexed(indexed_file, ()) is None
+
+    def test_equal_keys_of_other_types_do_not_match(self, indexed_file):
+        data = load_indexed(indexed_file, ("shards", 1.0))
+        assert data == {"shards": DOCUMENT["shards"]}
+        with pytest.raises(QueryEvaluationError):
+            evaluate_query("_['shards'][1.0]", data)
+        data = load_indexed(indexed_file, ("shards", True))
+        assert data == {"shards": DOCUMENT["shards"]}
+
+    def test_reads_only_the_buckets_it_needs(self, tmp_path, monkeypatch):
+        path = tmp_path / "doc.json"
+        path.write_text(json.dumps({"rows": list(range(10_000))}))
+        build_index(path)
+        assert len(load_index(path)) == 10_001
+
+        loads = []
+        real_loads = marshal.loads
+
+        def counting_loads(data):
+            loads.append(len(data))
+            return real_loads(data)
+
+        monkeypatch.setattr("pq.index.marshal.loads", counting_loads)
+        assert load_indexed(path, ("rows", 9_876)) == {"rows": {9_876: 9_876}}
+        # The header, then at most one bucket per prefix looked up.
+        assert len(loads) <= 3
+        assert sum(loads) < index_path(path).stat().st_size / 4
+
+    def test_missing_key_below_prefix(self, indexed_file):
+        data = load_indexed(indexed_file, ("shards", 0, "nope"))
+        with pytest.raises(QueryEvaluationError, match="nope"):
+            evaluate_query("_['shards'][0]['nope']", data)
@@ -0,0 +1,144 @@
+"""Test lazy JSON document proxies."""
+
+import json
+import os
+import threading
+
+import pytest
+
+from pq.evaluator import evaluate_query
+from pq.lazy import LazyArray, LazyObject, lazy_from_content, load_lazy_document
+from pq.loader import DocumentLoadError
+from pq.output import OutputFormatter
+from pq.sandbox import QueryProcess, evaluate_formatted
+
+DOC = {
+    "meta": {"tricky": ["]", "}", "\"{[", "\\\\"], "empty": {}, "none": None},
+    "items": [{"id": i, "tags": [f"t{i}"], "ok": i % 2 == 0} for i in range(20)],
+    "count": 20,
+    "ratio": -1.5e3,
+    "name": 'café "quoted"',
+}
+
+
+def lazy(value):
+    return lazy_from_content(json.dumps(value, indent=1).encode(), "test")
+
+
+class TestLazyProxies:
+    def test_root_types(self):
+        assert isinstance(lazy(DOC), LazyObject)
+        assert isinstance(lazy([1, 2]), LazyArray)
+        assert lazy(42) == 42
+
+    def test_subscripts_match_eager(self):
+        doc = lazy(DOC)
+        assert doc["count"] == 20
+        assert doc["ratio"] == -1.5e3
+        assert doc["name"] == DOC["name"]
+        assert doc["meta"]["tricky"][2] == "\"{["
+        assert doc["items"][7]["tags"][0] == "t7"
+        assert doc["items"][-1]["id"] == 19
+        assert doc["meta"]["none"] is None
+
+    def test_access_after_skipped_container(self):
+        doc = lazy(DOC)
+        assert doc["name"] == DOC["name"]
+        assert doc["meta"]["empty"] == {}
+        assert doc["items"][3]["id"] == 3
+
+    def test_missing_key_and_index(self):
+        doc = lazy(DOC)
+        with pytest.raises(KeyError):
+            doc["nope"]
+        with pytest.raises(IndexError):
+            doc["items"][20]
+        assert "count" in doc
+        assert "nope" not in doc
+
+    def test_mapping_and_sequence_protocols(self):
+        doc = lazy(DOC)
+        assert list(doc) == list(DOC)
+        assert len(doc) == len(DOC)
+        assert len(doc["items"]) == 20
+        assert [item["id"] for item in doc["items"]][:3] == [0, 1, 2]
+        assert doc["items"][1:3] == DOC["items"][1:3]
+
+    def test_materialize(self):
+        assert lazy(DOC).materialize() == DOC
+        assert lazy(DOC)["items"][4].materialize() == DOC["items"][4]
+
+    def test_queries_and_output_match_eager(self):
+        doc = lazy(DOC)
+        for query in (
+            "_",
+            "_['items'][2]",
+            "[i['id'] for i in _['items'] if i['ok']]",
+            "{k: v for k, v in _['meta'].items() if v}",
+            "len(_['items'])",
+        ):
+            expected = OutputFormatter.format_output(evaluate_query(query, DOC))
+            assert OutputFormatter.format_output(evaluate_query(query, doc)) == expected
+
+    def test_invalid_json(self):
+        doc = lazy_from_content(b'{"a": 1, "b" 2}', "bad.json")
+        assert doc["a"] == 1
+        with pytest.raises(DocumentLoadError, match="Invalid JSON in bad.json"):
+            doc["b"]
+
+    def test_empty_document(self):
+        with pytest.raises(DocumentLoadError, match="empty"):
+            lazy_from_content(b"  ", "test")
+
+
+class TestConcurrentAccess:
+    def test_threads_share_one_document(self):
+        data = {f"k{i}": {"v": [i]} for i in range(5_000)}
+        rows = [{"id": i} for i in range(5_000)]
+        for _ in range(5):
+            obj, arr = lazy(data), lazy(rows)
+            outcomes = []
+
+            def run(*calls):
+                try:
+                    outcomes.append([call() for call in calls])
+                except Exception as e:
+                    outcomes.append(e)
+
+            threads = [
+                threading.Thread(target=run, args=(lambda: obj["k4999"]["v"][0],)),
+                threading.Thread(target=run, args=(lambda: len(obj),)),
+                threading.Thread(target=run, args=(lambda: arr[4_999]["id"],)),
+                threading.Thread(target=run, args=(lambda: sum(1 for _ in arr),)),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            expected = ["[4999]", "[4999]", "[5000]", "[5000]"]
+            assert sorted(map(str, outcomes)) == expected
+
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+    def test_fork_during_scan(self):
+        rows = [{"id": i} for i in range(5_000)]
+        for _ in range(3):
+            arr = lazy(rows)
+            scanner = threading.Thread(target=lambda: len(arr))
+            scanner.start()
+            process = QueryProcess(evaluate_formatted, "len(_)", arr)
+            scanner.join()
+            assert process.result() == "5000"
+
+
+class TestLoadLazyDocument:
+    def test_load_file(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text(json.dumps(DOC))
+        assert load_lazy_document(path)["items"][5]["tags"] == ["t5"]
+
+    def test_rejects_other_formats(self, tmp_path):
+        path = tmp_path / "data.yaml"
+        path.write_text("a: 1\n")
+        with pytest.raises(DocumentLoadError, match="only supports JSON"):
+            load_lazy_document(path)
@@ -0,0 +1,286 @@
+"""Test document loading from files."""
+
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+
+import pytest
+import yaml
+
+from pq import loader
+from pq.loader import (
+    DocumentLoadError,
+    content_from_file,
+    decompress_stream,
+    load_content,
+    load_document,
+    parser_backend,
+    parser_backends,
+    sniff_file_type,
+    sniff_stream,
+)
+from pq.streaming import iter_records, open_records
+from pq.types import FileTypes
+
+
+class TestContentFromFile:
+    def test_file_is_memory_mapped(self, test_data_path):
+        content, file_type = content_from_file(test_data_path)
+        try:
+            assert isinstance(content, mmap.mmap)
+            assert file_type == FileTypes.json
+        finally:
+            content.close()
+
+    def test_empty_file_returns_empty_bytes(self, tmp_path):
+        file = tmp_path / "empty.yaml"
+        file.write_bytes(b"")
+        content, _ = content_from_file(file)
+        assert content == b""
+        assert load_document(file) is None
+
+
+class TestLoadFromBytes:
+    @pytest.mark.parametrize(
+        "name, text, expected",
+        [
+            ("doc.json", '{"city": "Zürich"}', {"city": "Zürich"}),
+            ("doc.yaml", "city: Zürich\n", {"city": "Zürich"}),
+            ("doc.xml", "<city>Zürich</city>", {"city": "Zürich"}),
+            ("doc.toml", 'city = "Zürich"\n', {"city": "Zürich"}),
+            ("doc.csv", "city\nZürich\n", [{"city": "Zürich"}]),
+            (
+                "doc.tsv",
+                "city\tcode\nZürich\t8000\n",
+                [{"city": "Zürich", "code": 8000}],
+            ),
+        ],
+    )
+    def test_each_format_from_file(self, tmp_path, name, text, expected):
+        file = tmp_path / name
+        file.write_text(text, encoding="utf-8")
+        assert load_document(file) == expected
+
+    @pytest.mark.parametrize("file_type", list(FileTypes))
+    def test_bytes_and_text_agree(self, file_type):
+        samples = {
+            FileTypes.json: '{"a": 1}',
+            FileTypes.jsonl: '{"a": 1}\n{"a": 2}\n',
+            FileTypes.yaml: "a: 1\n",
+            FileTypes.xml: "<a>1</a>",
+            FileTypes.toml: "a = 1\n",
+            FileTypes.csv: "a,b\n1,x\n",
+            FileTypes.tsv: "a\tb\n1\tx\n",
+        }
+        text = samples[file_type]
+        assert load_content(text.encode(), file_type, "test") == load_content(
+            text, file_type, "test"
+        )
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("a: 1\n---\nb: 2\n", [{"a": 1}, {"b": 2}]),
+            ("---\na: 1\n", {"a": 1}),
+            ("", None),
+        ],
+    )
+    def test_multi_document_yaml(self, tmp_path, text, expected):
+        file = tmp_path / "docs.yaml"
+        file.write_text(text)
+        assert load_document(file, use_cache=False) == expected
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("a: 1\n---\nb: 2\n", [{"a": 1}, {"b": 2}]),
+            ("---\na: 1\n", [{"a": 1}]),
+            ("", []),
+        ],
+    )
+    def test_yaml_documents_always_a_list(self, text, expected):
+        documents = load_content(text, FileTypes.yaml, "test", yaml_documents=True)
+        assert documents == expected
+
+    def test_invalid_yaml_from_file(self, tmp_path):
+        file = tmp_path / "bad.yaml"
+        file.write_text("key: [unclosed\n")
+        with pytest.raises(DocumentLoadError, match="Invalid YAML"):
+            load_document(file)
+
+    def test_invalid_xml_from_file(self, tmp_path):
+        file = tmp_path / "bad.xml"
+        file.write_text("<root><open></root>")
+        with pytest.raises(DocumentLoadError, match="Invalid XML"):
+            load_document(file)
+
+
+class TestJSONLines:
+    def test_load_document_returns_list(self, tmp_path):
+        file = tmp_path / "events.jsonl"
+        file.write_text('{"id": 1}\n\n{"id": 2}\n')
+        assert load_document(file) == [{"id": 1}, {"id": 2}]
+
+    def test_ndjson_suffix(self, tmp_path):
+        file = tmp_path / "events.ndjson"
+        file.write_text('{"id": 1}\n')
+        assert load_document(file) == [{"id": 1}]
+
+    def test_open_records_streams_lines(self, tmp_path):
+        file = tmp_path / "events.jsonl"
+        file.write_text('{"id": 1}\n{"id": 2}\n')
+        records = open_records(file)
+        assert next(records) == {"id": 1}
+        assert list(records) == [{"id": 2}]
+
+    def test_open_records_single_document(self, test_data_path, test_data):
+        assert list(open_records(test_data_path)) == [test_data]
+
+    def test_invalid_line_reports_line_number(self):
+        stream = io.BytesIO(b'{"id": 1}\n{"id": \n')
+        with pytest.raises(DocumentLoadError, match="at line 2"):
+            list(iter_records(stream, FileTypes.jsonl, "stdin"))
+
+
+COMPRESSORS = {"gz": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+
+class TestCompressedInput:
+    @pytest.mark.parametrize("suffix", list(COMPRESSORS))
+    @pytest.mark.parametrize(
+        "name, text",
+        [
+            ("doc.json", '{"a": [1, 2]}'),
+            ("doc.yaml", "a: [1, 2]\n"),
+            ("doc.jsonl", '{"a": 1}\n{"a": 2}\n'),
+            ("doc.toml", "a = [1, 2]\n"),
+        ],
+    )
+    def test_suffix(self, tmp_path, suffix, name, text):
+        file = tmp_path / f"{name}.{suffix}"
+        file.write_bytes(COMPRESSORS[suffix](text.encode()))
+        plain = tmp_path / name
+        plain.write_text(text)
+        assert load_document(file) == load_document(plain)
+
+    def test_magic_bytes_without_suffix(self, tmp_path):
+        file = tmp_path / "doc.json"
+        file.write_bytes(gzip.compress(b'{"a": 1}'))
+        assert load_document(file) == {"a": 1}
+
+    def test_content_is_a_stream(self, tmp_path):
+        file = tmp_path / "doc.xml.gz"
+        file.write_bytes(gzip.compress(b"<a>1</a>"))
+        content, file_type = content_from_file(file)
+        with content:
+            assert file_type == FileTypes.xml
+            assert not isinstance(content, (bytes, mmap.mmap))
+
+    def test_open_records(self, tmp_path):
+        file = tmp_path / "records.json.xz"
+        file.write_bytes(lzma.compress(b"[1, 2, 3]"))
+        assert list(open_records(file)) == [1, 2, 3]
+
+    @pytest.mark.parametrize("suffix", list(COMPRESSORS))
+    def test_stdin(self, suffix):
+        raw = io.BufferedReader(io.BytesIO(COMPRESSORS[suffix](b"a: 1\n")))
+        assert load_content(decompress_stream(raw), FileTypes.yaml, "stdin") == {"a": 1}
+
+    def test_uncompressed_stdin_untouched(self):
+        raw = io.BufferedReader(io.BytesIO(b'{"a": 1}'))
+        assert decompress_stream(raw) is raw
+        assert load_content(raw, FileTypes.json, "stdin") == {"a": 1}
+
+    def test_truncated_file(self, tmp_path):
+        file = tmp_path / "doc.json.gz"
+        file.write_bytes(gzip.compress(b'{"a": 1}')[:12])
+        with pytest.raises(DocumentLoadError, match="Failed to decompress"):
+            load_document(file)
+
+
+class TestParserBackends:
+    @pytest.mark.parametrize("file_type", list(FileTypes))
+    def test_every_type_has_a_backend(self, file_type):
+        assert parser_backends(file_type)[0] is parser_backend(file_type)
+
+    def test_standard_json_is_last_resort(self):
+        assert parser_backends(FileTypes.json)[-1].name == "json"
+
+    def test_missing_optional_packages(self, monkeypatch):
+        monkeypatch.setattr(loader, "orjson", None)
+        monkeypatch.setattr(loader, "msgspec", None)
+        assert [b.name for b in loader._json_backends()] == ["json"]
+
+    @pytest.mark.skipif(not yaml.__with_libyaml__, reason="libyaml not compiled in")
+    def test_libyaml_preferred(self):
+        assert parser_backend(FileTypes.yaml).name == "libyaml"
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ('{"n": 123456789012345678901234567890}', 123456789012345678901234567890),
+            ('{"n": -9999999999999999999}', -9999999999999999999),
+            ('{"n": 18446744073709551615}', 18446744073709551615),
+            ('{"n": 1.5}', 1.5),
+        ],
+    )
+    def test_fast_backend_falls_back_to_json(self, tmp_path, text, expected):
+        file = tmp_path / "doc.json"
+        file.write_text(text)
+        assert load_document(file)["n"] == expected
+        assert load_content(text, FileTypes.jsonl, "stdin") == [{"n": expected}]
+
+    def test_long_number_across_scan_chunks(self, monkeypatch):
+        monkeypatch.setattr(loader, "_SCAN_CHUNK_SIZE", 8)
+        assert loader._has_long_number(b'{"n": 123456789012345678901}')
+        assert loader._has_long_number(b'{"n": -1234567890123456789}')
+        assert not loader._has_long_number(b'{"n": 123456789012345678}')
+
+    def test_nan_accepted_like_json(self):
+        assert load_content('{"n": NaN}', FileTypes.json, "stdin")["n"] != 0
+
+    def test_error_message_comes_from_json(self, tmp_path):
+        file = tmp_path / "bad.json"
+        file.write_text('{"a": 1,}')
+        with pytest.raises(DocumentLoadError, match="at line 1, column 9"):
+            load_document(file)
+
+
+class TestSniffFileType:
+    @pytest.mark.parametrize(
+        "prefix, expected",
+        [
+            (b'{"a": 1}', FileTypes.json),
+            (b"\xef\xbb\xbf  [\n  1\n]", FileTypes.json),
+            (b"[1]\n", FileTypes.json),
+            (b'{"a": 1}\n{"a": 2}\n', FileTypes.jsonl),
+            (b'<?xml version="1.0"?>\n<a/>', FileTypes.xml),
+            (b"<a>1</a>", FileTypes.xml),
+            (b'[server]\nhost = "x"\n', FileTypes.toml),
+            (b'# settings\ntitle = "x"\n', FileTypes.toml),
+            (b"[[items]]\nname = 'a'\n", FileTypes.toml),
+            (b"a: 1\n", FileTypes.yaml),
+            (b"id,name\n1,a\n2,b\n", FileTypes.csv),
+            (b"id\tname\n1\ta\n", FileTypes.tsv),
+            (b"- a, b\n- c, d\n", FileTypes.yaml),
+            (b"---\n- a\n- b\n", FileTypes.yaml),
+            (b"", FileTypes.yaml),
+        ],
+    )
+    def test_detects(self, prefix, expected):
+        assert sniff_file_type(prefix) == expected
+
+    def test_stream_is_replayed_whole(self):
+        data = b'{"items": [' + b"1, " * 10_000 + b"2]}"
+        raw = io.BytesIO(data)
+        stream, file_type = sniff_stream(raw)
+        assert file_type == FileTypes.json
+        assert raw.tell() == loader.SNIFF_SIZE
+        assert stream.read() == data
+
+    def test_short_stream(self):
+        stream, file_type = sniff_stream(io.BytesIO(b"a: 1\n"))
+        assert file_type == FileTypes.yaml
+        assert load_content(stream, file_type, "stdin") == {"a": 1}
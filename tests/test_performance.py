@@ -1,9 +1,11 @@
 """Test query evaluation performance."""
 
 import time
+import timeit
 
 import pytest
 
+from pq.completion import FuzzyMatcher, PathIndex
 from pq.evaluator import evaluate_query
 
 
@@ -38,3 +40,60 @@ class TestPerformance:
             total += (time.perf_counter() - start) * 1000
         avg = total / len(test_queries)
         assert avg < 100, f"Average time {avg:.2f}ms exceeded 100ms"
+
+
+class TestSubscriptFastPath:
+    @pytest.fixture
+    def deep_data(self):
+        data: dict = {"leaf": "value"}
+        for _ in range(6):
+            data = {"level": [data]}
+        return data
+
+    @pytest.fixture
+    def deep_query(self):
+        return "_" + "['level'][0]" * 6 + "['leaf']"
+
+    def test_deep_path_not_slower_than_eval(self, deep_data, deep_query):
+        # A "_" among the extra names forces evaluation through eval.
+        via_eval = {"_": deep_data}
+        assert evaluate_query(deep_query, deep_data) == "value"
+        assert evaluate_query(deep_query, deep_data, via_eval) == "value"
+
+        def run(names: dict | None) -> float:
+            return timeit.timeit(
+                lambda: evaluate_query(deep_query, deep_data, names), number=5000
+            )
+
+        # Interleave the two modes so machine noise affects both equally.
+        direct_runs, eval_runs = [], []
+        for _ in range(15):
+            direct_runs.append(run(None))
+            eval_runs.append(run(via_eval))
+
+        direct, slow = min(direct_runs), min(eval_runs)
+        # Only a regression guard: the margin is left wide for noisy machines.
+        assert direct < slow * 1.5, f"direct {direct:.4f}s vs eval {slow:.4f}s"
+
+
+class TestSuggestionLatency:
+    def test_wide_node_keystrokes(self):
+        data = {f"key_{i:06d}_{i * 7919 % 1000:03d}": i for i in range(200_000)}
+        matcher = FuzzyMatcher(PathIndex(data))
+        # Preparing the node's keys for search is a one-off cost.
+        matcher.find_matches("_['x")
+
+        for query in ["_['", "_['k", "_['ke", "_['key_1", "_['key_19", "_['9", "_['99"]:
+            start = time.perf_counter()
+            matches = matcher.find_matches(query)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            assert 0 < len(matches) <= 10, query
+            assert elapsed_ms < 50, f"Suggestions for '{query}' took {elapsed_ms:.2f}ms"
+
+    def test_repeated_prefix_is_cached(self):
+        data = {f"key_{i}": i for i in range(200_000)}
+        matcher = FuzzyMatcher(PathIndex(data))
+        first = matcher.find_matches("_['k")
+        start = time.perf_counter()
+        assert matcher.find_matches("_['k") == first
+        assert (time.perf_counter() - start) * 1000 < 1
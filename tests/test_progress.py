@@ -0,0 +1,54 @@
+"""Test stdin progress reporting."""
+
+import io
+import subprocess
+import sys
+
+import pytest
+
+from pq.progress import ProgressReader, _format_size
+
+
+class TestProgressReader:
+    def test_counts_bytes_and_prints_summary(self):
+        output = io.StringIO()
+        reader = io.BufferedReader(ProgressReader(io.BytesIO(b"x" * 5000), output))
+        assert reader.read() == b"x" * 5000
+        assert reader.raw.bytes_read == 5000
+        assert output.getvalue().startswith("\r4.9 KB read (")
+        assert output.getvalue().endswith("s\n")
+
+    def test_reports_during_read(self):
+        output = io.StringIO()
+        reader = ProgressReader(io.BytesIO(b"x" * 100), output, interval=0)
+        buffer = bytearray(10)
+        reader.readinto(buffer)
+        assert output.getvalue().startswith("\r10 B read (")
+        assert "\n" not in output.getvalue()
+
+    def test_summary_printed_once(self):
+        output = io.StringIO()
+        reader = ProgressReader(io.BytesIO(b""), output)
+        reader.readinto(bytearray(10))
+        reader.readinto(bytearray(10))
+        assert output.getvalue().count("\n") == 1
+
+    @pytest.mark.parametrize(
+        "size, expected",
+        [(0, "0 B"), (1023, "1023 B"), (1536, "1.5 KB"), (3 * 1024**3, "3.0 GB")],
+    )
+    def test_format_size(self, size, expected):
+        assert _format_size(size) == expected
+
+
+def test_progress_flag_reports_on_stderr_only():
+    """Test --progress leaves stdout untouched."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pq.cli", "_['a']", "--progress"],
+        input='{"a": 1}',
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "1"
+    assert "8 B read" in result.stderr
@@ -0,0 +1,107 @@
+"""Test the compiled query cache."""
+
+import pytest
+
+from pq.evaluator import (
+    QUERY_CACHE_SIZE,
+    QueryEvaluationError,
+    clear_query_cache,
+    evaluate_query,
+    query_cache_info,
+    subscript_path,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_query_cache()
+    yield
+    clear_query_cache()
+
+
+class TestQueryCache:
+    def test_first_call_is_miss(self, test_data):
+        evaluate_query("len(_['items'])", test_data)
+        info = query_cache_info()
+        assert info.misses == 1
+        assert info.hits == 0
+        assert info.currsize == 1
+
+    def test_repeated_query_is_hit(self, test_data):
+        for _ in range(3):
+            assert evaluate_query("len(_['items'])", test_data) == 3
+        info = query_cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
+
+    def test_cached_query_uses_new_data(self, test_data):
+        evaluate_query("len(_)", test_data)
+        assert evaluate_query("len(_)", [1, 2]) == 2
+
+    def test_invalid_query_not_cached(self, test_data):
+        for _ in range(2):
+            with pytest.raises(QueryEvaluationError):
+                evaluate_query("_.__class__", test_data)
+        assert query_cache_info().currsize == 0
+
+    def test_cache_is_bounded(self, test_data):
+        for i in range(QUERY_CACHE_SIZE + 10):
+            evaluate_query(f"{i}", test_data)
+        info = query_cache_info()
+        assert info.currsize == QUERY_CACHE_SIZE
+        assert info.maxsize == QUERY_CACHE_SIZE
+
+    def test_least_recently_used_evicted(self, test_data):
+        evaluate_query("0", test_data)
+        for i in range(1, QUERY_CACHE_SIZE + 1):
+            evaluate_query(f"{i}", test_data)
+        evaluate_query("0", test_data)
+        assert query_cache_info().hits == 0
+
+    def test_subscript_path_is_not_counted(self, test_data):
+        for _ in range(2):
+            assert subscript_path("_['items'][0]") == ("items", 0)
+        info = query_cache_info()
+        assert (info.hits, info.misses) == (0, 0)
+        assert info.currsize == 1
+
+        evaluate_query("_['items'][0]", test_data)
+        assert query_cache_info().hits == 1
+
+
+class TestSubscriptPath:
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("_", ()),
+            ("_['items']", ("items",)),
+            ("_['items'][0]['name']", ("items", 0, "name")),
+            ("_['items'][-1]", ("items", -1)),
+            ("_['items'][1:]", ("items", slice(1, None, None))),
+        ],
+    )
+    def test_pure_subscript_chains(self, query, expected):
+        assert subscript_path(query) == expected
+
+    @pytest.mark.parametrize(
+        "query",
+        ["len(_)", "_['items'][0]['name'] + 'x'", "x['a']", "_.keys()", "_[("],
+    )
+    def test_other_expressions(self, query):
+        assert subscript_path(query) is None
+
+    def test_fast_path_matches_eval(self, test_data):
+        assert evaluate_query("_['items'][-1]['name']", test_data) == "Charlie"
+        assert evaluate_query("_['items'][:2]", test_data) == test_data["items"][:2]
+
+    def test_fast_path_missing_key(self, test_data):
+        with pytest.raises(QueryEvaluationError, match="Key 'nope' not found"):
+            evaluate_query("_['nope']", test_data)
+
+    def test_fast_path_index_error(self, test_data):
+        with pytest.raises(QueryEvaluationError, match="Index out of range"):
+            evaluate_query("_['items'][99]", test_data)
+
+    def test_fast_path_not_subscriptable(self, test_data):
+        with pytest.raises(QueryEvaluationError, match="Cannot use brackets"):
+            evaluate_query("_['metadata']['count']['x']", test_data)
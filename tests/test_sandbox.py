@@ -0,0 +1,80 @@
+"""Test resource-limited query evaluation."""
+
+import json
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from pq.evaluator import QueryEvaluationError
+from pq.sandbox import (
+    QueryProcess,
+    _describe_exit,
+    evaluate_formatted,
+    evaluate_in_subprocess,
+)
+
+
+class TestEvaluateInSubprocess:
+    def test_returns_formatted_result(self, test_data):
+        output = evaluate_in_subprocess("_['items'][0]", test_data, timeout=10)
+        assert json.loads(output) == test_data["items"][0]
+
+    def test_query_error_is_reported(self, test_data):
+        with pytest.raises(QueryEvaluationError, match="Key 'nope' not found"):
+            evaluate_in_subprocess("_['nope']", test_data, timeout=10)
+
+    def test_timeout_kills_query(self, test_data):
+        with pytest.raises(QueryEvaluationError, match="timed out after 0.5"):
+            evaluate_in_subprocess(
+                "[x for x in range(10**12)]", test_data, timeout=0.5
+            )
+
+    @pytest.mark.skipif(sys.platform != "linux", reason="RLIMIT_AS is Linux-only")
+    def test_memory_limit_stops_query(self, test_data):
+        with pytest.raises(QueryEvaluationError, match="memory limit of 50 MB"):
+            evaluate_in_subprocess(
+                "[x for x in range(10**9)]", test_data, timeout=30, max_memory=50
+            )
+
+    def test_formatting_error_is_not_a_memory_error(self, test_data):
+        with pytest.raises(QueryEvaluationError, match="Cannot display result"):
+            evaluate_in_subprocess("{(1, 2): 3}", test_data, timeout=10, max_memory=200)
+
+    def test_unexplained_exit_is_not_blamed_on_memory(self):
+        assert "exit code 1" in _describe_exit(1, 200)
+        assert "memory limit of 200 MB" in _describe_exit(-signal.SIGKILL, 200)
+
+
+class TestQueryProcess:
+    def test_result(self, test_data):
+        process = QueryProcess(evaluate_formatted, "len(_['items'])", test_data)
+        assert process.result() == "3"
+
+    def test_kill_stops_a_runaway_query(self, test_data):
+        process = QueryProcess(evaluate_formatted, "sum(range(10**12))", test_data)
+        assert not process.wait(0.2)
+        process.kill()
+        with pytest.raises(QueryEvaluationError, match="exited unexpectedly"):
+            process.result()
+
+
+def test_cli_timeout_prints_clean_error(test_data_path):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pq.cli",
+            "[x for x in range(10**12)]",
+            str(test_data_path),
+            "--timeout",
+            "0.5",
+        ],
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    assert result.returncode == 1
+    assert "Error: Query timed out" in result.stderr
+    assert "Traceback" not in result.stderr
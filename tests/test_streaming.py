@@ -0,0 +1,203 @@
+"""Test incremental JSON array streaming."""
+
+import io
+import json
+import threading
+
+import pytest
+
+from pq import streaming
+from pq.evaluator import evaluate_query
+from pq.loader import DocumentLoadError
+from pq.output import OutputFormatter
+from pq.streaming import (
+    JSONArrayStream,
+    iter_json_array,
+    iter_json_records,
+    iter_records,
+    iter_xml_items,
+    open_records,
+)
+from pq.types import FileTypes
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Force tiny reads so values straddle chunk boundaries."""
+    monkeypatch.setattr(streaming, "_CHUNK_SIZE", 3)
+
+
+def stream_of(value) -> io.BytesIO:
+    return io.BytesIO(json.dumps(value).encode())
+
+
+class TestIterJSONArray:
+    def test_top_level_array(self, small_chunks):
+        data = [{"id": i, "name": f"n{i}"} for i in range(50)] + [12345, 1.5e10]
+        assert list(iter_json_array(stream_of(data))) == data
+
+    def test_nested_array_skips_siblings(self, small_chunks):
+        doc = {"meta": {"x": ["]", "}"]}, "items": [1, 2, 3], "after": True}
+        assert list(iter_json_array(stream_of(doc), ("items",))) == [1, 2, 3]
+
+    def test_index_in_path(self, small_chunks):
+        doc = {"shards": [[1], [2, 3], [4]]}
+        assert list(iter_json_array(stream_of(doc), ("shards", 1))) == [2, 3]
+
+    def test_empty_array(self):
+        assert list(iter_json_array(io.BytesIO(b" [ ] "))) == []
+
+    def test_missing_key(self):
+        with pytest.raises(DocumentLoadError, match="Key 'nope' not found"):
+            list(iter_json_array(stream_of({"a": []}), ("nope",)))
+
+    def test_index_out_of_range(self):
+        with pytest.raises(DocumentLoadError, match="Index 5 out of range"):
+            list(iter_json_array(stream_of([[1]]), (5,)))
+
+    def test_not_an_array(self):
+        with pytest.raises(DocumentLoadError, match="Expected '\\['"):
+            list(iter_json_array(stream_of({"a": 1}), ("a",)))
+
+    def test_invalid_element(self):
+        with pytest.raises(DocumentLoadError, match="Invalid JSON"):
+            list(iter_json_array(io.BytesIO(b"[1, oops]")))
+
+    def test_error_reported_without_reading_the_rest(self):
+        stream = io.BytesIO(b"[1, x, " + b"2, " * 1_000_000 + b"3]")
+        with pytest.raises(DocumentLoadError, match="Expecting value at character 4"):
+            list(iter_json_array(stream))
+        assert stream.tell() < 200_000
+
+    def test_long_string_across_chunks(self, small_chunks):
+        doc = ["a" * 100, "\u00e9" * 10]
+        assert list(iter_json_array(stream_of(doc))) == doc
+
+    def test_yields_before_reading_everything(self):
+        stream = io.BytesIO(b"[1, 2, " + b"3, " * 100_000 + b"4]")
+        assert next(iter_json_array(stream)) == 1
+        assert stream.tell() < 200_000
+
+
+class TestIterJSONRecords:
+    def test_array_yields_elements(self):
+        assert list(iter_json_records(stream_of([1, 2]))) == [1, 2]
+
+    def test_object_yields_document(self, small_chunks):
+        assert list(iter_json_records(stream_of({"a": [1]}))) == [{"a": [1]}]
+
+    def test_open_records_streams_json_array(self, tmp_path):
+        file = tmp_path / "records.json"
+        file.write_text(json.dumps({"items": [{"id": 1}, {"id": 2}]}))
+        assert list(open_records(file, ("items",))) == [{"id": 1}, {"id": 2}]
+
+
+MANIFESTS = b"""\
+---
+kind: Service
+metadata: {name: web}
+---
+kind: Deployment
+metadata: {name: web}
+"""
+
+
+class TestYAMLDocuments:
+    def test_stream_yields_each_document(self):
+        records = iter_records(io.BytesIO(MANIFESTS), FileTypes.yaml, "stdin")
+        assert [r["kind"] for r in records] == ["Service", "Deployment"]
+
+    def test_open_records_streams_documents(self, tmp_path):
+        file = tmp_path / "manifests.yaml"
+        file.write_bytes(MANIFESTS)
+        assert [r["kind"] for r in open_records(file)] == ["Service", "Deployment"]
+
+    def test_yields_before_reading_everything(self):
+        big = MANIFESTS + b"---\nkind: ConfigMap\n" * 50_000
+        stream = io.BytesIO(big)
+        assert next(iter_records(stream, FileTypes.yaml, "stdin"))["kind"] == "Service"
+        assert stream.tell() < len(big) // 2
+
+    def test_invalid_document_after_valid_ones(self):
+        records = iter_records(
+            io.BytesIO(MANIFESTS + b"---\n[unclosed\n"), FileTypes.yaml, "stdin"
+        )
+        assert next(records)["kind"] == "Service"
+        with pytest.raises(DocumentLoadError, match="Invalid YAML in stdin"):
+            list(records)
+
+
+FEED = b"<feed><product id='1'><name>a</name></product><product id='2'><name>b</name></product></feed>"
+
+
+class TestXMLItems:
+    def test_items_at_depth(self):
+        items = list(iter_xml_items(io.BytesIO(FEED), 2))
+        assert items == [
+            {"@id": "1", "name": "a"},
+            {"@id": "2", "name": "b"},
+        ]
+
+    def test_open_records_with_item_depth(self, tmp_path):
+        file = tmp_path / "feed.xml"
+        file.write_bytes(FEED)
+        names = [r["name"] for r in open_records(file, xml_item_depth=2)]
+        assert names == ["a", "b"]
+
+    def test_without_item_depth_loads_whole_document(self, tmp_path):
+        file = tmp_path / "feed.xml"
+        file.write_bytes(FEED)
+        (record,) = open_records(file)
+        assert len(record["feed"]["product"]) == 2
+
+    def test_consumer_stopping_early_stops_parser(self, monkeypatch):
+        monkeypatch.setattr(streaming, "_XML_QUEUE_SIZE", 2)
+        body = b"".join(b"<p>%d</p>" % i for i in range(10_000))
+        before = threading.active_count()
+        items = iter_xml_items(io.BytesIO(b"<r>" + body + b"</r>"), 2)
+        assert next(items) == "0"
+        assert threading.active_count() == before + 1
+        items.close()
+        assert threading.active_count() == before
+
+    def test_invalid_xml(self):
+        items = iter_xml_items(io.BytesIO(b"<r><p>1</p><p>"), 2)
+        with pytest.raises(DocumentLoadError, match="Invalid XML in stdin"):
+            list(items)
+
+
+class TestJSONArrayStream:
+    @pytest.fixture
+    def array_file(self, tmp_path):
+        file = tmp_path / "data.json"
+        file.write_text(json.dumps({"items": [{"age": a} for a in (30, 25, 35)]}))
+        return file
+
+    @pytest.fixture
+    def array(self, array_file):
+        return JSONArrayStream(lambda: open(array_file, "rb"), ("items",), "test")
+
+    def test_comprehension(self, array):
+        result = evaluate_query("[x['age'] for x in _ if x['age'] > 26]", array)
+        assert result == [30, 35]
+
+    def test_len(self, array):
+        assert evaluate_query("len(_)", array) == 3
+
+    def test_indexing(self, array):
+        assert evaluate_query("_[1]['age']", array) == 25
+        assert evaluate_query("_[-1]['age']", array) == 35
+        assert evaluate_query("_[1:]", array) == [{"age": 25}, {"age": 35}]
+
+    def test_output_materializes(self, array):
+        assert json.loads(OutputFormatter.format_output(array)) == [
+            {"age": 30},
+            {"age": 25},
+            {"age": 35},
+        ]
+
+    def test_one_shot_source(self):
+        array = JSONArrayStream(lambda: stream_of([1, 2]), reopenable=False)
+        assert OutputFormatter.format_output(array) == "[\n  1,\n  2\n]"
+        with pytest.raises(DocumentLoadError, match="only be iterated once"):
+            list(iter(array))
@@ -0,0 +1,122 @@
+"""Test the column-oriented CSV/TSV table."""
+
+from array import array
+import io
+import pickle
+
+import pytest
+
+from pq.evaluator import evaluate_query
+from pq.loader import DocumentLoadError, load_content, load_document
+from pq.output import OutputFormatter
+from pq.table import ColumnTable, read_table
+from pq.types import FileTypes
+
+CSV = 'id,name,price,zip\n1,a,1.5,02134\n2,"b, c",2,10001\n'
+
+
+def table(text=CSV, delimiter=","):
+    return read_table(io.StringIO(text, newline=""), delimiter)
+
+
+class TestReadTable:
+    def test_rows_behave_like_dicts(self):
+        rows = table()
+        assert len(rows) == 2
+        assert rows[1]["name"] == "b, c"
+        assert rows == [
+            {"id": 1, "name": "a", "price": 1.5, "zip": "02134"},
+            {"id": 2, "name": "b, c", "price": 2.0, "zip": "10001"},
+        ]
+
+    def test_columns_are_compact(self):
+        columns = table().columns
+        assert columns["id"] == array("q", [1, 2])
+        assert columns["price"] == array("d", [1.5, 2.0])
+        # Leading zeros would be lost as numbers.
+        assert columns["zip"] == ["02134", "10001"]
+
+    def test_mixed_column_keeps_original_text(self, monkeypatch):
+        monkeypatch.setattr("pq.table._CHUNK_ROWS", 2)
+        rows = table("n\n1.50\n2\nn/a\n")
+        assert rows.columns["n"] == ["1.50", "2", "n/a"]
+
+    def test_float_column_converts_every_cell(self):
+        rows = table("n,m\n10,-0\n1e3,7\n2.5,8\n")
+        assert [row["n"] for row in rows] == [10.0, 1000.0, 2.5]
+        assert isinstance(rows[0]["n"], float)
+        assert [row["m"] for row in rows] == [0, 7, 8]
+
+    def test_large_integers_stay_exact(self):
+        rows = table("n\n123456789012345678901234\n")
+        assert rows[0]["n"] == "123456789012345678901234"
+
+    def test_quoted_newline(self):
+        rows = table('a,b\n"1\n2",x\n')
+        assert rows[0] == {"a": "1\n2", "b": "x"}
+
+    def test_blank_lines_and_bom(self):
+        rows = table("\ufeffa\tb\r\n\r\n1\tx\r\n", delimiter="\t")
+        assert rows == [{"a": 1, "b": "x"}]
+
+    def test_empty(self):
+        assert table("") == []
+
+    def test_header_only(self):
+        rows = table("a,b\n")
+        assert len(rows) == 0
+        assert list(rows.columns) == ["a", "b"]
+
+    def test_ragged_row(self):
+        with pytest.raises(ValueError, match="Row 2 has 1 fields, expected 2"):
+            table("a,b\n1,2\n3\n")
+
+    def test_duplicate_headers(self):
+        with pytest.raises(ValueError, match="Duplicate column names: a"):
+            table("a,b,a\n1,2,3\n")
+
+    def test_negative_index_and_slice(self):
+        rows = table()
+        assert rows[-1]["id"] == 2
+        assert [row["id"] for row in rows[:1]] == [1]
+        with pytest.raises(IndexError):
+            rows[2]
+
+    def test_missing_key(self):
+        with pytest.raises(KeyError):
+            table()[0]["nope"]
+
+    def test_pickles(self):
+        rows = table()
+        assert pickle.loads(pickle.dumps(rows)) == rows
+
+
+class TestTableDocuments:
+    def test_load_file(self, tmp_path):
+        path = tmp_path / "doc.csv"
+        path.write_text(CSV)
+        rows = load_document(path)
+        assert isinstance(rows, ColumnTable)
+        assert rows[0]["zip"] == "02134"
+
+    def test_load_stream(self):
+        rows = load_content(io.BytesIO(b"a\tb\n1\tx\n"), FileTypes.tsv, "stdin")
+        assert rows == [{"a": 1, "b": "x"}]
+
+    def test_invalid_table(self):
+        with pytest.raises(DocumentLoadError, match="Invalid CSV in test"):
+            load_content("a,b\n1\n", FileTypes.csv, "test")
+
+    def test_queries(self):
+        rows = table()
+        assert evaluate_query("[r['name'] for r in _ if r['price'] > 1.5]", rows) == [
+            "b, c"
+        ]
+        assert evaluate_query("sum(_.columns['id'])", rows) == 3
+
+    def test_output(self):
+        rows = table()
+        assert OutputFormatter.format_output(rows) == OutputFormatter.format_output(
+            rows.materialize()
+        )
+        assert '"name": "a"' in OutputFormatter.format_output(rows[0])